@@ -1,16 +1,20 @@
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Request, request, jsonify, send_from_directory, send_file, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
+import sys
 import uuid
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import base64
 import requests
 import logging
-import subprocess
 import json
+import hashlib
+import gzip
+import threading
+import queue
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -24,6 +28,12 @@ print("Gemini API key found?", bool(os.getenv("GEMINI_API_KEY")))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The recommendation system's caches, outfit log and collage renderer are imported
+# directly (as src.*): generate_outfit_adapter also loads the models and changes directory
+RECOMMENDATION_SYSTEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recommendation_system')
+if RECOMMENDATION_SYSTEM_DIR not in sys.path:
+    sys.path.append(RECOMMENDATION_SYSTEM_DIR)
+
 # Explicit Outfit Rules (User-defined pairings) - Using database IDs
 EXPLICIT_OUTFIT_RULES = {
     "12": [  # 3b30b0c5-4cc3-4cf2-8efc-e9ea725cebf6.jpg
@@ -78,26 +88,285 @@ app = Flask(__name__)
 # For development, allow all localhost origins
 CORS(app, origins="*",  # Allow all origins for development
      supports_credentials=True,
-     allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "If-None-Match"],
+     expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "X-Wardrobe-Version"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
 # Configure database
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///wardrobe.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# WAL + tuned pragmas and a thread-friendly pool (SQLITE_TUNING=0 keeps SQLite defaults)
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') == '1'
+if SQLITE_TUNING:
+    from db_schema import engine_options
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        pool_size=int(os.environ.get('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    )
 
 # Configure upload settings
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB max file size
+VALID_CATEGORIES = ['dresses', 'accessories', 'tops', 'bottoms', 'shoes']
+
+# Bulk uploads: the request limit covers every file; each file is still capped at MAX_FILE_SIZE
+BULK_UPLOAD_MAX_MB = int(os.environ.get('BULK_UPLOAD_MAX_MB', 256))
+BULK_UPLOAD_MAX_FILES = int(os.environ.get('BULK_UPLOAD_MAX_FILES', 100))
+
+# GET /api/wardrobe page size cap, and the smallest JSON response worth gzipping
+WARDROBE_PAGE_MAX = int(os.environ.get('WARDROBE_PAGE_MAX', 500))
+GZIP_MIN_BYTES = int(os.environ.get('GZIP_MIN_BYTES', 1024))
+
+# Wardrobe change log: entries kept for delta sync, and the page size of /api/wardrobe/changes
+WARDROBE_CHANGE_LOG_MAX = int(os.environ.get('WARDROBE_CHANGE_LOG_MAX', 10000))
+WARDROBE_CHANGES_PAGE = int(os.environ.get('WARDROBE_CHANGES_PAGE', 500))
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+
+class WardrobeRequest(Request):
+    """Request with the larger body limit on the bulk upload route only"""
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'bulk_upload_wardrobe_items':
+            return BULK_UPLOAD_MAX_MB * 1024 * 1024
+        return super().max_content_length
+
+app.request_class = WardrobeRequest
 GEMINI_TEXT_MODEL = os.environ.get('GEMINI_TEXT_MODEL', 'gemini-1.5-pro')
 GEMINI_IMAGE_MODEL = os.environ.get('GEMINI_IMAGE_MODEL', 'gemini-2.0-flash')
 GOOGLE_API_BASE = os.environ.get('GOOGLE_API_BASE', 'https://generativelanguage.googleapis.com/v1beta')
 
+# Stylist text generation (flash for higher free tier limits); responses cached per normalised prompt
+GEMINI_STYLIST_MODEL = os.environ.get('GEMINI_STYLIST_MODEL', 'gemini-1.5-flash')
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 30))
+GEMINI_CACHE_SIZE = int(os.environ.get('GEMINI_CACHE_SIZE', 256))
+GEMINI_CACHE_DIR = os.environ.get('GEMINI_CACHE_DIR', 'recommendation_system/data/processed/gemini_cache')
+GEMINI_CACHE_TTL_HOURS = float(os.environ.get('GEMINI_CACHE_TTL_HOURS', 24))
+
+# Outbound APIs: pooled sessions, per-provider concurrency and circuit breakers
+DEEPAI_API_BASE = os.environ.get('DEEPAI_API_BASE', 'https://api.deepai.org/api')
+DEEPAI_TIMEOUT = float(os.environ.get('DEEPAI_TIMEOUT', 60))
+OUTBOUND_CONNECT_TIMEOUT = float(os.environ.get('OUTBOUND_CONNECT_TIMEOUT', 5))
+OUTBOUND_BREAKER_FAILURES = int(os.environ.get('OUTBOUND_BREAKER_FAILURES', 5))
+OUTBOUND_BREAKER_RESET_SECONDS = float(os.environ.get('OUTBOUND_BREAKER_RESET_SECONDS', 30))
+OUTBOUND_MAX_CONCURRENCY = {
+    'deepai': int(os.environ.get('DEEPAI_MAX_CONCURRENCY', 4)),
+    'gemini': int(os.environ.get('GEMINI_MAX_CONCURRENCY', 8)),
+    'holidays': int(os.environ.get('HOLIDAY_MAX_CONCURRENCY', 2)),
+}
+
+# Stylist fallback placeholders: rendered once per prompt text, served from /api/placeholders/<key>.png
+PLACEHOLDER_CACHE_DIR = os.environ.get('PLACEHOLDER_CACHE_DIR', 'recommendation_system/data/output/placeholders')
+PLACEHOLDER_CACHE_MAX_MB = int(os.environ.get('PLACEHOLDER_CACHE_MAX_MB', 64))
+PLACEHOLDER_MEMORY_ENTRIES = int(os.environ.get('PLACEHOLDER_MEMORY_ENTRIES', 64))
+
+# Resized image variants (/img/<filename>?w=320&fmt=webp) for grids and cards
+IMAGE_VARIANT_DIR = os.environ.get('IMAGE_VARIANT_DIR', 'recommendation_system/data/output/image_variants')
+IMAGE_VARIANT_CACHE_MAX_MB = int(os.environ.get('IMAGE_VARIANT_CACHE_MAX_MB', 512))
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '160,320,480,640,960,1280').split(',')]
+IMAGE_VARIANT_QUALITY = int(os.environ.get('IMAGE_VARIANT_QUALITY', 80))
+
+# Recommendation result cache (set OUTFIT_CACHE_DIR to enable the on-disk tier)
+OUTFIT_CACHE_SIZE = int(os.environ.get('OUTFIT_CACHE_SIZE', 256))
+OUTFIT_CACHE_DIR = os.environ.get('OUTFIT_CACHE_DIR', '')
+
+# Precomputed top outfits per wardrobe item (built by precompute_outfits.py)
+OUTFIT_TABLE_PATH = os.environ.get('OUTFIT_TABLE_PATH', 'recommendation_system/data/processed/outfit_table.db')
+OUTFIT_TABLE_AUTO_REFRESH = os.environ.get('OUTFIT_TABLE_AUTO_REFRESH', '1') == '1'
+
+# Outfit collages are rendered on first request to their URL
+COLLAGE_DIR = os.environ.get('COLLAGE_DIR', 'recommendation_system/data/output/collages')
+COLLAGE_CACHE_MAX_MB = int(os.environ.get('COLLAGE_CACHE_MAX_MB', 256))
+COLLAGE_FORMAT = os.environ.get('COLLAGE_FORMAT', 'jpg')  # jpg or webp
+COLLAGE_QUALITY = int(os.environ.get('COLLAGE_QUALITY', 90))
+
+# Generated outfits go to one JSONL log; old log files and unused collages age out
+OUTFIT_LOG_DIR = os.environ.get('OUTFIT_LOG_DIR', 'recommendation_system/data/output/outfit_log')
+OUTPUT_RETENTION_DAYS = int(os.environ.get('OUTPUT_RETENTION_DAYS', 30))
+
+# Warm recommendation engine: load the model and build the recommender at startup
+RECOMMENDER_WARMUP = os.environ.get('RECOMMENDER_WARMUP', '1') == '1'
+
+# Stylist prompts ranked against wardrobe/catalog image embeddings (CLIP text tower)
+PROMPT_CACHE_SIZE = int(os.environ.get('PROMPT_CACHE_SIZE', 256))
+PROMPT_MIN_SIMILARITY = float(os.environ.get('PROMPT_MIN_SIMILARITY', 0.18))
+IMAGE_SEARCH_MAX_RESULTS = int(os.environ.get('IMAGE_SEARCH_MAX_RESULTS', 50))
+
+# Background upload processing (classification + embedding)
+UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', 2))
+UPLOAD_JOB_RETRIES = int(os.environ.get('UPLOAD_JOB_RETRIES', 2))
+# Fallback stylist images (DeepAI or placeholder) run on their own workers
+IMAGE_JOB_WORKERS = int(os.environ.get('IMAGE_JOB_WORKERS', 2))
+
+# Style card: backend style tags -> Gen-Z vibes (unmapped tags count as clean_girl)
+STYLE_MAPPING = {
+    "casual": "streetwear",
+    "ethnic": "girly_pop",
+    "formal": "boss_babe",
+    "party": "edgy",
+    "bohemian": "grunge",
+    "minimalist": "clean_girl",
+    "elegant": "boss_babe",
+    "girly": "girly_pop",
+    "denim": "streetwear",
+    "practical": "clean_girl",
+    "edgy": "edgy",
+    "classic": "clean_girl",
+    "trendy": "streetwear",
+    "streetwear": "streetwear",
+    "vintage": "grunge",
+    "glam": "boss_babe",
+    "y2k": "edgy",
+    "boho": "grunge"
+}
+STYLE_CARD_VIBES = ["girly_pop", "edgy", "streetwear", "clean_girl", "boss_babe", "grunge"]
+DEFAULT_VIBE = "clean_girl"
+
+# Holiday calendar behind /api/trending (Nager.Date API format; bundled calendar in data/holidays)
+HOLIDAY_API_BASE = os.environ.get('HOLIDAY_API_BASE', 'https://date.nager.at/api/v3')
+HOLIDAY_COUNTRY = os.environ.get('HOLIDAY_COUNTRY', 'IN')
+HOLIDAY_CACHE_DIR = os.environ.get('HOLIDAY_CACHE_DIR', 'recommendation_system/data/processed/holidays')
+HOLIDAY_CACHE_TTL_HOURS = float(os.environ.get('HOLIDAY_CACHE_TTL_HOURS', 24))
+
+# Product search catalog (indexed once per process)
+PRODUCT_CATALOG_PATH = os.environ.get('PRODUCT_CATALOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'products', 'catalog.json'))
+
+# Trending styles shown every day
+TRENDING_BASE_STYLES = [
+    {
+        "id": "navratri-style",
+        "title": "Navratri Garba Look",
+        "emoji": "💃",
+        "description": "Dance & Celebration",
+        "defaultPieces": ["chaniya choli", "dupatta", "jewelry", "comfortable shoes"],
+        "category": "festival",
+        "season": "autumn",
+        "occasion": "festival",
+        "holiday": "Navratri"
+    },
+    {
+        "id": "diwali-style",
+        "title": "Diwali Festive Look",
+        "emoji": "🪔",
+        "description": "Festive Glam",
+        "defaultPieces": ["embroidered kurta", "embroidered dupatta", "juttis", "gold jewelry"],
+        "category": "festival",
+        "season": "autumn",
+        "occasion": "festival",
+        "holiday": "Diwali"
+    },
+    {
+        "id": "autumn-style",
+        "title": "Autumn Cozy Look",
+        "emoji": "🍂",
+        "description": "Layered & Stylish",
+        "defaultPieces": ["knit sweater", "ankle boots", "wool scarf", "beanie"],
+        "category": "season",
+        "season": "autumn",
+        "occasion": "seasonal"
+    }
+]
+
+# Holiday name (as returned by the holiday API) -> trending style
+HOLIDAY_STYLE_MAPPING = {
+    "Christmas Day": {
+        "id": "christmas-style",
+        "title": "Christmas Festive Look",
+        "emoji": "🎄",
+        "description": "Festive & Warm",
+        "defaultPieces": ["red sweater", "wool coat", "boots", "warm scarf"],
+        "season": "winter",
+        "occasion": "festive"
+    },
+    "New Year's Day": {
+        "id": "new-year-style",
+        "title": "New Year Glam Look",
+        "emoji": "✨",
+        "description": "Party Ready",
+        "defaultPieces": ["sequin dress", "heels", "statement jewelry", "clutch"],
+        "season": "winter",
+        "occasion": "party"
+    },
+    "Valentine's Day": {
+        "id": "valentines-style",
+        "title": "Valentine's Romance Look",
+        "emoji": "💖",
+        "description": "Romantic & Sweet",
+        "defaultPieces": ["pink dress", "red heels", "delicate jewelry", "perfume"],
+        "season": "winter",
+        "occasion": "romantic"
+    },
+    "Holi": {
+        "id": "holi-style",
+        "title": "Holi Color Fest Look",
+        "emoji": "🌈",
+        "description": "Colorful & Fun",
+        "defaultPieces": ["white kurta", "colorful dupatta", "comfortable shoes", "sunglasses"],
+        "season": "spring",
+        "occasion": "festival"
+    },
+    "Diwali": {
+        "id": "diwali-style",
+        "title": "Diwali Festive Look",
+        "emoji": "🪔",
+        "description": "Festive Glam",
+        "defaultPieces": ["embroidered kurta", "embroidered dupatta", "juttis", "gold jewelry"],
+        "season": "autumn",
+        "occasion": "festival"
+    },
+    "Dussehra": {
+        "id": "dussehra-style",
+        "title": "Dussehra Traditional Look",
+        "emoji": "🦸",
+        "description": "Traditional & Elegant",
+        "defaultPieces": ["silk kurta", "dhoti pants", "kolhapuri sandals", "traditional accessories"],
+        "season": "autumn",
+        "occasion": "festival"
+    },
+    "Eid al-Fitr": {
+        "id": "eid-style",
+        "title": "Eid Celebration Look",
+        "emoji": "🌙",
+        "description": "Elegant & Traditional",
+        "defaultPieces": ["embroidered kurta", "matching pants", "traditional shoes", "prayer cap"],
+        "season": "spring",
+        "occasion": "religious"
+    },
+    "Raksha Bandhan": {
+        "id": "rakhi-style",
+        "title": "Rakhi Traditional Look",
+        "emoji": "🎀",
+        "description": "Traditional & Festive",
+        "defaultPieces": ["ethnic kurta", "ethnic pants", "juttis", "traditional accessories"],
+        "season": "summer",
+        "occasion": "festival"
+    },
+    "Navratri": {
+        "id": "navratri-style",
+        "title": "Navratri Garba Look",
+        "emoji": "💃",
+        "description": "Dance & Celebration",
+        "defaultPieces": ["chaniya choli", "dupatta", "jewelry", "comfortable shoes"],
+        "season": "autumn",
+        "occasion": "festival"
+    }
+}
+
+# App upload categories -> recommender category vocabulary
+RECOMMENDER_CATEGORY_MAPPING = {
+    'tops': 'top',
+    'bottoms': 'bottom',
+    'dresses': 'dress'
+}
+
 # Initialize database
 db = SQLAlchemy(app)
+if SQLITE_TUNING:
+    from db_schema import install_sqlite_pragmas
+    with app.app_context():
+        install_sqlite_pragmas(db.engine)
 
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -106,14 +375,17 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 class WardrobeItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     image_url = db.Column(db.String(255), nullable=False)
-    category = db.Column(db.String(50), nullable=False)
+    category = db.Column(db.String(50), nullable=False, index=True)
     subcategory = db.Column(db.String(100), nullable=True)
     style_tags = db.Column(db.Text, nullable=True)
     dominant_color_hex = db.Column(db.String(7), nullable=True)
     emb_index = db.Column(db.Integer, nullable=True)
-    recommendation_id = db.Column(db.String(100), nullable=True)
+    recommendation_id = db.Column(db.String(100), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Backs the newest-first keyset pagination of GET /api/wardrobe
+    __table_args__ = (db.Index('ix_wardrobe_item_created_at_id', 'created_at', 'id'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -127,6 +399,34 @@ class WardrobeItem(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class WardrobeChange(db.Model):
+    """Append-only log of wardrobe mutations; the row id is the wardrobe version"""
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert, update or delete
+    payload = db.Column(db.Text, nullable=True)  # item JSON after the change (None for deletes)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'version': self.id,
+            'op': self.op,
+            'item_id': self.item_id,
+            'item': json.loads(self.payload) if self.payload else None,
+            'changed_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class StyleCard(db.Model):
+    """Materialized style card counts (a single row), kept current by record_wardrobe_change"""
+    id = db.Column(db.Integer, primary_key=True)
+    girly_pop = db.Column(db.Integer, nullable=False, default=0)
+    edgy = db.Column(db.Integer, nullable=False, default=0)
+    streetwear = db.Column(db.Integer, nullable=False, default=0)
+    clean_girl = db.Column(db.Integer, nullable=False, default=0)
+    boss_babe = db.Column(db.Integer, nullable=False, default=0)
+    grunge = db.Column(db.Integer, nullable=False, default=0)
+    total_items = db.Column(db.Integer, nullable=False, default=0)
+
 # Helper functions
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -148,28 +448,448 @@ def save_uploaded_file(file):
         return f"/uploads/{filename}"
     return None
 
-def _call_gemini_text_api(user_prompt: str) -> str:
-    """Call Gemini text model to get a structured outfit suggestion."""
+def normalize_category(category):
+    """Plural app category for a user-supplied one (singular forms accepted), or None if invalid"""
+    category_mapping = {
+        'dress': 'dresses',
+        'top': 'tops',
+        'bottom': 'bottoms',
+        'accessory': 'accessories',
+        'shoe': 'shoes'
+    }
+    normalized_category = category_mapping.get(category, category)
+    return normalized_category if normalized_category in VALID_CATEGORIES else None
+
+def build_wardrobe_dataframe(db_items) -> pd.DataFrame:
+    """Convert database items to the frame format expected by the recommendation system"""
+    wardrobe_data = []
+    for item in db_items:
+        wardrobe_data.append({
+            'id': str(item.id),  # Convert to string for consistency
+            'category': item.category,
+            'subcategory': item.subcategory or 'unknown',
+            'color': item.dominant_color_hex or 'unknown',
+            'style_tags': item.style_tags or ['casual'],
+            'image_url': item.image_url,
+            'description': f"{item.category} item",
+            'filename': item.image_url.split('/')[-1] if item.image_url else None,
+            'recommendation_id': item.recommendation_id
+        })
+    return pd.DataFrame(wardrobe_data)
+
+def wardrobe_fingerprint(db_items) -> str:
+    """Content hash of the wardrobe rows, used to version cached recommendations"""
+    digest = hashlib.sha1()
+    for item in sorted(db_items, key=lambda i: i.id):
+        digest.update(repr((
+            item.id, item.image_url, item.category, item.subcategory,
+            item.style_tags, item.dominant_color_hex, item.recommendation_id
+        )).encode())
+    return digest.hexdigest()[:16]
+
+_outfit_cache = None
+_outfit_cache_lock = threading.Lock()
+
+def get_outfit_cache():
+    """Process-wide recommendation result cache (created on first use)"""
+    global _outfit_cache
+    if _outfit_cache is None:
+        with _outfit_cache_lock:
+            if _outfit_cache is None:
+                from src.recommend.outfit_cache import OutfitResultCache
+                _outfit_cache = OutfitResultCache(
+                    max_entries=OUTFIT_CACHE_SIZE,
+                    disk_dir=OUTFIT_CACHE_DIR or None
+                )
+    return _outfit_cache
+
+_collage_renderer = None
+_collage_renderer_lock = threading.Lock()
+
+def get_collage_renderer():
+    """Process-wide lazy collage renderer (created on first use)"""
+    global _collage_renderer
+    if _collage_renderer is None:
+        with _collage_renderer_lock:
+            if _collage_renderer is None:
+                from src.utils.lazy_collage import LazyCollageRenderer
+                from src.utils.collage_cache import CollageCache
+                _collage_renderer = LazyCollageRenderer(
+                    COLLAGE_DIR,
+                    cache=CollageCache(os.path.join(COLLAGE_DIR, 'cache'), max_bytes=COLLAGE_CACHE_MAX_MB * 1024 * 1024),
+                    output_format=COLLAGE_FORMAT,
+                    quality=COLLAGE_QUALITY
+                )
+    return _collage_renderer
+
+_image_variants = None
+_image_variants_lock = threading.Lock()
+
+def get_image_variants():
+    """Process-wide resized image cache over uploads and static wardrobe images"""
+    global _image_variants
+    if _image_variants is None:
+        with _image_variants_lock:
+            if _image_variants is None:
+                from image_variants import ImageVariantCache
+                _image_variants = ImageVariantCache(
+                    [app.config['UPLOAD_FOLDER'], os.path.join('static', 'wardrobe_images')],
+                    IMAGE_VARIANT_DIR,
+                    max_bytes=IMAGE_VARIANT_CACHE_MAX_MB * 1024 * 1024,
+                    widths=IMAGE_VARIANT_WIDTHS,
+                    quality=IMAGE_VARIANT_QUALITY
+                )
+    return _image_variants
+
+_outfit_log = None
+_outfit_log_lock = threading.Lock()
+
+def get_outfit_log():
+    """Process-wide outfit log (created on first use)"""
+    global _outfit_log
+    if _outfit_log is None:
+        with _outfit_log_lock:
+            if _outfit_log is None:
+                from src.recommend.outfit_log import OutfitLog
+                _outfit_log = OutfitLog(OUTFIT_LOG_DIR, retention_days=OUTPUT_RETENTION_DAYS)
+    return _outfit_log
+
+def apply_output_retention():
+    """Drop outfit log days and collages older than OUTPUT_RETENTION_DAYS"""
     try:
-        import google.generativeai as genai
-        
-        # Configure the API
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        
-        # Initialize the model (using flash for higher free tier limits)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        system_instructions = (
-            "You are a world-class fashion stylist and image consultant. "
-            "Respond with chic, wearable, context-appropriate looks. "
-            "Break your answer into sections with these exact headings: "
-            "Outfit, Accessories, Shoes, Hairstyle/Makeup, Style Inspiration. "
-            "Keep language stylish and modern. Draw inspiration from Bollywood, Hollywood, top influencers, and recent fashion trends. "
-            "Avoid context mismatches (e.g., no saree for beach, no heavy boots for summer)."
+        removed_logs = get_outfit_log().apply_retention()
+        removed_collages = get_collage_renderer().apply_retention(OUTPUT_RETENTION_DAYS)
+        logger.info(f"🧹 Output retention removed {removed_logs} log files and {removed_collages} collage files")
+    except Exception as e:
+        logger.warning(f"Output retention failed: {e}")
+
+def build_recommender_dataframe(db_items) -> pd.DataFrame:
+    """Wardrobe frame with categories in recommender vocabulary"""
+    wardrobe_df = build_wardrobe_dataframe(db_items)
+    if not wardrobe_df.empty:
+        wardrobe_df['category'] = wardrobe_df['category'].replace(RECOMMENDER_CATEGORY_MAPPING)
+    return wardrobe_df
+
+_recommendation_engine = None
+_recommendation_engine_lock = threading.Lock()
+
+def get_recommendation_engine():
+    """Process-wide warm recommendation engine (created on first use)"""
+    global _recommendation_engine
+    if _recommendation_engine is None:
+        with _recommendation_engine_lock:
+            if _recommendation_engine is None:
+                from recommendation_engine import RecommendationEngine
+                _recommendation_engine = RecommendationEngine(
+                    raw_dir='recommendation_system/data/raw',
+                    processed_dir='recommendation_system/data/processed',
+                    output_dir='recommendation_system/data/output',
+                    image_dirs=[UPLOAD_FOLDER],
+                    prompt_cache_size=PROMPT_CACHE_SIZE,
+                    recommender_kwargs=lambda: {
+                        'result_cache': get_outfit_cache(),
+                        'collage_renderer': get_collage_renderer(),
+                        'outfit_log': get_outfit_log()
+                    }
+                )
+    return _recommendation_engine
+
+def get_wardrobe_recommender(db_items):
+    """The engine's shared recommender for the current wardrobe (rebuilt only when it changed)"""
+    return get_recommendation_engine().recommender_for(
+        build_recommender_dataframe(db_items), wardrobe_fingerprint(db_items)
+    )
+
+def warm_recommendation_engine():
+    """Load the model, run a dummy inference and build the recommender before the first request"""
+    try:
+        engine = get_recommendation_engine()
+        engine.warm_up()
+        with app.app_context():
+            db_items = WardrobeItem.query.all()
+        if db_items:
+            get_wardrobe_recommender(db_items)
+    except Exception as e:
+        logger.warning(f"Recommendation engine warm-up failed: {e}")
+
+def build_wardrobe_recommender(db_items, embedding_index=None, **kwargs):
+    """Build a standalone recommender over the database wardrobe (categories in recommender vocabulary)"""
+    from generate_outfit_adapter import RobustOutfitRecommender
+    
+    wardrobe_df = build_recommender_dataframe(db_items)
+    catalog_df = pd.DataFrame(columns=['id', 'category', 'subcategory', 'color', 'style_tags', 'image_url', 'description'])
+    
+    raw_dir = 'recommendation_system/data/raw'
+    output_dir = 'recommendation_system/data/output'
+    
+    if embedding_index is None:
+        # Reuse the engine's loaded classifier and in-memory embeddings
+        embedding_index = get_recommendation_engine().embedding_index_for(wardrobe_df)
+    
+    kwargs.setdefault('collage_renderer', get_collage_renderer())
+    kwargs.setdefault('outfit_log', get_outfit_log())
+    return RobustOutfitRecommender(
+        wardrobe_df=wardrobe_df,
+        catalog_df=catalog_df,
+        embedding_index=embedding_index,
+        image_base_dir=raw_dir,
+        output_dir=output_dir,
+        **kwargs
+    )
+
+_outfit_table = None
+_outfit_table_lock = threading.Lock()
+_outfit_refresh_lock = threading.Lock()
+
+def get_outfit_table():
+    """Process-wide precomputed outfit table (opened on first use)"""
+    global _outfit_table
+    if _outfit_table is None:
+        with _outfit_table_lock:
+            if _outfit_table is None:
+                from generate_outfit_adapter import OutfitTable
+                _outfit_table = OutfitTable(OUTFIT_TABLE_PATH)
+    return _outfit_table
+
+def get_outfit_precomputer(num_outfits=None, occasions=None):
+    """Precompute job over the shared table, reusing the settings it was built with"""
+    from generate_outfit_adapter import OutfitPrecomputer
+    table = get_outfit_table()
+    return OutfitPrecomputer(
+        table,
+        num_outfits=num_outfits or table.get_meta('num_outfits', 3),
+        occasions=occasions or table.get_meta('occasions', ['casual'])
+    )
+
+def refresh_outfit_table(added_ids=(), removed_ids=()):
+    """Recompute only the precomputed outfits affected by a wardrobe change"""
+    with _outfit_refresh_lock, app.app_context():
+        if get_outfit_table().get_meta('store_version') is None:
+            logger.info("Outfit table not built yet; run precompute_outfits.py --full")
+            return None
+        recommender = get_wardrobe_recommender(WardrobeItem.query.all())
+        report = get_outfit_precomputer().refresh(recommender, added_ids=added_ids, removed_ids=removed_ids)
+        # Results cached while the refresh ran may hold the table's old outfits
+        if _outfit_cache is not None:
+            _outfit_cache.invalidate()
+        logger.info(f"⚡ Outfit table refreshed: {report}")
+        return report
+
+def _refresh_outfit_table_safely(added_ids, removed_ids):
+    try:
+        refresh_outfit_table(added_ids, removed_ids)
+    except Exception as e:
+        logger.warning(f"Outfit table refresh failed: {e}")
+
+def style_card_counts(recommendation_id, style_tags) -> dict:
+    """An item's contribution to the style card: vibe counts plus total_items"""
+    counts = {}
+    if recommendation_id is None or not style_tags:
+        return counts
+    try:
+        tags = json.loads(style_tags)
+    except (json.JSONDecodeError, TypeError):
+        return counts
+    counts['total_items'] = 1
+    for tag in tags:
+        vibe = STYLE_MAPPING.get(tag, DEFAULT_VIBE)
+        counts[vibe] = counts.get(vibe, 0) + 1
+    return counts
+
+def _previous_value(item, attribute):
+    """Value of an attribute before the pending (unflushed) change, if any"""
+    history = db.inspect(item).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(item, attribute)
+
+def _apply_style_card_change(op, item):
+    deltas = {}
+    if op in ('insert', 'update'):
+        for vibe, count in style_card_counts(item.recommendation_id, item.style_tags).items():
+            deltas[vibe] = deltas.get(vibe, 0) + count
+    if op in ('update', 'delete'):
+        previous = style_card_counts(_previous_value(item, 'recommendation_id'), _previous_value(item, 'style_tags'))
+        for vibe, count in previous.items():
+            deltas[vibe] = deltas.get(vibe, 0) - count
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if deltas:
+        # Relative UPDATE, so concurrent writers never overwrite each other's counts
+        StyleCard.query.filter_by(id=1).update(
+            {getattr(StyleCard, column): getattr(StyleCard, column) + delta for column, delta in deltas.items()},
+            synchronize_session=False
         )
 
+def rebuild_style_card():
+    """Recount the style card from scratch (startup, or after out-of-band writes)"""
+    totals = {column: 0 for column in STYLE_CARD_VIBES + ['total_items']}
+    rows = db.session.query(WardrobeItem.recommendation_id, WardrobeItem.style_tags).filter(
+        WardrobeItem.recommendation_id.isnot(None)
+    )
+    for recommendation_id, style_tags in rows:
+        for column, count in style_card_counts(recommendation_id, style_tags).items():
+            totals[column] += count
+    card = db.session.get(StyleCard, 1) or StyleCard(id=1)
+    for column, count in totals.items():
+        setattr(card, column, count)
+    db.session.add(card)
+    db.session.commit()
+
+def record_wardrobe_change(op, item):
+    """Stage a change-log entry and the style card update in the caller's transaction (call before its commit)"""
+    _apply_style_card_change(op, item)
+    if item.id is None:
+        # New rows need their id (and created_at default) first
+        db.session.flush()
+    db.session.add(WardrobeChange(
+        item_id=item.id,
+        op=op,
+        payload=json.dumps(item.to_dict()) if op != 'delete' else None
+    ))
+
+def current_wardrobe_version():
+    """(version, last modified) of the wardrobe: the newest change-log entry"""
+    latest = db.session.query(WardrobeChange.id, WardrobeChange.created_at).order_by(WardrobeChange.id.desc()).first()
+    if latest is None:
+        return 0, None
+    return latest.id, latest.created_at.replace(microsecond=0) if latest.created_at else None
+
+def prune_wardrobe_changes():
+    """Keep only the newest WARDROBE_CHANGE_LOG_MAX change-log entries"""
+    version, _ = current_wardrobe_version()
+    cutoff = version - WARDROBE_CHANGE_LOG_MAX
+    if cutoff > 0:
+        WardrobeChange.query.filter(WardrobeChange.id <= cutoff).delete()
+        db.session.commit()
+
+def on_wardrobe_changed(added_ids=(), removed_ids=()):
+    """Invalidate derived recommendation state after an upload, delete or reclassification"""
+    if _outfit_cache is not None:
+        _outfit_cache.invalidate()
+    if _recommendation_engine is not None:
+        _recommendation_engine.invalidate()
+    if OUTFIT_TABLE_AUTO_REFRESH and (added_ids or removed_ids):
+        threading.Thread(
+            target=_refresh_outfit_table_safely,
+            args=([str(i) for i in added_ids], [str(i) for i in removed_ids]),
+            daemon=True
+        ).start()
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Process-wide background job queue (created on first use)"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                from background_jobs import JobQueue
+                _job_queue = JobQueue(
+                    max_workers=UPLOAD_WORKERS,
+                    max_retries=UPLOAD_JOB_RETRIES,
+                    lanes={'fallback_image': IMAGE_JOB_WORKERS}
+                )
+    return _job_queue
+
+def classification_fields(metadata):
+    """WardrobeItem columns filled from recommendation system metadata"""
+    if not metadata or 'error' in metadata:
+        return {}
+    classification = metadata.get('classification', {})
+    return {
+        'subcategory': metadata.get('subcategory'),
+        'style_tags': json.dumps(classification.get('style_tags', [])),
+        'dominant_color_hex': classification.get('dominant_color_hex'),
+        'emb_index': metadata.get('emb_index'),
+        'recommendation_id': metadata.get('id')
+    }
+
+def classify_wardrobe_item(item_id, image_path, category):
+    """Background job: classify and embed an uploaded item, then store its tags.
+
+    Safe to retry: classification writes nothing, the row update is
+    idempotent, and the recommendation files are only written after the
+    row is committed, keyed by the item id (a rerun replaces them).
+    """
+    # Reuse the warm engine's model instead of starting a CLI process that loads CLIP again
+    engine = get_recommendation_engine()
+    from add_item_cli import classify_items, register_items
+    metadata = classify_items([(image_path, category)], 'wardrobe', data_manager=engine.data_manager,
+                              item_keys=[item_id])[0]
+    if 'error' in metadata:
+        raise RuntimeError(metadata['error'])
+    
+    with app.app_context():
+        item = db.session.get(WardrobeItem, item_id)
+        if item is None:
+            # Deleted while it was being classified
+            return None
+        for field, value in classification_fields(metadata).items():
+            setattr(item, field, value)
+        record_wardrobe_change('update', item)
+        db.session.commit()
+        result = {'item': item.to_dict()}
+    
+    register_items([metadata], data_manager=engine.data_manager)
+    logger.info(f"Recommendation system processing successful: {metadata['id']}")
+    on_wardrobe_changed(added_ids=[item_id])
+    return result
+
+_outbound = None
+_outbound_lock = threading.Lock()
+
+def get_outbound():
+    """Process-wide outbound HTTP client with one provider per upstream API"""
+    global _outbound
+    if _outbound is None:
+        with _outbound_lock:
+            if _outbound is None:
+                from outbound import OutboundClient
+                client = OutboundClient()
+                breaker = {'failure_threshold': OUTBOUND_BREAKER_FAILURES, 'reset_timeout': OUTBOUND_BREAKER_RESET_SECONDS}
+                client.register('deepai', max_concurrency=OUTBOUND_MAX_CONCURRENCY['deepai'],
+                                timeout=(OUTBOUND_CONNECT_TIMEOUT, DEEPAI_TIMEOUT), **breaker)
+                client.register('gemini', max_concurrency=OUTBOUND_MAX_CONCURRENCY['gemini'],
+                                timeout=(OUTBOUND_CONNECT_TIMEOUT, GEMINI_TIMEOUT), **breaker)
+                client.register('holidays', max_concurrency=OUTBOUND_MAX_CONCURRENCY['holidays'],
+                                timeout=(OUTBOUND_CONNECT_TIMEOUT, 10), **breaker)
+                _outbound = client
+    return _outbound
+
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+
+def get_gemini_client():
+    """Process-wide Gemini client with response cache (created on first use)"""
+    global _gemini_client
+    if _gemini_client is None:
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                from gemini_client import GeminiClient
+                _gemini_client = GeminiClient(
+                    api_key=os.getenv('GEMINI_API_KEY'),
+                    model=GEMINI_STYLIST_MODEL,
+                    api_base=GOOGLE_API_BASE,
+                    cache_size=GEMINI_CACHE_SIZE,
+                    cache_dir=GEMINI_CACHE_DIR or None,
+                    cache_ttl_seconds=GEMINI_CACHE_TTL_HOURS * 3600,
+                    session=get_outbound().provider('gemini')
+                )
+    return _gemini_client
+
+STYLIST_SYSTEM_INSTRUCTIONS = (
+    "You are a world-class fashion stylist and image consultant. "
+    "Respond with chic, wearable, context-appropriate looks. "
+    "Break your answer into sections with these exact headings: "
+    "Outfit, Accessories, Shoes, Hairstyle/Makeup, Style Inspiration. "
+    "Keep language stylish and modern. Draw inspiration from Bollywood, Hollywood, top influencers, and recent fashion trends. "
+    "Avoid context mismatches (e.g., no saree for beach, no heavy boots for summer)."
+)
+
+def _call_gemini_text_api(user_prompt: str) -> str:
+    """Call Gemini text model to get a structured outfit suggestion."""
+    try:
         full_prompt = (
-            f"System: {system_instructions}\n\n"
+            f"System: {STYLIST_SYSTEM_INSTRUCTIONS}\n\n"
             f"User vibe/look: {user_prompt}\n\n"
             "Output format example (adapt the items to the user request):\n"
             "✨ Inspired by <reference>.\n"
@@ -180,13 +900,8 @@ def _call_gemini_text_api(user_prompt: str) -> str:
             "- Style Inspiration: <names/looks>\n"
         )
         
-        # Generate content
-        response = model.generate_content(full_prompt)
-        description = response.text.strip()
-        
-        if not description:
-            raise ValueError("Empty description from model")
-        return description
+        # Prompts differing only in case/whitespace share one cached (or in-flight) response
+        return get_gemini_client().generate(full_prompt, cache_key=user_prompt)
         
     except Exception as e:
         logger.error(f"Failed to generate text with Gemini: {e}")
@@ -210,7 +925,7 @@ def _call_deepai_image_api(prompt: str) -> str:
             return None
         
         # DeepAI API endpoint
-        url = "https://api.deepai.org/api/text2img"
+        url = f"{DEEPAI_API_BASE}/text2img"
         
         # Headers with API key
         headers = {
@@ -224,8 +939,8 @@ def _call_deepai_image_api(prompt: str) -> str:
         
         logger.info(f"Calling DeepAI with prompt: {prompt[:100]}...")
         
-        # Make the request
-        response = requests.post(url, headers=headers, data=data, timeout=60)
+        # Pooled, circuit-broken request (fails fast while DeepAI is down)
+        response = get_outbound().provider('deepai').post(url, headers=headers, data=data)
         response.raise_for_status()
         
         # Parse JSON response
@@ -290,24 +1005,13 @@ def _create_explicit_outfit(seed_item_id: str, wardrobe_df: pd.DataFrame) -> dic
             "Colors and styles are harmoniously balanced"
         ]
         
-        # Create outfit collage path (we'll generate this)
-        outfit_id = f"explicit_outfit_{seed_item_id}_{int(time.time())}"
-        collage_path = f"recommendation_system/data/output/outfits/{outfit_id}.jpg"
-        
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(collage_path), exist_ok=True)
-        
-        # For now, we'll use a placeholder or the first item's image as the outfit image
-        # In a real implementation, you would create a collage here
-        if paired_items:
-            # Use the first item's image as the outfit image
-            first_item_image = paired_items[0].get('image_url', '')
-            if first_item_image and first_item_image.startswith('http://localhost:5000'):
-                # Copy the first item's image to the outfit path
-                import shutil
-                source_path = first_item_image.replace('http://localhost:5000', '/Users/mishtyverma/closet-twin-style-6/backend')
-                if os.path.exists(source_path):
-                    shutil.copy2(source_path, collage_path)
+        # Collage of the paired items; rendered once per content and reused
+        # from the collage cache on later requests
+        outfit_id = f"explicit_outfit_{seed_item_id}"
+        collage_renderer = get_collage_renderer()
+        collage_path = collage_renderer.url_for(
+            collage_renderer.register(paired_items, image_base_dir=app.config['UPLOAD_FOLDER'])
+        )
         
         # Create outfit object - only return one outfit
         outfit = {
@@ -369,13 +1073,23 @@ def _create_fashion_placeholder(image_prompt: str) -> bytes:
         # Return a minimal fallback
         return base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==')
 
-def _save_generated_image(image_bytes: bytes) -> str:
-    """Save image bytes to uploads and return public URL path."""
-    unique_filename = f"{uuid.uuid4()}.png"
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-    with open(file_path, 'wb') as f:
-        f.write(image_bytes)
-    return f"/uploads/{unique_filename}"
+_placeholder_cache = None
+_placeholder_cache_lock = threading.Lock()
+
+def get_placeholder_cache():
+    """Process-wide placeholder image cache (created on first use)"""
+    global _placeholder_cache
+    if _placeholder_cache is None:
+        with _placeholder_cache_lock:
+            if _placeholder_cache is None:
+                from placeholder_cache import PlaceholderCache
+                _placeholder_cache = PlaceholderCache(
+                    _create_fashion_placeholder,
+                    cache_dir=PLACEHOLDER_CACHE_DIR or None,
+                    memory_entries=PLACEHOLDER_MEMORY_ENTRIES,
+                    max_bytes=PLACEHOLDER_CACHE_MAX_MB * 1024 * 1024
+                )
+    return _placeholder_cache
 
 # API Routes
 @app.route('/api/wardrobe/upload', methods=['POST'])
@@ -399,20 +1113,10 @@ def upload_wardrobe_item():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Allowed types: png, jpg, jpeg, gif, webp'}), 400
         
-        # Normalize category (handle singular/plural variations)
-        category_mapping = {
-            'dress': 'dresses',
-            'top': 'tops', 
-            'bottom': 'bottoms',
-            'accessory': 'accessories',
-            'shoe': 'shoes'
-        }
-        normalized_category = category_mapping.get(category, category)
-        
-        # Validate category
-        valid_categories = ['dresses', 'accessories', 'tops', 'bottoms', 'shoes']
-        if normalized_category not in valid_categories:
-            return jsonify({'error': f'Invalid category. Must be one of: {", ".join(valid_categories)}'}), 400
+        # Normalize and validate category (handle singular/plural variations)
+        normalized_category = normalize_category(category)
+        if normalized_category is None:
+            return jsonify({'error': f'Invalid category. Must be one of: {", ".join(VALID_CATEGORIES)}'}), 400
         
         # Use normalized category
         category = normalized_category
@@ -424,94 +1128,323 @@ def upload_wardrobe_item():
         
         # Get full path to the uploaded file for recommendation system processing
         full_image_path = os.path.join(os.getcwd(), image_url.lstrip('/'))
-        logger.info(f"Full image path: {full_image_path}")
-        logger.info(f"File exists: {os.path.exists(full_image_path)}")
-        
-        # Process with recommendation system (optional)
-        recommendation_metadata = None
-        try:
-            # Call the recommendation system CLI
-            cli_path = os.path.join(os.getcwd(), 'recommendation_system', 'add_item_cli.py')
-            cmd = [
-                'python3', cli_path,
-                '--file', full_image_path,
-                '--main_category', category,
-                '--source', 'wardrobe'
-            ]
-            
-            logger.info(f"Calling recommendation system CLI: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            logger.info(f"CLI return code: {result.returncode}")
-            logger.info(f"CLI stdout: {result.stdout}")
-            logger.info(f"CLI stderr: {result.stderr}")
-            
-            # Parse the JSON response (extract JSON from the end of output)
-            if result.returncode == 0:
-                # Find the JSON part (it should be the last line)
-                lines = result.stdout.strip().split('\n')
-                json_line = None
-                for line in reversed(lines):
-                    if line.strip().startswith('{'):
-                        json_line = line.strip()
-                        break
-                
-                if json_line:
-                    cli_output = json.loads(json_line)
-                    if cli_output['status'] == 'ok':
-                        recommendation_metadata = cli_output['metadata']
-                        logger.info(f"Recommendation system processing successful: {recommendation_metadata['id']}")
-                    else:
-                        logger.warning(f"Recommendation system processing failed: {cli_output.get('error', 'Unknown error')}")
-                else:
-                    logger.warning("No JSON found in CLI output")
-            else:
-                logger.warning(f"CLI failed with return code {result.returncode}")
-                
-        except subprocess.TimeoutExpired:
-            logger.warning("Recommendation system CLI timed out")
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"Recommendation system CLI failed: {e.stderr}")
-        except Exception as e:
-            logger.warning(f"Error calling recommendation system: {e}")
-            # Continue without recommendation system processing
         
-        # Create database record
+        # Create database record now; tags arrive from the background job
         try:
             wardrobe_item = WardrobeItem(
                 image_url=image_url,
-                category=category,
-                subcategory=recommendation_metadata.get('subcategory') if recommendation_metadata else None,
-                style_tags=json.dumps(recommendation_metadata.get('classification', {}).get('style_tags', [])) if recommendation_metadata else None,
-                dominant_color_hex=recommendation_metadata.get('classification', {}).get('dominant_color_hex') if recommendation_metadata else None,
-                emb_index=recommendation_metadata.get('emb_index') if recommendation_metadata else None,
-                recommendation_id=recommendation_metadata.get('id') if recommendation_metadata else None
+                category=category
             )
             db.session.add(wardrobe_item)
+            record_wardrobe_change('insert', wardrobe_item)
             db.session.commit()
-            
-            logger.info(f"Successfully saved wardrobe item: {wardrobe_item.id}")
-            return jsonify(wardrobe_item.to_dict()), 201
-            
+            # Caches only: the outfit table picks the item up once the job has tagged it
+            on_wardrobe_changed()
         except Exception as db_error:
             db.session.rollback()
             logger.error(f"Database error: {str(db_error)}")
             return jsonify({'error': 'Failed to save item to database'}), 500
+        
+        # Classification and embedding run on the background worker pool
+        job_id = get_job_queue().submit('classify', classify_wardrobe_item, wardrobe_item.id, full_image_path, category)
+        logger.info(f"Saved wardrobe item {wardrobe_item.id}; classification queued as job {job_id}")
+        
+        response = wardrobe_item.to_dict()
+        response.update({
+            'job_id': job_id,
+            'status_url': f"/api/jobs/{job_id}",
+            'events_url': f"/api/jobs/events?job_id={job_id}"
+        })
+        return jsonify(response), 202
             
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         return jsonify({'error': 'Internal server error during upload'}), 500
 
+@app.route('/api/wardrobe/bulk-upload', methods=['POST'])
+def bulk_upload_wardrobe_items():
+    """Upload many items at once: one batched classification pass and one DB transaction.
+    
+    Files go in the 'images' field; categories either as one 'categories'
+    value per file (same order) or a single 'category' for all of them.
+    Items that could not be classified in the batch get a background
+    classification job (job_id in their result), as single uploads do.
+    """
+    start = time.time()
+    files = request.files.getlist('images')
+    if not files:
+        return jsonify({'error': 'No image files provided'}), 400
+    if len(files) > BULK_UPLOAD_MAX_FILES:
+        return jsonify({'error': f'Too many files. Maximum is {BULK_UPLOAD_MAX_FILES} per request'}), 400
+    
+    categories = request.form.getlist('categories')
+    default_category = request.form.get('category')
+    
+    # Save every valid file (werkzeug has already spooled the parts to disk)
+    results = []
+    accepted = []  # (result index, image_url, full path, category)
+    for i, file in enumerate(files):
+        result = {'index': i, 'filename': file.filename, 'status': 'failed'}
+        results.append(result)
+        category = normalize_category(categories[i] if i < len(categories) else default_category)
+        if not file.filename or not allowed_file(file.filename):
+            result['error'] = 'Invalid file type. Allowed types: png, jpg, jpeg, gif, webp'
+            continue
+        if category is None:
+            result['error'] = f'Invalid category. Must be one of: {", ".join(VALID_CATEGORIES)}'
+            continue
+        image_url = save_uploaded_file(file)
+        if not image_url:
+            result['error'] = 'Failed to save image file'
+            continue
+        full_image_path = os.path.join(os.getcwd(), image_url.lstrip('/'))
+        if os.path.getsize(full_image_path) > MAX_FILE_SIZE:
+            os.remove(full_image_path)
+            result['error'] = 'File too large. Maximum size is 16MB'
+            continue
+        accepted.append((i, image_url, full_image_path, category))
+    
+    # One batched CLIP pass over everything that was saved (nothing is written yet)
+    metadata = [None] * len(accepted)
+    engine = None
+    if accepted:
+        try:
+            engine = get_recommendation_engine()
+            from add_item_cli import classify_items
+            metadata = classify_items(
+                [(path, category) for _, _, path, category in accepted],
+                'wardrobe',
+                data_manager=engine.data_manager
+            )
+        except Exception as e:
+            logger.warning(f"Bulk classification failed, saving items without tags: {e}")
+    
+    # One transaction for all rows
+    items = []
+    try:
+        for (_, image_url, _, category), item_metadata in zip(accepted, metadata):
+            items.append(WardrobeItem(image_url=image_url, category=category, **classification_fields(item_metadata)))
+        db.session.add_all(items)
+        db.session.flush()
+        for item, item_metadata in zip(items, metadata):
+            if classification_fields(item_metadata):
+                # Registered under the row id, like the single-upload job
+                from add_item_cli import keyed_item_id
+                item_metadata['id'] = item.recommendation_id = keyed_item_id(item.id)
+            record_wardrobe_change('insert', item)
+        db.session.commit()
+    except Exception as db_error:
+        db.session.rollback()
+        logger.error(f"Bulk upload database error: {db_error}")
+        for _, _, path, _ in accepted:
+            if os.path.exists(path):
+                os.remove(path)
+        return jsonify({'error': 'Failed to save items to database'}), 500
+    
+    # Recommendation files are written only for committed rows
+    classified = [bool(classification_fields(item_metadata)) for item_metadata in metadata]
+    if any(classified):
+        try:
+            from add_item_cli import register_items
+            registered = register_items([m for m, ok in zip(metadata, classified) if ok], data_manager=engine.data_manager)
+            registered_ok = iter([r is not None and 'error' not in r for r in registered])
+            classified = [ok and next(registered_ok) for ok in classified]
+        except Exception as e:
+            logger.warning(f"Bulk registration failed, queueing classification jobs: {e}")
+            classified = [False] * len(classified)
+    
+    for (i, _, path, category), item, item_classified in zip(accepted, items, classified):
+        results[i].update({
+            'status': 'created',
+            'classified': item_classified,
+            'item': item.to_dict()
+        })
+        if not item_classified:
+            # Tagged later by the same background job a single upload uses
+            job_id = get_job_queue().submit('classify', classify_wardrobe_item, item.id, path, category)
+            results[i].update({
+                'job_id': job_id,
+                'status_url': f"/api/jobs/{job_id}",
+                'events_url': f"/api/jobs/events?job_id={job_id}"
+            })
+    if items:
+        # Items left to a classification job are announced when the job finishes
+        on_wardrobe_changed(added_ids=[item.id for item, ok in zip(items, classified) if ok])
+    
+    elapsed = round(time.time() - start, 3)
+    logger.info(f"📦 Bulk upload: {len(items)}/{len(files)} items saved in {elapsed}s")
+    return jsonify({
+        'results': results,
+        'created': len(items),
+        'failed': len(files) - len(items),
+        'seconds': elapsed
+    }), 201 if items else 400
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Status (and result once finished) of a background job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs/events', methods=['GET'])
+def stream_job_events():
+    """Server-sent events for job updates (optionally a single ?job_id=, closed once it finishes)"""
+    job_id = request.args.get('job_id')
+    job_queue = get_job_queue()
+    events = job_queue.subscribe()
+    
+    def format_event(job):
+        return f"event: job\ndata: {json.dumps(job, default=str)}\n\n"
+    
+    def stream():
+        try:
+            if job_id:
+                job = job_queue.get(job_id)
+                if job is None:
+                    yield f"event: error\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+                    return
+                # Current state first, in case the job finished before we subscribed
+                yield format_event(job)
+                if job['status'] in ('succeeded', 'failed'):
+                    return
+            while True:
+                try:
+                    job = events.get(timeout=15)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if job_id and job['id'] != job_id:
+                    continue
+                yield format_event(job)
+                if job_id and job['status'] in ('succeeded', 'failed'):
+                    return
+        finally:
+            job_queue.unsubscribe(events)
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+WARDROBE_FIELDS = (
+    'id', 'image_url', 'category', 'subcategory', 'style_tags', 'dominant_color_hex',
+    'emb_index', 'recommendation_id', 'created_at'
+)
+
+def _encode_wardrobe_cursor(created_at, item_id) -> str:
+    raw = f"{created_at.isoformat() if created_at else ''}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _decode_wardrobe_cursor(cursor: str):
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    created_at, item_id = raw.split('|')
+    return (datetime.fromisoformat(created_at) if created_at else None), int(item_id)
+
 @app.route('/api/wardrobe', methods=['GET'])
 def get_wardrobe_items():
-    """Get all wardrobe items"""
+    """Get wardrobe items, newest first
+    
+    Optional query parameters: limit and cursor for keyset pagination on
+    (created_at, id) (the next cursor is returned in X-Next-Cursor) and
+    fields=id,image_url,... to project columns. Responses carry an ETag and
+    Last-Modified tied to the change-log version, so unchanged closets get a 304.
+    """
     try:
-        items = WardrobeItem.query.order_by(WardrobeItem.created_at.desc()).all()
-        return jsonify([item.to_dict() for item in items]), 200
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(WARDROBE_FIELDS)
+        unknown = [f for f in fields if f not in WARDROBE_FIELDS]
+        if unknown:
+            return jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400
+        
+        limit = request.args.get('limit', type=int)
+        if limit is not None and not 1 <= limit <= WARDROBE_PAGE_MAX:
+            return jsonify({'error': f'limit must be between 1 and {WARDROBE_PAGE_MAX}'}), 400
+        cursor = request.args.get('cursor')
+        try:
+            after = _decode_wardrobe_cursor(cursor) if cursor else None
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # Answer revalidations from the change-log version (one primary key lookup)
+        version, last_modified = current_wardrobe_version()
+        etag = hashlib.sha1(f"{version}:{request.query_string.decode()}".encode()).hexdigest()[:20]
+        if request.if_none_match.contains_weak(etag) or (
+            not request.if_none_match and request.if_modified_since and last_modified
+            and request.if_modified_since.replace(tzinfo=None) >= last_modified
+        ):
+            response = app.response_class(status=304)
+        else:
+            # Plain column tuples: no ORM objects for the whole closet
+            selected = list(dict.fromkeys(fields + ['created_at', 'id']))
+            query = db.session.query(*[getattr(WardrobeItem, f) for f in selected]).order_by(
+                WardrobeItem.created_at.desc(), WardrobeItem.id.desc()
+            )
+            if after is not None:
+                created_at, item_id = after
+                query = query.filter(db.or_(
+                    WardrobeItem.created_at < created_at,
+                    db.and_(WardrobeItem.created_at == created_at, WardrobeItem.id < item_id)
+                ))
+            rows = query.limit(limit + 1).all() if limit else query.all()
+            next_cursor = None
+            if limit and len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = _encode_wardrobe_cursor(rows[-1].created_at, rows[-1].id)
+            
+            items = []
+            for row in rows:
+                item = {f: getattr(row, f) for f in fields}
+                if 'created_at' in item:
+                    item['created_at'] = item['created_at'].isoformat() if item['created_at'] else None
+                items.append(item)
+            response = jsonify(items)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+        
+        # Weak: the gzip and identity encodings of the same list share the tag
+        response.set_etag(etag, weak=True)
+        # Starting point for delta sync through /api/wardrobe/changes
+        response.headers['X-Wardrobe-Version'] = str(version)
+        if last_modified:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         logger.error(f"Error retrieving wardrobe items: {str(e)}")
         return jsonify({'error': 'Failed to retrieve wardrobe items'}), 500
 
+@app.route('/api/wardrobe/changes', methods=['GET'])
+def get_wardrobe_changes():
+    """Wardrobe mutations after ?since=<version>, oldest first
+    
+    Apply the changes in order and pass the returned version as the next
+    since. When has_more is set, call again right away. reset means since is
+    older than the retained log: refetch /api/wardrobe and continue from
+    the returned version.
+    """
+    since = request.args.get('since', default=0, type=int)
+    limit = min(request.args.get('limit', default=WARDROBE_CHANGES_PAGE, type=int), WARDROBE_CHANGES_PAGE)
+    if since < 0 or limit < 1:
+        return jsonify({'error': 'since must be >= 0 and limit >= 1'}), 400
+    try:
+        version, _ = current_wardrobe_version()
+        oldest = db.session.query(db.func.min(WardrobeChange.id)).scalar()
+        if since > version or (oldest is not None and since < oldest - 1):
+            return jsonify({'version': version, 'changes': [], 'has_more': False, 'reset': True}), 200
+        
+        changes = WardrobeChange.query.filter(WardrobeChange.id > since).order_by(WardrobeChange.id).limit(limit + 1).all()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return jsonify({
+            'version': changes[-1].id if changes else since,
+            'changes': [change.to_dict() for change in changes],
+            'has_more': has_more,
+            'reset': False
+        }), 200
+    except Exception as e:
+        logger.error(f"Error retrieving wardrobe changes: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve wardrobe changes'}), 500
+
 @app.route('/api/wardrobe/<int:item_id>', methods=['DELETE'])
 def delete_wardrobe_item(item_id):
     """Delete a specific wardrobe item"""
@@ -524,8 +1457,10 @@ def delete_wardrobe_item(item_id):
             if os.path.exists(image_path):
                 os.remove(image_path)
         
+        record_wardrobe_change('delete', item)
         db.session.delete(item)
         db.session.commit()
+        on_wardrobe_changed(removed_ids=[item_id])
         
         return jsonify({'message': 'Item deleted successfully'}), 200
         
@@ -533,6 +1468,58 @@ def delete_wardrobe_item(item_id):
         logger.error(f"Error deleting item {item_id}: {str(e)}")
         return jsonify({'error': 'Failed to delete item'}), 500
 
+def _generate_curated_outfits(db_items, seed_item_ids, occasion='casual'):
+    """Curated outfit for a single seed item: explicit rule first, then the precomputed table"""
+    # Convert database items to the format expected by recommendation system
+    user_wardrobe_df = build_wardrobe_dataframe(db_items)
+    logger.info(f"📊 Created DataFrame with {len(user_wardrobe_df)} items")
+    
+    outfits = []
+    if seed_item_ids and len(seed_item_ids) == 1:
+        # Single seed item - use hardcoded rules
+        seed_id = str(seed_item_ids[0])
+        explicit_outfit = _create_explicit_outfit(seed_id, user_wardrobe_df)
+        if explicit_outfit:
+            outfits = [explicit_outfit]
+            logger.info(f"✅ Using hardcoded outfit rule for seed item {seed_id}")
+        else:
+            # Single indexed read of the outfits precomputed for this seed; until the
+            # background refresh after a delete finishes, skip outfits that use removed items
+            wardrobe_ids = {str(item.id) for item in db_items}
+            outfits = [
+                outfit for outfit in get_outfit_table().get(seed_id, occasion)
+                if all(str(item.get('id')) in wardrobe_ids for item in outfit.get('items', []))
+            ]
+            if outfits:
+                logger.info(f"✅ Using precomputed outfits for seed item {seed_id}")
+            else:
+                logger.warning(f"⚠️ No hardcoded rule or precomputed outfit for {seed_id}")
+    else:
+        logger.warning("⚠️ No single seed item provided for hardcoded rules")
+    
+    return outfits
+
+def _generate_prompt_outfits(db_items, user_prompt, occasion='casual', num_outfits=1):
+    """Outfits seeded by the wardrobe items whose images best match the prompt"""
+    engine = get_recommendation_engine()
+    wardrobe_df = build_recommender_dataframe(db_items)
+    matches = engine.rank_by_prompt(user_prompt, wardrobe_df, wardrobe_fingerprint(db_items))
+    
+    # Seed with the best wardrobe match; catalog matches are returned as suggestions
+    wardrobe_matches = [
+        match for ranked in matches.values() for match in ranked
+        if match['source'] == 'wardrobe' and match['score'] >= PROMPT_MIN_SIMILARITY
+    ]
+    if not wardrobe_matches:
+        logger.warning(f"⚠️ No wardrobe item matches the prompt well enough: {user_prompt}")
+        return [], matches
+    seed = max(wardrobe_matches, key=lambda match: match['score'])
+    logger.info(f"🔎 Prompt matched wardrobe item {seed['id']} ({seed['score']:.3f})")
+    
+    recommender = get_wardrobe_recommender(db_items)
+    outfits = recommender.recommend_outfits(seed_item_ids=[seed['id']], occasion=occasion, num_outfits=num_outfits)
+    return outfits, matches
+
 @app.route('/api/stylist/generate', methods=['POST'])
 def generate_stylist_recommendation():
     """Generate outfit recommendations using the integrated recommendation system."""
@@ -562,70 +1549,26 @@ def generate_stylist_recommendation():
             
             logger.info(f"📊 Found {len(db_items)} user wardrobe items")
             
-            # Convert database items to the format expected by recommendation system
-            import pandas as pd
-            
-            wardrobe_data = []
-            for item in db_items:
-                wardrobe_data.append({
-                    'id': str(item.id),  # Convert to string for consistency
-                    'category': item.category,
-                    'subcategory': item.subcategory or 'unknown',
-                    'color': item.dominant_color_hex or 'unknown',
-                    'style_tags': item.style_tags or ['casual'],
-                    'image_url': item.image_url,
-                    'description': f"{item.category} item",
-                    'filename': item.image_url.split('/')[-1] if item.image_url else None
-                })
-            
-            # Create DataFrame from user data
-            user_wardrobe_df = pd.DataFrame(wardrobe_data)
-            logger.info(f"📊 Created DataFrame with {len(user_wardrobe_df)} items")
-            
-            # Use recommendation system directly
-            from generate_outfit_adapter import RobustDataManager, RobustOutfitRecommender
-            import os
-            
-            raw_dir = 'recommendation_system/data/raw'
-            processed_dir = 'recommendation_system/data/processed'
-            output_dir = 'recommendation_system/data/output'
-            
-            logger.info("📊 Initializing recommendation system...")
-            
-            data_manager = RobustDataManager(
-                raw_dir=raw_dir,
-                processed_dir=processed_dir,
-                output_dir=output_dir
+            # Repeated seed/occasion requests for an unchanged wardrobe are served from the cache
+            outfit_cache = get_outfit_cache()
+            cache_key = outfit_cache.make_key(
+                f"curated:{wardrobe_fingerprint(db_items)}", seed_item_ids or [], occasion, num_outfits
             )
-            
-            logger.info("📊 Generating embeddings...")
-            embedding_index = data_manager.generate_embeddings(user_wardrobe_df, pd.DataFrame(columns=['id', 'category', 'subcategory', 'color', 'style_tags', 'image_url', 'description']))
-            
-            logger.info("📊 Initializing recommender...")
-            recommender = RobustOutfitRecommender(
-                wardrobe_df=user_wardrobe_df,
-                catalog_df=pd.DataFrame(columns=['id', 'category', 'subcategory', 'color', 'style_tags', 'image_url', 'description']),
-                embedding_index=embedding_index,
-                image_base_dir=raw_dir,
-                output_dir=output_dir
-            )
-            
-            # Use hardcoded outfit rules only
-            outfits = []
-            if seed_item_ids and len(seed_item_ids) == 1:
-                # Single seed item - use hardcoded rules
-                seed_id = seed_item_ids[0]
-                explicit_outfit = _create_explicit_outfit(seed_id, user_wardrobe_df)
-                if explicit_outfit:
-                    outfits = [explicit_outfit]
-                    logger.info(f"✅ Using hardcoded outfit rule for seed item {seed_id}")
-                else:
-                    logger.warning(f"⚠️ No hardcoded rule found for {seed_id}")
-                    # Return empty outfit if no rule found
-                    outfits = []
+            outfits = outfit_cache.get(cache_key)
+            if outfits is None:
+                outfits = _generate_curated_outfits(db_items, seed_item_ids, occasion)
+                if outfits:
+                    outfit_cache.put(cache_key, outfits)
             else:
-                logger.warning("⚠️ No single seed item provided for hardcoded rules")
-                outfits = []
+                logger.info("⚡ Served curated outfit from recommendation cache")
+            
+            # No curated outfit: retrieve wardrobe items for the prompt itself before asking Gemini
+            prompt_matches = None
+            if not outfits:
+                try:
+                    outfits, prompt_matches = _generate_prompt_outfits(db_items, user_prompt, occasion)
+                except Exception as e:
+                    logger.warning(f"Prompt retrieval failed: {e}")
             
             if outfits:
                 # Convert outfits to the expected format - only one outfit
@@ -637,6 +1580,13 @@ def generate_stylist_recommendation():
                     if item.get('image_url') and item['image_url'].startswith('/uploads/'):
                         item['image_url'] = f"http://localhost:5000{item['image_url']}"
                 
+                if prompt_matches is not None:
+                    engine_name = 'prompt_retrieval'
+                elif outfit.get('is_explicit'):
+                    engine_name = 'hardcoded_rules'
+                else:
+                    engine_name = 'precomputed_outfits'
+                
                 formatted_outfit = {
                     'id': 'outfit_1',
                     'title': 'Curated Look',
@@ -644,14 +1594,14 @@ def generate_stylist_recommendation():
                     'occasion': occasion,
                     'score': outfit.get('score', 0.95),
                     'items': items,
-                    'image_url': outfit.get('image_path'),
+                    'image_url': f"http://localhost:5000{outfit['image_path']}" if (outfit.get('image_path') or '').startswith('/api/') else outfit.get('image_path'),
                     'styling_tips': outfit.get('styling_tips', [])
                 }
                 formatted_outfits = [formatted_outfit]
                 
                 result = {
                     'success': True,
-                    'description': f"Curated outfit combination based on your selected item",
+                    'description': f"Outfit from your wardrobe for: {user_prompt}" if prompt_matches is not None else f"Curated outfit combination based on your selected item",
                     'image_url': None,
                     'outfits': formatted_outfits,
                     'total_outfits': 1,
@@ -660,9 +1610,11 @@ def generate_stylist_recommendation():
                     'generated_at': datetime.now().isoformat(),
                     'metadata': {
                         'system_version': '1.0.0',
-                        'recommendation_engine': 'hardcoded_rules'
+                        'recommendation_engine': engine_name
                     }
                 }
+                if prompt_matches is not None:
+                    result['metadata']['prompt_matches'] = prompt_matches
                 
                 logger.info("✅ Successfully generated hardcoded outfit combination")
             else:
@@ -716,6 +1668,28 @@ def generate_stylist_recommendation():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+def generate_fallback_image(description: str) -> dict:
+    """Background job: DeepAI image for a stylist description, or a styled placeholder"""
+    # Build a clean image prompt from the outfit description
+    image_prompt = _build_image_prompt_from_description(description)
+    
+    try:
+        # DeepAI returns a direct URL, so we can use it directly
+        image_url = _call_deepai_image_api(image_prompt)
+    except Exception as e:
+        logger.error(f"Image generation failed: {e}")
+        image_url = None
+    
+    if image_url:
+        logger.info(f"Successfully generated image with DeepAI: {image_url}")
+        return {'image_url': image_url, 'source': 'deepai'}
+    
+    # Fallback to styled placeholder if DeepAI fails
+    logger.warning("DeepAI image generation failed, creating placeholder")
+    image_url = get_placeholder_cache().get_or_render(image_prompt)
+    logger.info(f"Using placeholder image: {image_url}")
+    return {'image_url': image_url, 'source': 'placeholder'}
+
 def _fallback_gemini_generation(user_prompt: str):
     """Fallback to original Gemini-based generation when adapter fails"""
     try:
@@ -731,34 +1705,16 @@ def _fallback_gemini_generation(user_prompt: str):
             logger.error(f"Failed to generate text: {text_error}")
             return jsonify({'error': 'Gemini API request failed'}), 500
 
-        # Generate reference image using DeepAI
-        image_url = None
-        try:
-            # Build a clean image prompt from the outfit description
-            image_prompt = _build_image_prompt_from_description(description)
-            
-            # Call DeepAI for image generation
-            deepai_image_url = _call_deepai_image_api(image_prompt)
-            
-            if deepai_image_url:
-                # DeepAI returns a direct URL, so we can use it directly
-                image_url = deepai_image_url
-                logger.info(f"Successfully generated image with DeepAI: {image_url}")
-            else:
-                # Fallback to styled placeholder if DeepAI fails
-                logger.warning("DeepAI image generation failed, creating placeholder")
-                image_bytes = _create_fashion_placeholder(image_prompt)
-                image_url = _save_generated_image(image_bytes)
-                logger.info(f"Created fallback image: {image_url}")
-                
-        except Exception as image_error:
-            logger.error(f"Image generation failed: {image_error}")
-            # Continue without image - don't crash the server
+        # The reference image (DeepAI, or a placeholder) follows through the job endpoints
+        job_id = get_job_queue().submit('fallback_image', generate_fallback_image, description)
+        logger.info(f"Gemini description ready; image queued as job {job_id}")
 
-        # Return response
         return jsonify({
             'description': description,
-            'image_url': image_url,
+            'image_url': None,
+            'image_job_id': job_id,
+            'image_status_url': f"/api/jobs/{job_id}",
+            'image_events_url': f"/api/jobs/events?job_id={job_id}",
             'outfits': [],
             'total_outfits': 0,
             'success': True,
@@ -769,194 +1725,203 @@ def _fallback_gemini_generation(user_prompt: str):
         logger.error(f"Fallback generation failed: {e}")
         return jsonify({'error': 'All generation methods failed'}), 500
 
+_holiday_provider = None
+_holiday_provider_lock = threading.Lock()
+
+def get_holiday_provider():
+    """Process-wide holiday calendar (created on first use)"""
+    global _holiday_provider
+    if _holiday_provider is None:
+        with _holiday_provider_lock:
+            if _holiday_provider is None:
+                from holiday_calendar import HolidayProvider
+                provider = HolidayProvider(
+                    api_base=HOLIDAY_API_BASE,
+                    country=HOLIDAY_COUNTRY,
+                    cache_dir=HOLIDAY_CACHE_DIR,
+                    ttl_seconds=HOLIDAY_CACHE_TTL_HOURS * 3600,
+                    http=get_outbound().provider('holidays')
+                )
+                # New holiday data invalidates today's precomputed trending response
+                provider.on_refresh(lambda year: _invalidate_trending())
+                _holiday_provider = provider
+    return _holiday_provider
+
+_trending_cache = {}
+_trending_lock = threading.Lock()
+
+def _invalidate_trending():
+    with _trending_lock:
+        _trending_cache.clear()
+
+def build_trending_payload(today):
+    """Trending styles for a day: the always-on styles plus holidays in the next 3 weeks"""
+    three_weeks_from_now = today + timedelta(weeks=3)
+    trending_styles = [dict(style, date=today.strftime('%Y-%m-%d')) for style in TRENDING_BASE_STYLES]
+    
+    # Holidays come from memory/disk; stale years refresh in the background
+    provider = get_holiday_provider()
+    holidays = []
+    for year in sorted({today.year, three_weeks_from_now.year}):
+        holidays.extend(provider.holidays(year))
+    
+    # Add holiday styles (up to 4 more to ensure 3+ total)
+    holiday_count = 0
+    for holiday in holidays:
+        if holiday_count >= 4:  # Limit to 4 holiday styles
+            break
+        try:
+            holiday_date = datetime.strptime(holiday['date'], '%Y-%m-%d')
+        except (KeyError, ValueError):
+            continue
+        holiday_name = holiday.get('name')
+        if not today.date() <= holiday_date.date() <= three_weeks_from_now.date() or holiday_name not in HOLIDAY_STYLE_MAPPING:
+            continue
+        style = HOLIDAY_STYLE_MAPPING[holiday_name]
+        trending_styles.append({
+            "id": style["id"],
+            "title": style["title"],
+            "emoji": style["emoji"],
+            "description": style["description"],
+            "defaultPieces": style["defaultPieces"],
+            "category": "festival",
+            "holiday": holiday_name,
+            "date": holiday['date'],
+            "season": style["season"],
+            "occasion": style["occasion"]
+        })
+        holiday_count += 1
+    
+    return {
+        'styles': trending_styles[:5],  # Limit to 5 styles max
+        'total': len(trending_styles),
+        'timestamp': datetime.now().isoformat()
+    }
+
+def get_trending_payload():
+    """Trending response, computed once per day (or again after a holiday refresh)"""
+    today = datetime.now()
+    key = today.strftime('%Y-%m-%d')
+    with _trending_lock:
+        payload = _trending_cache.get(key)
+    if payload is None:
+        payload = build_trending_payload(today)
+        with _trending_lock:
+            _trending_cache.clear()
+            _trending_cache[key] = payload
+    return payload
+
 @app.route('/api/trending', methods=['GET'])
 def get_trending_styles():
     """Get trending styles based on holidays and seasons - always returns 3+ styles"""
     try:
-        import requests
-        from datetime import datetime, timedelta
-        
-        # Get current date and next 3 weeks
-        today = datetime.now()
-        three_weeks_from_now = today + timedelta(weeks=3)
-        
-        trending_styles = []
-        
-        # 1. Always add specific trending styles: Navratri, Diwali, Autumn
-        trending_styles.extend([
-            {
-                "id": "navratri-style",
-                "title": "Navratri Garba Look",
-                "emoji": "💃",
-                "description": "Dance & Celebration",
-                "defaultPieces": ["chaniya choli", "dupatta", "jewelry", "comfortable shoes"],
-                "category": "festival",
-                "season": "autumn",
-                "occasion": "festival",
-                "holiday": "Navratri",
-                "date": today.strftime('%Y-%m-%d')
-            },
-            {
-                "id": "diwali-style",
-                "title": "Diwali Festive Look",
-                "emoji": "🪔",
-                "description": "Festive Glam",
-                "defaultPieces": ["embroidered kurta", "embroidered dupatta", "juttis", "gold jewelry"],
-                "category": "festival",
-                "season": "autumn",
-                "occasion": "festival",
-                "holiday": "Diwali",
-                "date": today.strftime('%Y-%m-%d')
-            },
-            {
-                "id": "autumn-style",
-                "title": "Autumn Cozy Look",
-                "emoji": "🍂",
-                "description": "Layered & Stylish",
-                "defaultPieces": ["knit sweater", "ankle boots", "wool scarf", "beanie"],
-                "category": "season",
-                "season": "autumn",
-                "occasion": "seasonal",
-                "date": today.strftime('%Y-%m-%d')
-            }
-        ])
+        return jsonify(get_trending_payload()), 200
+        
+    except Exception as e:
+        logger.error(f"Error in trending endpoint: {e}")
+        return jsonify({'error': 'Failed to fetch trending styles'}), 500
+
+def load_query_image(stream, max_side=448):
+    """Decode an uploaded photo in memory, downscaled for the CLIP processor"""
+    from PIL import Image
+    image = Image.open(stream)
+    # JPEG decoders can skip straight to a reduced size
+    image.draft('RGB', (max_side, max_side))
+    image = image.convert('RGB')
+    image.thumbnail((max_side, max_side))
+    return image
+
+@app.route('/api/search/by-image', methods=['POST'])
+def search_by_image():
+    """Find wardrobe and catalog items that look like an uploaded photo (the photo is not saved)"""
+    try:
+        if 'image' not in request.files:
+            return jsonify({'error': 'No image file provided'}), 400
+        
+        file = request.files['image']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type. Allowed types: png, jpg, jpeg, gif, webp'}), 400
+        
+        # Optional category filter (app or recommender vocabulary)
+        category = request.form.get('category') or request.args.get('category')
+        categories = None
+        if category:
+            category = normalize_category(category)
+            if category is None:
+                return jsonify({'error': f'Invalid category. Must be one of: {", ".join(VALID_CATEGORIES)}'}), 400
+            categories = {category, RECOMMENDER_CATEGORY_MAPPING.get(category, category)}
         
-        # 2. Try to fetch holidays and add 2+ holiday styles
         try:
-            current_year = today.year
-            holidays_response = requests.get(f'https://date.nager.at/api/v3/PublicHolidays/{current_year}/IN', timeout=5)
-            
-            if holidays_response.status_code == 200:
-                holidays = holidays_response.json()
-                
-                # Filter upcoming holidays in next 3 weeks
-                upcoming_holidays = []
-                for holiday in holidays:
-                    holiday_date = datetime.strptime(holiday['date'], '%Y-%m-%d')
-                    if today <= holiday_date <= three_weeks_from_now:
-                        upcoming_holidays.append(holiday)
-                
-                # Enhanced holiday to style mapping
-                holiday_style_mapping = {
-                    "Christmas Day": {
-                        "id": "christmas-style",
-                        "title": "Christmas Festive Look",
-                        "emoji": "🎄",
-                        "description": "Festive & Warm",
-                        "defaultPieces": ["red sweater", "wool coat", "boots", "warm scarf"],
-                        "season": "winter",
-                        "occasion": "festive"
-                    },
-                    "New Year's Day": {
-                        "id": "new-year-style",
-                        "title": "New Year Glam Look",
-                        "emoji": "✨",
-                        "description": "Party Ready",
-                        "defaultPieces": ["sequin dress", "heels", "statement jewelry", "clutch"],
-                        "season": "winter",
-                        "occasion": "party"
-                    },
-                    "Valentine's Day": {
-                        "id": "valentines-style",
-                        "title": "Valentine's Romance Look",
-                        "emoji": "💖",
-                        "description": "Romantic & Sweet",
-                        "defaultPieces": ["pink dress", "red heels", "delicate jewelry", "perfume"],
-                        "season": "winter",
-                        "occasion": "romantic"
-                    },
-                    "Holi": {
-                        "id": "holi-style",
-                        "title": "Holi Color Fest Look",
-                        "emoji": "🌈",
-                        "description": "Colorful & Fun",
-                        "defaultPieces": ["white kurta", "colorful dupatta", "comfortable shoes", "sunglasses"],
-                        "season": "spring",
-                        "occasion": "festival"
-                    },
-                    "Diwali": {
-                        "id": "diwali-style",
-                        "title": "Diwali Festive Look",
-                        "emoji": "🪔",
-                        "description": "Festive Glam",
-                        "defaultPieces": ["embroidered kurta", "embroidered dupatta", "juttis", "gold jewelry"],
-                        "season": "autumn",
-                        "occasion": "festival"
-                    },
-                    "Dussehra": {
-                        "id": "dussehra-style",
-                        "title": "Dussehra Traditional Look",
-                        "emoji": "🦸",
-                        "description": "Traditional & Elegant",
-                        "defaultPieces": ["silk kurta", "dhoti pants", "kolhapuri sandals", "traditional accessories"],
-                        "season": "autumn",
-                        "occasion": "festival"
-                    },
-                    "Eid al-Fitr": {
-                        "id": "eid-style",
-                        "title": "Eid Celebration Look",
-                        "emoji": "🌙",
-                        "description": "Elegant & Traditional",
-                        "defaultPieces": ["embroidered kurta", "matching pants", "traditional shoes", "prayer cap"],
-                        "season": "spring",
-                        "occasion": "religious"
-                    },
-                    "Raksha Bandhan": {
-                        "id": "rakhi-style",
-                        "title": "Rakhi Traditional Look",
-                        "emoji": "🎀",
-                        "description": "Traditional & Festive",
-                        "defaultPieces": ["ethnic kurta", "ethnic pants", "juttis", "traditional accessories"],
-                        "season": "summer",
-                        "occasion": "festival"
-                    },
-                    "Navratri": {
-                        "id": "navratri-style",
-                        "title": "Navratri Garba Look",
-                        "emoji": "💃",
-                        "description": "Dance & Celebration",
-                        "defaultPieces": ["chaniya choli", "dupatta", "jewelry", "comfortable shoes"],
-                        "season": "autumn",
-                        "occasion": "festival"
-                    }
-                }
-                
-                # Add holiday styles (up to 4 more to ensure 3+ total)
-                holiday_count = 0
-                for holiday in upcoming_holidays:
-                    if holiday_count >= 4:  # Limit to 4 holiday styles
-                        break
-                    holiday_name = holiday['name']
-                    if holiday_name in holiday_style_mapping:
-                        style = holiday_style_mapping[holiday_name]
-                        trending_styles.append({
-                            "id": style["id"],
-                            "title": style["title"],
-                            "emoji": style["emoji"],
-                            "description": style["description"],
-                            "defaultPieces": style["defaultPieces"],
-                            "category": "festival",
-                            "holiday": holiday_name,
-                            "date": holiday['date'],
-                            "season": style["season"],
-                            "occasion": style["occasion"]
-                        })
-                        holiday_count += 1
-                
+            limit = int(request.form.get('limit') or request.args.get('limit') or 10)
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, IMAGE_SEARCH_MAX_RESULTS))
+        
+        try:
+            image = load_query_image(file.stream)
         except Exception as e:
-            logger.warning(f"Failed to fetch holidays: {e}")
+            logger.warning(f"Could not decode search image: {e}")
+            return jsonify({'error': 'Could not read image'}), 400
         
-        # We already have 3 trending styles, no need for additional fallbacks
+        start = time.perf_counter()
+        db_items = WardrobeItem.query.all()
+        results = get_recommendation_engine().nearest_to_image(
+            image, build_recommender_dataframe(db_items), wardrobe_fingerprint(db_items),
+            limit=limit, categories=categories
+        )
+        
+        items_by_id = {str(item.id): item for item in db_items}
+        wardrobe = [
+            dict(items_by_id[match['id']].to_dict(), similarity=match['score'])
+            for match in results.get('wardrobe', []) if match['id'] in items_by_id
+        ]
+        catalog = [
+            {'id': match['id'], 'similarity': match['score']}
+            for match in results.get('catalog', [])
+        ]
+        took_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"🔍 Image search: {len(wardrobe)} wardrobe / {len(catalog)} catalog matches in {took_ms}ms")
         
         return jsonify({
-            'styles': trending_styles[:5],  # Limit to 5 styles max
-            'total': len(trending_styles),
-            'timestamp': datetime.now().isoformat()
+            'wardrobe': wardrobe,
+            'catalog': catalog,
+            'category': category,
+            'took_ms': took_ms
         }), 200
         
     except Exception as e:
-        logger.error(f"Error in trending endpoint: {e}")
-        return jsonify({'error': 'Failed to fetch trending styles'}), 500
+        logger.error(f"Error in image search: {e}")
+        return jsonify({'error': 'Failed to search by image'}), 500
+
+_product_index = None
+_product_index_lock = threading.Lock()
+
+def get_product_index():
+    """Process-wide product search index (built from the catalog on first use)"""
+    global _product_index
+    if _product_index is None:
+        with _product_index_lock:
+            if _product_index is None:
+                from product_search import ProductSearchIndex
+                _product_index = ProductSearchIndex.from_file(PRODUCT_CATALOG_PATH)
+    return _product_index
+
+def _price_arg(name):
+    """Optional price filter from the query string; ValueError names the bad parameter"""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        price = float(value)
+    except ValueError:
+        price = -1.0
+    # float() also accepts nan and inf, which would match nothing
+    if not 0 <= price < float('inf'):
+        raise ValueError(f'{name} must be a non-negative number')
+    return price
 
 @app.route('/api/product-search', methods=['GET'])
 def search_products():
@@ -966,322 +1931,45 @@ def search_products():
         category = request.args.get('category', '').strip()
         season = request.args.get('season', '').strip()
         occasion = request.args.get('occasion', '').strip()
-        limit = int(request.args.get('limit', 10))
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit must be at least 1'}), 400
+        try:
+            min_price = _price_arg('min_price')
+            max_price = _price_arg('max_price')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if min_price is not None and max_price is not None and min_price > max_price:
+            return jsonify({'error': 'min_price must not be greater than max_price'}), 400
         
         if not query:
             return jsonify({'error': 'Query parameter is required'}), 400
         
-        # Enhanced product database with highly relevant themed items
-        themed_products = {
-            # Autumn Items - Warm, cozy, layered looks
-            "autumn": [
-                {
-                    "id": "autumn_1",
-                    "name": "Cashmere Wool Sweater",
-                    "image": "/images/autumn/Screenshot 2025-09-20 202905.png",
-                    "price": 3999,
-                    "originalPrice": 5999,
-                    "discount": 33,
-                    "brand": "Warm & Cozy",
-                    "rating": 4.6,
-                    "category": "tops",
-                    "colors": ["burgundy", "mustard", "olive"],
-                    "tags": ["cashmere", "wool", "autumn", "warm", "sweater"]
-                },
-                {
-                    "id": "autumn_2", 
-                    "name": "Leather Chelsea Boots",
-                    "image": "/images/autumn/Screenshot 2025-09-20 203143.png",
-                    "price": 4599,
-                    "originalPrice": 6999,
-                    "discount": 34,
-                    "brand": "BootCraft",
-                    "rating": 4.5,
-                    "category": "shoes",
-                    "colors": ["brown", "black", "tan"],
-                    "tags": ["leather", "chelsea", "autumn", "boots", "ankle"]
-                },
-                {
-                    "id": "autumn_3",
-                    "name": "Plaid Wool Scarf",
-                    "image": "/images/autumn/Screenshot 2025-09-20 204053.png",
-                    "price": 2199,
-                    "originalPrice": 2999,
-                    "discount": 27,
-                    "brand": "Heritage Wool",
-                    "rating": 4.7,
-                    "category": "accessories",
-                    "colors": ["burgundy", "navy", "green"],
-                    "tags": ["plaid", "wool", "autumn", "scarf", "warm"]
-                },
-                {
-                    "id": "autumn_4",
-                    "name": "Knit Beanie Hat",
-                    "image": "/images/autumn/Screenshot 2025-09-20 204208.png",
-                    "price": 1299,
-                    "originalPrice": 1799,
-                    "discount": 28,
-                    "brand": "Cozy Head",
-                    "rating": 4.4,
-                    "category": "accessories",
-                    "colors": ["brown", "grey", "burgundy"],
-                    "tags": ["beanie", "knit", "autumn", "hat", "warm"]
-                },
-                {
-                    "id": "autumn_5",
-                    "name": "Corduroy Jacket",
-                    "image": "/images/autumn/Screenshot 2025-09-20 204352.png",
-                    "price": 3299,
-                    "originalPrice": 4499,
-                    "discount": 27,
-                    "brand": "Autumn Style",
-                    "rating": 4.5,
-                    "category": "outerwear",
-                    "colors": ["brown", "olive", "burgundy"],
-                    "tags": ["corduroy", "jacket", "autumn", "warm", "casual"]
-                }
-            ],
-            # Diwali Items - Traditional festive wear
-            "diwali": [
-                {
-                    "id": "diwali_1",
-                    "name": "Heavy Embroidered Kurta Set",
-                    "image": "/images/diwali/Screenshot 2025-09-20 190430.png",
-                    "price": 4999,
-                    "originalPrice": 7999,
-                    "discount": 38,
-                    "brand": "Royal Ethnic",
-                    "rating": 4.8,
-                    "category": "tops",
-                    "colors": ["red", "maroon", "gold", "burgundy"],
-                    "tags": ["embroidered", "heavy", "festive", "diwali", "kurta", "ethnic"]
-                },
-                {
-                    "id": "diwali_2",
-                    "name": "Silk Saree with Zari Work",
-                    "image": "/images/diwali/Screenshot 2025-09-20 191813.png",
-                    "price": 8999,
-                    "originalPrice": 12999,
-                    "discount": 31,
-                    "brand": "Silk Heritage",
-                    "rating": 4.9,
-                    "category": "dresses",
-                    "colors": ["red", "gold", "maroon", "burgundy"],
-                    "tags": ["silk", "zari", "saree", "diwali", "festive", "traditional"]
-                },
-                {
-                    "id": "diwali_3",
-                    "name": "Golden Jutti Shoes",
-                    "image": "/images/diwali/Screenshot 2025-09-20 191948.png",
-                    "price": 2299,
-                    "originalPrice": 3299,
-                    "discount": 30,
-                    "brand": "Heritage Footwear",
-                    "rating": 4.6,
-                    "category": "shoes",
-                    "colors": ["gold", "red", "brown", "maroon"],
-                    "tags": ["jutti", "golden", "ethnic", "diwali", "traditional", "shoes"]
-                },
-                {
-                    "id": "diwali_4",
-                    "name": "Heavy Dupatta with Embroidery",
-                    "image": "/images/diwali/Screenshot 2025-09-20 192132.png",
-                    "price": 2999,
-                    "originalPrice": 3999,
-                    "discount": 25,
-                    "brand": "Silk Route",
-                    "rating": 4.7,
-                    "category": "accessories",
-                    "colors": ["red", "gold", "maroon", "burgundy"],
-                    "tags": ["dupatta", "heavy", "embroidered", "diwali", "festive", "ethnic"]
-                },
-                {
-                    "id": "diwali_5",
-                    "name": "Traditional Gold Jewelry Set",
-                    "image": "/images/diwali/Screenshot 2025-09-20 192340.png",
-                    "price": 5999,
-                    "originalPrice": 8999,
-                    "discount": 33,
-                    "brand": "Heritage Jewelry",
-                    "rating": 4.8,
-                    "category": "accessories",
-                    "colors": ["gold", "silver"],
-                    "tags": ["jewelry", "gold", "traditional", "diwali", "festive", "ethnic"]
-                }
-            ],
-            # Navratri Items - Garba dance wear
-            "navratri": [
-                {
-                    "id": "navratri_1",
-                    "name": "Mirror Work Chaniya Choli",
-                    "image": "/images/navratri/Screenshot 2025-09-20 193528.png",
-                    "price": 5999,
-                    "originalPrice": 8999,
-                    "discount": 33,
-                    "brand": "Garba Queen",
-                    "rating": 4.9,
-                    "category": "dresses",
-                    "colors": ["pink", "orange", "yellow", "green", "red"],
-                    "tags": ["chaniya", "choli", "mirror", "garba", "navratri", "festive", "dance"]
-                },
-                {
-                    "id": "navratri_2",
-                    "name": "Heavy Embroidered Dupatta",
-                    "image": "/images/navratri/Screenshot 2025-09-20 194537.png",
-                    "price": 2499,
-                    "originalPrice": 3499,
-                    "discount": 29,
-                    "brand": "Garba Style",
-                    "rating": 4.7,
-                    "category": "accessories",
-                    "colors": ["pink", "orange", "yellow", "green"],
-                    "tags": ["dupatta", "embroidered", "garba", "navratri", "festive", "dance"]
-                },
-                {
-                    "id": "navratri_3",
-                    "name": "Traditional Garba Jewelry Set",
-                    "image": "/images/navratri/Screenshot 2025-09-20 200554.png",
-                    "price": 3999,
-                    "originalPrice": 5999,
-                    "discount": 33,
-                    "brand": "Heritage Jewelry",
-                    "rating": 4.8,
-                    "category": "accessories",
-                    "colors": ["gold", "silver", "rose gold"],
-                    "tags": ["jewelry", "traditional", "garba", "navratri", "festive", "gold"]
-                },
-                {
-                    "id": "navratri_4",
-                    "name": "Comfortable Garba Shoes",
-                    "image": "/images/navratri/Screenshot 2025-09-20 200838.png",
-                    "price": 2299,
-                    "originalPrice": 3299,
-                    "discount": 30,
-                    "brand": "Dance Comfort",
-                    "rating": 4.6,
-                    "category": "shoes",
-                    "colors": ["gold", "silver", "black", "brown"],
-                    "tags": ["shoes", "comfortable", "garba", "navratri", "dance", "traditional"]
-                },
-                {
-                    "id": "navratri_5",
-                    "name": "Anklets with Bells",
-                    "image": "/images/navratri/Screenshot 2025-09-20 201116.png",
-                    "price": 1299,
-                    "originalPrice": 1999,
-                    "discount": 35,
-                    "brand": "Garba Accessories",
-                    "rating": 4.5,
-                    "category": "accessories",
-                    "colors": ["gold", "silver"],
-                    "tags": ["anklets", "bells", "garba", "navratri", "dance", "traditional"]
-                }
-            ],
-            # Winter Items
-            "winter": [
-                {
-                    "id": "winter_1",
-                    "name": "Wool Coat",
-                    "image": "https://images.unsplash.com/photo-1594633312681-425c7b97ccd1?w=400&h=400&fit=crop&crop=center",
-                    "price": 4599,
-                    "originalPrice": 5999,
-                    "discount": 23,
-                    "brand": "WinterWear",
-                    "rating": 4.5,
-                    "category": "outerwear",
-                    "colors": ["black", "navy", "grey"],
-                    "tags": ["wool", "coat", "warm", "winter", "formal"]
-                },
-                {
-                    "id": "winter_2",
-                    "name": "Cashmere Scarf",
-                    "image": "https://images.unsplash.com/photo-1521369909029-2afed882baee?w=400&h=400&fit=crop&crop=center",
-                    "price": 1899,
-                    "originalPrice": 2499,
-                    "discount": 24,
-                    "brand": "LuxuryWarmth",
-                    "rating": 4.7,
-                    "category": "accessories",
-                    "colors": ["red", "grey", "black"],
-                    "tags": ["cashmere", "warm", "luxury", "winter", "scarf"]
-                }
-            ],
-            # Summer Items
-            "summer": [
-                {
-                    "id": "summer_1",
-                    "name": "Flowy Maxi Dress",
-                    "image": "https://images.unsplash.com/photo-1595777457583-95e059d581b8?w=400&h=400&fit=crop&crop=center",
-                    "price": 2899,
-                    "originalPrice": 3699,
-                    "discount": 22,
-                    "brand": "Boho Chic",
-                    "rating": 4.4,
-                    "category": "dresses",
-                    "colors": ["floral", "white", "pink"],
-                    "tags": ["maxi", "boho", "floral", "summer", "beach"]
-                },
-                {
-                    "id": "summer_2",
-                    "name": "Straw Hat",
-                    "image": "https://images.unsplash.com/photo-1521369909029-2afed882baee?w=400&h=400&fit=crop&crop=center",
-                    "price": 899,
-                    "originalPrice": 1199,
-                    "discount": 25,
-                    "brand": "Beach Vibes",
-                    "rating": 4.2,
-                    "category": "accessories",
-                    "colors": ["beige", "white", "brown"],
-                    "tags": ["hat", "straw", "summer", "beach", "sun"]
-                }
-            ]
-        }
+        index = get_product_index()
+        filters = {'category': category or None, 'min_price': min_price, 'max_price': max_price}
+        themes = [theme for theme in (season, occasion) if index.has_theme(theme)]
         
-        # Search logic based on query and filters
-        all_products = []
-        
-        # If specific season/occasion is requested, prioritize those
-        if season and season in themed_products:
-            all_products.extend(themed_products[season])
-        
-        if occasion and occasion in themed_products:
-            all_products.extend(themed_products[occasion])
-        
-        # If we have theme-specific products, use only those
-        if all_products:
-            # For Diwali theme, always return ALL Diwali products regardless of query
-            if occasion == "diwali":
-                all_products = themed_products["diwali"]
-            # For Navratri theme, always return ALL Navratri products regardless of query  
-            elif occasion == "navratri":
-                all_products = themed_products["navratri"]
-            # For Autumn theme, always return ALL Autumn products regardless of query
-            elif season == "autumn":
-                all_products = themed_products["autumn"]
+        if themes:
+            # Diwali, Navratri and Autumn looks always show the whole theme: query matches first, then the rest
+            if occasion in ('diwali', 'navratri'):
+                full_theme = [occasion]
+            elif season == 'autumn':
+                full_theme = ['autumn']
             else:
-                # Filter by query within the theme-specific products
-                query_lower = query.lower()
-                filtered_products = []
-                for product in all_products:
-                    if (query_lower in product["name"].lower() or 
-                        query_lower in " ".join(product["tags"]).lower() or
-                        query_lower in product["category"].lower() or
-                        query_lower in product["brand"].lower()):
-                        filtered_products.append(product)
-                
-                # If no matches found in theme products, return all theme products
-                if filtered_products:
-                    all_products = filtered_products
+                full_theme = None
+            themes = full_theme or themes
+            all_products = index.search(query, themes=themes, limit=limit, **filters)
+            
+            # Other themes fall back to the whole theme when nothing matches
+            if full_theme or not all_products:
+                all_products += index.browse(themes=themes, limit=limit - len(all_products),
+                                             exclude=[product['id'] for product in all_products], **filters)
         else:
-            # Fallback: search through all themed products
-            query_lower = query.lower()
-            for theme, products in themed_products.items():
-                for product in products:
-                    if (query_lower in product["name"].lower() or 
-                        query_lower in " ".join(product["tags"]).lower() or
-                        query_lower in product["category"].lower()):
-                        if product not in all_products:  # Avoid duplicates
-                            all_products.append(product)
+            # Search through the whole catalog
+            all_products = index.search(query, limit=limit, **filters)
         
         # If no specific matches, add some general products
         if not all_products:
@@ -1318,6 +2006,35 @@ def search_products():
         logger.error(f"Error in product search: {e}")
         return jsonify({'error': 'Failed to search products'}), 500
 
+@app.route('/api/recommendations/cache-stats', methods=['GET'])
+def recommendation_cache_stats():
+    """Hit-rate metrics for the recommendation result and collage caches, plus engine state"""
+    stats = get_outfit_cache().stats()
+    stats['collages'] = get_collage_renderer().cache.stats()
+    if _recommendation_engine is not None:
+        stats['engine'] = _recommendation_engine.status()
+    if _job_queue is not None:
+        stats['jobs'] = _job_queue.stats()
+    if _holiday_provider is not None:
+        stats['holidays'] = _holiday_provider.status()
+    if _gemini_client is not None:
+        stats['gemini'] = _gemini_client.stats()
+    if _outbound is not None:
+        stats['outbound'] = _outbound.stats()
+    if _placeholder_cache is not None:
+        stats['placeholders'] = _placeholder_cache.stats()
+    if _image_variants is not None:
+        stats['image_variants'] = _image_variants.stats()
+    return jsonify(stats), 200
+
+@app.route('/api/outfits/log/<outfit_id>', methods=['GET'])
+def get_logged_outfit(outfit_id):
+    """Look up a previously generated outfit by id"""
+    outfit = get_outfit_log().get(outfit_id)
+    if outfit is None:
+        return jsonify({'error': 'Outfit not found'}), 404
+    return jsonify(outfit), 200
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -1337,58 +2054,18 @@ def test_outfit():
         
         logger.info(f"📊 Found {len(db_items)} wardrobe items")
         
-        # Convert to DataFrame
-        import pandas as pd
-        wardrobe_data = []
-        for item in db_items:
-            wardrobe_data.append({
-                'id': str(item.id),
-                'category': item.category,
-                'subcategory': item.subcategory or 'unknown',
-                'color': item.dominant_color_hex or 'unknown',
-                'style_tags': item.style_tags or ['casual'],
-                'image_url': item.image_url,
-                'description': f"{item.category} item",
-                'filename': item.image_url.split('/')[-1] if item.image_url else None
-            })
-        
-        user_wardrobe_df = pd.DataFrame(wardrobe_data)
-        logger.info(f"📊 Created DataFrame with {len(user_wardrobe_df)} items")
-        
-        # Use recommendation system directly
-        from generate_outfit_adapter import RobustDataManager, RobustOutfitRecommender
-        import os
+        # Borrow the warm engine's recommender (built at startup or on the last wardrobe change)
+        recommender = get_wardrobe_recommender(db_items)
+        user_wardrobe_df = recommender.wardrobe_df
         
-        raw_dir = 'recommendation_system/data/raw'
-        processed_dir = 'recommendation_system/data/processed'
-        output_dir = 'recommendation_system/data/output'
-        
-        logger.info("📊 Initializing recommendation system...")
-        
-        data_manager = RobustDataManager(
-            raw_dir=raw_dir,
-            processed_dir=processed_dir,
-            output_dir=output_dir
-        )
-        
-        logger.info("📊 Generating embeddings...")
-        embedding_index = data_manager.generate_embeddings(user_wardrobe_df, pd.DataFrame(columns=['id', 'category', 'subcategory', 'color', 'style_tags', 'image_url', 'description']))
-        
-        logger.info("📊 Initializing recommender...")
-        recommender = RobustOutfitRecommender(
-            wardrobe_df=user_wardrobe_df,
-            catalog_df=pd.DataFrame(columns=['id', 'category', 'subcategory', 'color', 'style_tags', 'image_url', 'description']),
-            embedding_index=embedding_index,
-            image_base_dir=raw_dir,
-            output_dir=output_dir
-        )
-        
-        # Generate outfits
+        # Generate outfits (occasion/season narrow the candidate pool)
+        data = request.get_json(silent=True) or {}
         logger.info("🎯 Generating outfits...")
         outfits = recommender.recommend_outfits(
             seed_item_ids=user_wardrobe_df['id'].tolist()[:3],
-            occasion='casual',
-            num_outfits=1
+            occasion=data.get('occasion', 'casual'),
+            num_outfits=1,
+            season=data.get('season')
         )
         
         logger.info(f"✅ Generated {len(outfits)} outfits")
@@ -1417,21 +2094,7 @@ def test_explicit_outfit():
             return jsonify({'error': 'No wardrobe items found'}), 400
         
         # Convert to DataFrame
-        import pandas as pd
-        wardrobe_data = []
-        for item in db_items:
-            wardrobe_data.append({
-                'id': str(item.id),
-                'category': item.category,
-                'subcategory': item.subcategory or 'unknown',
-                'color': item.dominant_color_hex or 'unknown',
-                'style_tags': item.style_tags or ['casual'],
-                'image_url': item.image_url,
-                'description': f"{item.category} item",
-                'filename': item.image_url.split('/')[-1] if item.image_url else None
-            })
-        
-        user_wardrobe_df = pd.DataFrame(wardrobe_data)
+        user_wardrobe_df = build_wardrobe_dataframe(db_items)
         
         # Test explicit outfit for a specific seed item
         seed_id = "1e346d74-5913-46f6-8774-a8f905a1dc38"
@@ -1474,20 +2137,10 @@ def test_upload():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Allowed types: png, jpg, jpeg, gif, webp'}), 400
         
-        # Normalize category (handle singular/plural variations)
-        category_mapping = {
-            'dress': 'dresses',
-            'top': 'tops', 
-            'bottom': 'bottoms',
-            'accessory': 'accessories',
-            'shoe': 'shoes'
-        }
-        normalized_category = category_mapping.get(category, category)
-        
-        # Validate category
-        valid_categories = ['dresses', 'accessories', 'tops', 'bottoms', 'shoes']
-        if normalized_category not in valid_categories:
-            return jsonify({'error': f'Invalid category. Must be one of: {", ".join(valid_categories)}'}), 400
+        # Normalize and validate category (handle singular/plural variations)
+        normalized_category = normalize_category(category)
+        if normalized_category is None:
+            return jsonify({'error': f'Invalid category. Must be one of: {", ".join(VALID_CATEGORIES)}'}), 400
         
         # Use normalized category
         category = normalized_category
@@ -1511,7 +2164,10 @@ def test_upload():
                 recommendation_id=None
             )
             db.session.add(wardrobe_item)
+            record_wardrobe_change('insert', wardrobe_item)
             db.session.commit()
+            # Never classified, so there is nothing to add to the outfit table
+            on_wardrobe_changed()
             
             logger.info(f"✅ Successfully saved wardrobe item: {wardrobe_item.id}")
             return jsonify(wardrobe_item.to_dict()), 201
@@ -1529,84 +2185,19 @@ def test_upload():
 
 @app.route('/api/style-card', methods=['GET'])
 def get_style_card():
-    """Get style card data based on wardrobe items"""
+    """Get style card data based on wardrobe items (one read of the materialized counts)"""
     try:
-        # Style mapping from backend styles to Gen-Z vibes
-        STYLE_MAPPING = {
-            "casual": "streetwear",
-            "ethnic": "girly_pop", 
-            "formal": "boss_babe",
-            "party": "edgy",
-            "bohemian": "grunge",
-            "minimalist": "clean_girl",
-            "elegant": "boss_babe",
-            "girly": "girly_pop",
-            "denim": "streetwear",
-            "practical": "clean_girl",
-            "edgy": "edgy",
-            "classic": "clean_girl",
-            "trendy": "streetwear",
-            "streetwear": "streetwear",
-            "vintage": "grunge",
-            "glam": "boss_babe",
-            "y2k": "edgy",
-            "boho": "grunge"
-        }
-        
-        # Get wardrobe items from database
-        wardrobe_items = WardrobeItem.query.filter(WardrobeItem.recommendation_id.isnot(None)).all()
-        
-        if not wardrobe_items:
-            return jsonify({
-                "girly_pop": 0,
-                "edgy": 0,
-                "streetwear": 0,
-                "clean_girl": 0,
-                "boss_babe": 0,
-                "grunge": 0,
-                "total_items": 0
-            }), 200
-        
-        # Count styles for wardrobe items using database data directly
-        style_counts = {}
-        total_items = 0
-        
-        for item in wardrobe_items:
-            if item.style_tags:
-                try:
-                    # Parse style_tags from database
-                    tags = json.loads(item.style_tags)
-                    total_items += 1
-                    
-                    for tag in tags:
-                        # Map to Gen-Z vibe
-                        vibe = STYLE_MAPPING.get(tag, "clean_girl")  # default to clean_girl
-                        style_counts[vibe] = style_counts.get(vibe, 0) + 1
-                except (json.JSONDecodeError, TypeError):
-                    continue
+        card = db.session.get(StyleCard, 1)
+        total_items = card.total_items if card else 0
         
-        # Calculate percentages
         if total_items == 0:
-            return jsonify({
-                "girly_pop": 0,
-                "edgy": 0,
-                "streetwear": 0,
-                "clean_girl": 0,
-                "boss_babe": 0,
-                "grunge": 0,
-                "total_items": 0
-            }), 200
+            return jsonify({**{vibe: 0 for vibe in STYLE_CARD_VIBES}, "total_items": 0}), 200
         
         # Convert to percentages
         percentages = {}
-        for vibe, count in style_counts.items():
-            percentages[vibe] = round((count / total_items) * 100, 1)
-        
-        # Ensure all vibes are present with 0 if not found
-        all_vibes = ["girly_pop", "edgy", "streetwear", "clean_girl", "boss_babe", "grunge"]
-        for vibe in all_vibes:
-            if vibe not in percentages:
-                percentages[vibe] = 0
+        for vibe in STYLE_CARD_VIBES:
+            count = getattr(card, vibe)
+            percentages[vibe] = round((count / total_items) * 100, 1) if count else 0
         
         percentages["total_items"] = total_items
         
@@ -1641,6 +2232,67 @@ def serve_outfit_image():
         logger.error(f"Error serving outfit image: {e}")
         return jsonify({'error': 'Failed to serve image'}), 500
 
+@app.route('/api/outfit-collage/<key>.<ext>', methods=['GET'])
+def serve_outfit_collage(key, ext):
+    """Serve an outfit collage (.jpg or .webp), rendering it on the first request"""
+    try:
+        collage_path = get_collage_renderer().render(key, output_format=ext)
+        if not collage_path:
+            return jsonify({'error': 'Collage not found'}), 404
+        return send_file(os.path.abspath(collage_path), mimetype='image/webp' if ext == 'webp' else 'image/jpeg')
+        
+    except Exception as e:
+        logger.error(f"Error serving outfit collage {key}: {e}")
+        return jsonify({'error': 'Failed to render collage'}), 500
+
+@app.route('/img/<filename>', methods=['GET'])
+def serve_image_variant(filename):
+    """Serve an upload or wardrobe image resized to ?w= (snapped to IMAGE_VARIANT_WIDTHS) as ?fmt=webp|jpg|png"""
+    try:
+        variants = get_image_variants()
+        try:
+            width = int(request.args.get('w', 640))
+        except ValueError:
+            return jsonify({'error': 'w must be an integer'}), 400
+        if width <= 0:
+            return jsonify({'error': 'w must be positive'}), 400
+        fmt = variants.normalize_format(request.args.get('fmt', 'webp'))
+        if fmt is None:
+            return jsonify({'error': 'fmt must be webp, jpg or png'}), 400
+        
+        if not allowed_file(filename):
+            return jsonify({'error': 'Image not found'}), 404
+        # Another request's eviction can remove a cached variant before it is
+        # opened; the second pass renders it again
+        for attempt in range(2):
+            variant = variants.get_or_create(filename, width, fmt)
+            if variant is None:
+                return jsonify({'error': 'Image not found'}), 404
+            path, key = variant
+            try:
+                response = send_file(os.path.abspath(path), mimetype=variants.mimetype(fmt), etag=key, conditional=True)
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error serving image variant {filename}: {e}")
+        return jsonify({'error': 'Failed to resize image'}), 500
+
+@app.route('/api/placeholders/<key>.png', methods=['GET'])
+def serve_placeholder(key):
+    """Serve a cached stylist placeholder; the key is a content hash, so it never changes"""
+    image_bytes = get_placeholder_cache().get(key)
+    if image_bytes is None:
+        return jsonify({'error': 'Placeholder not found'}), 404
+    response = Response(image_bytes, mimetype='image/png')
+    response.set_etag(key)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
+
 @app.route('/static/wardrobe_images/<filename>')
 def wardrobe_image(filename):
     """Serve wardrobe images from static folder"""
@@ -1649,7 +2301,15 @@ def wardrobe_image(filename):
 # Error handlers
 @app.errorhandler(413)
 def too_large(e):
-    return jsonify({'error': 'File too large. Maximum size is 16MB'}), 413
+    limit_mb = (request.max_content_length or MAX_FILE_SIZE) // (1024 * 1024)
+    return jsonify({'error': f'File too large. Maximum size is {limit_mb}MB'}), 413
+
+@app.before_request
+def reject_oversized_body():
+    """Answer 413 before a route reads a body over its limit (route-level excepts would turn it into a 500)"""
+    limit = request.max_content_length
+    if limit is not None and request.content_length and request.content_length > limit:
+        return too_large(None)
 
 @app.errorhandler(404)
 def not_found(e):
@@ -1659,13 +2319,46 @@ def not_found(e):
 def internal_error(e):
     return jsonify({'error': 'Internal server error'}), 500
 
+@app.after_request
+def compress_response(response):
+    """Gzip large JSON responses for clients that accept it"""
+    if (response.status_code != 200 or response.direct_passthrough or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 # Initialize database tables
 def create_tables():
     """Create database tables"""
     with app.app_context():
         db.create_all()
+        # create_all only builds new tables; indexes on existing ones come from migrations
+        from db_schema import run_migrations
+        schema_version = run_migrations(db.engine)
+        logger.info(f"Database schema at version {schema_version}")
+        # Recount once per start so rows written outside the API are reflected too
+        rebuild_style_card()
+        prune_wardrobe_changes()
         logger.info("Database tables created successfully")
+    threading.Thread(target=apply_output_retention, daemon=True).start()
+    # Precompute today's trending response (and start any holiday refresh) off the request path
+    threading.Thread(target=get_trending_payload, daemon=True).start()
+    if RECOMMENDER_WARMUP:
+        threading.Thread(target=warm_recommendation_engine, daemon=True).start()
+
+def is_serving_process(debug: bool) -> bool:
+    """False in the debug reloader's watcher process, which only restarts the server on code changes"""
+    return not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
 
 if __name__ == '__main__':
-    create_tables()
+    # Migrations, startup threads and the model warm-up run once, in the process that serves requests
+    if is_serving_process(debug=True):
+        create_tables()
     app.run(debug=True, host='0.0.0.0', port=5000)
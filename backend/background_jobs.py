@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Background Jobs
+===============
+
+A small in-process job queue for work that should not hold an HTTP request
+open (classifying and embedding uploads, generating fallback images). Jobs
+run on a bounded thread pool, are retried with exponential backoff, and
+publish their state changes to subscribers so the API can expose them
+through a status endpoint and an SSE stream. Kinds given their own lane run
+on a separate pool, so slow network jobs cannot starve the default one.
+"""
+
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Bounded worker pool with retries, job status and event subscribers."""
+
+    def __init__(self, max_workers: int = 2, max_retries: int = 2, retry_delay: float = 1.0, max_jobs: int = 500,
+                 lanes: Optional[Dict[str, int]] = None):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wardrobe-job')
+        # kind -> dedicated pool
+        self._lanes = {
+            kind: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{kind}-job")
+            for kind, workers in (lanes or {}).items()
+        }
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._subscribers: List[queue.Queue] = []
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> str:
+        """Queue fn(*args, **kwargs) and return the job id; its return value becomes the job result"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'attempts': 0,
+            'result': None,
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            # Forget the oldest finished jobs past max_jobs
+            while len(self._jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest['status'] not in ('succeeded', 'failed'):
+                    break
+                self._jobs.pop(oldest_id)
+        self._publish(job)
+        self._lanes.get(kind, self._executor).submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def subscribe(self) -> queue.Queue:
+        """Queue receiving a copy of every job update from now on"""
+        events: queue.Queue = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue):
+        with self._lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return {'jobs': counts, 'subscribers': len(self._subscribers)}
+
+    def shutdown(self, wait: bool = True):
+        for executor in [self._executor, *self._lanes.values()]:
+            executor.shutdown(wait=wait)
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args, kwargs):
+        for attempt in range(1, self.max_retries + 2):
+            self._update(job_id, status='running', attempts=attempt)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Job {job_id} attempt {attempt} failed: {e}")
+                if attempt > self.max_retries:
+                    self._update(job_id, status='failed', error=str(e))
+                    return
+                self._update(job_id, status='retrying', error=str(e))
+                time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+                continue
+            self._update(job_id, status='succeeded', result=result, error=None)
+            return
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(changes, updated_at=datetime.now().isoformat())
+            snapshot = dict(job)
+        self._publish(snapshot)
+
+    def _publish(self, job: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(dict(job))
+            except queue.Full:
+                # A stalled client only misses updates; it can poll the status endpoint
+                pass
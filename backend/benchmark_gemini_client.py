@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Gemini client cache and request coalescing against the local stand-in
+Usage: python benchmark_gemini_client.py --delay 0.5 --clients 20 --rounds 3
+"""
+
+import time
+import tempfile
+import argparse
+import threading
+
+from gemini_client import GeminiClient
+from gemini_api_standin import make_server
+
+# Near-identical prompts that should share one response
+PROMPTS = ['diwali look', 'Diwali look ', '  DIWALI   look', 'beach brunch', 'Beach brunch', 'office party']
+
+
+def run_round(client: GeminiClient, clients: int) -> float:
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=client.generate, args=(f"User vibe/look: {PROMPTS[i % len(PROMPTS)]}",),
+                         kwargs={'cache_key': PROMPTS[i % len(PROMPTS)]})
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cached, coalescing Gemini client')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--delay', type=float, default=0.5, help='Simulated model latency in seconds')
+    parser.add_argument('--clients', type=int, default=20, help='Concurrent requests per round')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f"http://localhost:{args.port}/v1beta"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = GeminiClient(api_key='test', api_base=api_base, cache_dir=cache_dir)
+        for round_number in range(1, args.rounds + 1):
+            seconds = run_round(client, args.clients)
+            print(f"📊 round {round_number}: {args.clients} requests in {seconds * 1000:.0f}ms  "
+                  f"upstream calls so far {server.stats['requests']}")
+
+        # A fresh process (empty memory LRU) is served from the disk tier
+        restarted = GeminiClient(api_key='test', api_base=api_base, cache_dir=cache_dir)
+        seconds = run_round(restarted, args.clients)
+        print(f"📊 after restart: {args.clients} requests in {seconds * 1000:.0f}ms  "
+              f"upstream calls so far {server.stats['requests']}")
+        print(f"📊 client stats: {client.stats()}")
+        print(f"📊 uncached baseline would be {args.clients * (args.rounds + 1)} upstream calls")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
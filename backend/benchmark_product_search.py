@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/product-search index build and query latency on a synthetic catalog
+Usage: python benchmark_product_search.py --products 100000 --queries 2000
+"""
+
+import time
+import random
+import argparse
+
+from product_search import ProductSearchIndex
+
+CATEGORIES = ['tops', 'bottoms', 'dresses', 'shoes', 'accessories', 'outerwear']
+THEMES = ['autumn', 'winter', 'summer', 'diwali', 'navratri', 'wedding', 'party', 'casual']
+COLORS = ['black', 'white', 'navy', 'red', 'maroon', 'gold', 'olive', 'beige', 'pink', 'mustard']
+MATERIALS = ['cotton', 'silk', 'linen', 'wool', 'denim', 'leather', 'velvet', 'chiffon', 'cashmere', 'georgette']
+ITEMS = ['kurta', 'saree', 'lehenga', 'sweater', 'jacket', 'boots', 'sneakers', 'scarf', 'dress', 'jeans',
+         'shirt', 'blazer', 'dupatta', 'sandals', 'skirt', 'hoodie', 'coat', 'earrings', 'clutch', 'trousers']
+STYLES = ['embroidered', 'printed', 'casual', 'festive', 'slim', 'oversized', 'vintage', 'boho', 'classic', 'ethnic']
+
+# Exact words, multi-word, as-you-type prefixes and typos
+QUERIES = ['kurta', 'silk saree', 'leather boots', 'festive lehenga gold', 'emb', 'cashm', 'sweatr', 'jakcet',
+           'denim jeans slim', 'velvet', 'boho dress', 'wool scarf', 'sneak', 'earings', 'printed cotton shirt']
+
+
+def synthetic_catalog(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        item, material, style = rng.choice(ITEMS), rng.choice(MATERIALS), rng.choice(STYLES)
+        price = rng.randrange(299, 15000)
+        products.append({
+            'id': f"p{i}",
+            'name': f"{style.title()} {material.title()} {item.title()}",
+            'price': price,
+            'brand': f"Brand {rng.randrange(500)}",
+            'category': rng.choice(CATEGORIES),
+            'colors': rng.sample(COLORS, 2),
+            'tags': [item, material, style] + rng.sample(THEMES, 1),
+            'themes': rng.sample(THEMES, rng.randint(1, 2)),
+        })
+    return products
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the product search index')
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    products = synthetic_catalog(args.products)
+    t0 = time.perf_counter()
+    index = ProductSearchIndex(products)
+    print(f"🔎 Built index for {len(index)} products in {time.perf_counter() - t0:.2f}s")
+
+    rng = random.Random(11)
+    scenarios = {
+        'query': lambda q: index.search(q, limit=args.limit),
+        'query+theme': lambda q: index.search(q, themes=[rng.choice(THEMES)], limit=args.limit),
+        'query+category+price': lambda q: index.search(q, category=rng.choice(CATEGORIES),
+                                                       min_price=1000, max_price=5000, limit=args.limit),
+    }
+    for label, run in scenarios.items():
+        latencies = []
+        for i in range(args.queries):
+            query = QUERIES[i % len(QUERIES)]
+            t0 = time.perf_counter()
+            run(query)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+        print(f"📊 {label:22s} p50 {percentile(latencies, 0.5):8.0f}µs  p95 {percentile(latencies, 0.95):8.0f}µs  "
+              f"max {max(latencies):8.0f}µs")
+
+
+if __name__ == '__main__':
+    main()
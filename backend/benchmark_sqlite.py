@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent wardrobe.db reads/writes with SQLite defaults vs the tuned profile
+Usage: python benchmark_sqlite.py --items 5000 --readers 4 --writers 1 --seconds 5
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from db_schema import engine_options, install_sqlite_pragmas, run_migrations
+
+SCHEMA = """
+CREATE TABLE wardrobe_item (
+    id INTEGER NOT NULL PRIMARY KEY,
+    image_url VARCHAR(255) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    subcategory VARCHAR(100),
+    style_tags TEXT,
+    dominant_color_hex VARCHAR(7),
+    emb_index INTEGER,
+    recommendation_id VARCHAR(100),
+    created_at DATETIME
+)
+"""
+
+CATEGORIES = ['tops', 'bottoms', 'dresses', 'shoes', 'accessories']
+
+# The access patterns of the API routes
+READ_QUERIES = [
+    # GET /api/wardrobe?limit=100
+    "SELECT id, image_url, category, created_at FROM wardrobe_item ORDER BY created_at DESC, id DESC LIMIT 100",
+    # GET /api/style-card
+    "SELECT id, style_tags FROM wardrobe_item WHERE recommendation_id IS NOT NULL",
+    # Category filters
+    "SELECT count(*) FROM wardrobe_item WHERE category = :category",
+]
+
+
+def build_database(path: str, items: int):
+    engine = create_engine(f"sqlite:///{path}")
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(SCHEMA)
+        conn.execute(text(
+            "INSERT INTO wardrobe_item (image_url, category, style_tags, recommendation_id, created_at) "
+            "VALUES (:image_url, :category, :style_tags, :recommendation_id, :created_at)"
+        ), [
+            {
+                'image_url': f"/uploads/{i}.jpg",
+                'category': CATEGORIES[i % len(CATEGORIES)],
+                'style_tags': '["casual"]',
+                'recommendation_id': f"user_{i}" if i % 3 else None,
+                'created_at': start + timedelta(minutes=i)
+            }
+            for i in range(items)
+        ])
+    engine.dispose()
+
+
+def run_profile(path: str, tuned: bool, readers: int, writers: int, seconds: float) -> dict:
+    if tuned:
+        engine = create_engine(f"sqlite:///{path}", **engine_options())
+        install_sqlite_pragmas(engine)
+        run_migrations(engine)
+    else:
+        engine = create_engine(f"sqlite:///{path}", connect_args={'check_same_thread': False})
+
+    stop = time.perf_counter() + seconds
+    lock = threading.Lock()
+    latencies = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+
+    def reader():
+        local = []
+        while time.perf_counter() < stop:
+            query = random.choice(READ_QUERIES)
+            t0 = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(query), {'category': random.choice(CATEGORIES)}).fetchall()
+                local.append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    errors['read'] += 1
+        with lock:
+            latencies['read'].extend(local)
+
+    def writer():
+        local = []
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        "INSERT INTO wardrobe_item (image_url, category, created_at) VALUES (:u, :c, :t)"
+                    ), {'u': '/uploads/new.jpg', 'c': random.choice(CATEGORIES), 't': datetime.now()})
+                local.append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    errors['write'] += 1
+        with lock:
+            latencies['write'].extend(local)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    def summary(kind):
+        values = sorted(latencies[kind])
+        if not values:
+            return {'ops_per_sec': 0.0, 'p95_ms': None, 'errors': errors[kind]}
+        return {
+            'ops_per_sec': round(len(values) / seconds, 1),
+            'p95_ms': round(values[int(len(values) * 0.95) - 1 if len(values) > 1 else 0] * 1000, 2),
+            'errors': errors[kind]
+        }
+
+    return {'read': summary('read'), 'write': summary('write')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQLite defaults vs the tuned wardrobe.db profile')
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=1)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tuned in (('default', False), ('tuned', True)):
+            path = os.path.join(tmp, f"{label}.db")
+            build_database(path, args.items)
+            result = run_profile(path, tuned, args.readers, args.writers, args.seconds)
+            print(f"📊 {label:8s} reads {result['read']['ops_per_sec']:>8}/s  p95 {result['read']['p95_ms']}ms  "
+                  f"errors {result['read']['errors']} | writes {result['write']['ops_per_sec']:>7}/s  "
+                  f"p95 {result['write']['p95_ms']}ms  errors {result['write']['errors']}")
+
+
+if __name__ == '__main__':
+    main()
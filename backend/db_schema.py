@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Database Schema Management
+==========================
+
+Versioned migrations and connection tuning for wardrobe.db.
+
+``db.create_all()`` only creates missing tables, so anything added to an
+existing table (indexes so far) goes through ``MIGRATIONS``. The applied
+version is stored in SQLite's ``PRAGMA user_version``. Every statement is
+idempotent, which keeps fresh databases (where create_all already built the
+indexes) and old ones on the same path.
+"""
+
+import os
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Per-connection pragmas: WAL lets readers run alongside a writer, and
+# synchronous=NORMAL is durable across application crashes in WAL mode
+SQLITE_PRAGMAS: Dict[str, object] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 16000)),  # negative = KiB
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_MB', 128)) * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+}
+
+# (version, description, statements)
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, 'wardrobe_item indexes for listing, category and style card queries', [
+        'CREATE INDEX IF NOT EXISTS ix_wardrobe_item_created_at_id ON wardrobe_item (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_wardrobe_item_category ON wardrobe_item (category)',
+        'CREATE INDEX IF NOT EXISTS ix_wardrobe_item_recommendation_id ON wardrobe_item (recommendation_id)',
+    ]),
+]
+
+
+def engine_options(pool_size: int = 10, max_overflow: int = 20) -> Dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for threaded serving against a SQLite file"""
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': 30,
+        'connect_args': {
+            # Connections are pooled across request and worker threads
+            'check_same_thread': False,
+            'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+        },
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, object] = SQLITE_PRAGMAS):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine, pragmas: Dict[str, object] = SQLITE_PRAGMAS):
+    """Apply the pragmas to every new connection the engine opens"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def run_migrations(engine) -> int:
+    """Apply pending migrations; returns the schema version afterwards"""
+    with engine.begin() as conn:
+        current = conn.exec_driver_sql('PRAGMA user_version').scalar() or 0
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+            current = version
+            logger.info(f"🗄️ Applied migration {version}: {description}")
+        # Refresh planner statistics where SQLite thinks it is worthwhile
+        conn.exec_driver_sql('PRAGMA optimize')
+    return current
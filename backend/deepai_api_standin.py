@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for DeepAI's text2img API, for testing the outbound client and image jobs
+Usage: python deepai_api_standin.py --port 8769 [--delay 5] [--fail] [--hang]
+Then start the backend with DEEPAI_API_BASE=http://localhost:8769/api DEEPAI_API_KEY=test
+"""
+
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_server(port: int = 8769, delay: float = 0.0, fail: bool = False, hang: bool = False) -> ThreadingHTTPServer:
+    stats = {'requests': 0}
+    lock = threading.Lock()
+
+    class DeepAIHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+            with lock:
+                stats['requests'] += 1
+            if self.path.rstrip('/') != '/api/text2img':
+                self._send(404, {'err': 'not found'})
+                return
+            if hang:
+                # Emulate a provider that accepts connections but never answers
+                time.sleep(3600)
+            if delay:
+                time.sleep(delay)
+            if fail:
+                self._send(502, {'err': 'upstream unavailable'})
+                return
+            image_id = uuid.uuid4().hex
+            self._send(200, {'id': image_id, 'output_url': f"http://localhost:{port}/images/{image_id}.jpg"})
+
+        def do_GET(self):
+            if self.path == '/stats':
+                with lock:
+                    self._send(200, dict(stats))
+            else:
+                self._send(404, {'err': 'not found'})
+
+        def _send(self, status: int, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), DeepAIHandler)
+    server.daemon_threads = True
+    server.stats = stats
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emulate the DeepAI text2img API locally')
+    parser.add_argument('--port', type=int, default=8769)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds before answering')
+    parser.add_argument('--fail', action='store_true', help='Answer every request with HTTP 502')
+    parser.add_argument('--hang', action='store_true', help='Never answer (exercises read timeouts)')
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.delay, args.fail, args.hang)
+    print(f"🎨 DeepAI API stand-in on http://localhost:{args.port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
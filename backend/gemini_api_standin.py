@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent REST API, for tests and benchmarks
+Usage: python gemini_api_standin.py --port 8766 [--delay 1.5] [--fail_rate 0.1]
+Then start the backend with GOOGLE_API_BASE=http://localhost:8766/v1beta GEMINI_API_KEY=test
+GET /stats returns how many generateContent calls were served.
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROUTE = re.compile(r'^/v1beta/models/([\w.\-]+):generateContent(\?.*)?$')
+
+
+def stylist_reply(prompt: str) -> str:
+    """Canned stylist answer in the format the backend asks for"""
+    match = re.search(r'User vibe/look:\s*(.+)', prompt)
+    look = match.group(1).strip() if match else prompt.strip()[:80]
+    return (
+        f"✨ Inspired by modern street style.\n"
+        f"- Outfit: A relaxed take on {look}\n"
+        f"- Accessories: Gold hoops and a structured mini bag\n"
+        f"- Shoes: White leather sneakers\n"
+        f"- Hairstyle/Makeup: Soft waves, dewy skin\n"
+        f"- Style Inspiration: Off-duty model looks"
+    )
+
+
+def make_server(port: int = 8766, delay: float = 0.0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    stats = {'requests': 0}
+    lock = threading.Lock()
+
+    class GeminiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            match = ROUTE.match(self.path)
+            if not match:
+                self._send(404, {'error': {'code': 404, 'message': 'not found'}})
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            with lock:
+                stats['requests'] += 1
+            if delay:
+                time.sleep(delay)
+            if fail_rate and random.random() < fail_rate:
+                self._send(503, {'error': {'code': 503, 'message': 'The model is overloaded.'}})
+                return
+            prompt = ''.join(
+                part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', [])
+            )
+            self._send(200, {
+                'candidates': [{
+                    'content': {'role': 'model', 'parts': [{'text': stylist_reply(prompt)}]},
+                    'finishReason': 'STOP'
+                }],
+                'modelVersion': match.group(1)
+            })
+
+        def do_GET(self):
+            if self.path == '/stats':
+                with lock:
+                    self._send(200, dict(stats))
+            else:
+                self._send(404, {'error': {'code': 404, 'message': 'not found'}})
+
+        def _send(self, status: int, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), GeminiHandler)
+    server.stats = stats
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emulate the Gemini generateContent API locally')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--delay', type=float, default=1.5, help='Seconds of simulated model latency')
+    parser.add_argument('--fail_rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 503')
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.delay, args.fail_rate)
+    print(f"🤖 Gemini API stand-in on http://localhost:{args.port}/v1beta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Gemini Client
+=============
+
+One process-wide client for the Gemini text model.
+
+Requests go to the ``generateContent`` REST endpoint over a shared,
+keep-alive session (so GOOGLE_API_BASE can point at a local
+stand-in, see gemini_api_standin.py). Responses are cached under a
+normalised cache key, first in an in-memory LRU and then on disk with a TTL,
+and concurrent calls for the same key are coalesced so only one of them
+reaches the API.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case/whitespace-insensitive form of a prompt ("Diwali look " == "diwali look")"""
+    return ' '.join(prompt.lower().split())
+
+
+class _InFlight:
+    """A pending upstream call that later callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.text: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class GeminiClient:
+    """Cached, coalescing client for ``models/<model>:generateContent``."""
+
+    def __init__(self, api_key: Optional[str], model: str = 'gemini-1.5-flash',
+                 api_base: str = 'https://generativelanguage.googleapis.com/v1beta',
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 cache_size: int = 256, cache_dir: Optional[str] = None,
+                 cache_ttl_seconds: float = 24 * 3600, session=None):
+        self.api_key = api_key
+        self.model = model
+        self.api_base = api_base.rstrip('/')
+        # None leaves the timeout to the session: an outbound.Provider applies its own (connect, read) pair
+        self.timeout = timeout if timeout is not None or session is not None else 30.0
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # requests.Session or anything with the same post() (e.g. an outbound.Provider)
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self._memory: OrderedDict = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'coalesced': 0, 'upstream_calls': 0, 'errors': 0}
+
+    def generate(self, prompt: str, cache_key: Optional[str] = None) -> str:
+        """Model text for a prompt; cache_key (default: the prompt) decides which prompts share a response"""
+        key = self._key(cache_key if cache_key is not None else prompt)
+
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return text
+
+        text = self._read_disk(key)
+        if text is not None:
+            with self._lock:
+                self._stats['disk_hits'] += 1
+                self._remember(key, text)
+            return text
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            if not call.done.wait(self._coalesce_wait()):
+                raise TimeoutError('Timed out waiting for a coalesced Gemini call')
+            if call.error is not None:
+                raise call.error
+            return call.text
+
+        try:
+            text = self._request(prompt)
+            call.text = text
+            with self._lock:
+                self._remember(key, text)
+            self._write_disk(key, text)
+            return text
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['in_flight'] = len(self._inflight)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _coalesce_wait(self) -> float:
+        """How long a coalesced caller waits for the leader's upstream call"""
+        timeout = self.timeout
+        if timeout is None:
+            timeout = getattr(self.session, 'timeout', None) or 30.0
+        return 2 * (sum(timeout) if isinstance(timeout, tuple) else timeout)
+
+    def _request(self, prompt: str) -> str:
+        with self._lock:
+            self._stats['upstream_calls'] += 1
+        # Key in a header, not ?key=, so it never appears in URLs quoted by error messages
+        kwargs = {'timeout': self.timeout} if self.timeout is not None else {}
+        response = self.session.post(
+            f"{self.api_base}/models/{self.model}:generateContent",
+            headers={'x-goog-api-key': self.api_key or ''},
+            json={'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]},
+            **kwargs
+        )
+        response.raise_for_status()
+        candidates = response.json().get('candidates') or []
+        parts = (candidates[0].get('content') or {}).get('parts', []) if candidates else []
+        text = ''.join(part.get('text', '') for part in parts).strip()
+        if not text:
+            raise ValueError('Empty response from Gemini')
+        return text
+
+    def _key(self, cache_key: str) -> str:
+        return hashlib.sha1(f"{self.model}\n{normalize_prompt(cache_key)}".encode()).hexdigest()
+
+    def _remember(self, key: str, text: str):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.cache_size:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('created_at', 0) > self.cache_ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get('text')
+
+    def _write_disk(self, key: str, text: str):
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'created_at': time.time(), 'model': self.model, 'text': text}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save Gemini response cache: {e}")
@@ -21,6 +21,8 @@ SRC_DIR = os.path.join(RECOMMENDATION_SYSTEM_DIR, 'src')
 
 if SRC_DIR not in sys.path:
     sys.path.append(SRC_DIR)
+if RECOMMENDATION_SYSTEM_DIR not in sys.path:
+    sys.path.append(RECOMMENDATION_SYSTEM_DIR)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,12 +33,17 @@ try:
     # Change to recommendation system directory for proper imports
     original_cwd = os.getcwd()
     os.chdir(RECOMMENDATION_SYSTEM_DIR)
-    
-    from src.data.robust_data_manager import RobustDataManager, EmbeddingIndex
-    from src.recommend.robust_recommender import RobustOutfitRecommender
-    
-    # Change back to original directory
-    os.chdir(original_cwd)
+    try:
+        from src.data.robust_data_manager import RobustDataManager, EmbeddingIndex
+        from src.recommend.robust_recommender import RobustOutfitRecommender
+        from src.recommend.outfit_cache import OutfitResultCache
+        from src.recommend.outfit_table import OutfitTable, OutfitPrecomputer
+        from src.utils.lazy_collage import LazyCollageRenderer
+        from src.utils.collage_cache import CollageCache
+        from src.recommend.outfit_log import OutfitLog
+    finally:
+        # Change back even when a model dependency is missing, or uploads resolve against the wrong directory
+        os.chdir(original_cwd)
     
     logger.info("✅ Successfully imported recommendation system modules")
 except ImportError as e:
@@ -59,6 +66,16 @@ except ImportError as e:
     RobustDataManager = MockDataManager
     RobustOutfitRecommender = MockRecommender
     EmbeddingIndex = None
+    
+    # The caches, outfit table/log and collage renderer have no heavy dependencies, so they stay usable without the models
+    from src.recommend.outfit_cache import OutfitResultCache
+    from src.recommend.outfit_table import OutfitTable, OutfitPrecomputer
+    from src.utils.lazy_collage import LazyCollageRenderer
+    from src.utils.collage_cache import CollageCache
+    from src.recommend.outfit_log import OutfitLog
+
+# Shared by every adapter instance; keys carry the item store version
+_result_cache = OutfitResultCache()
 
 class OutfitGenerationAdapter:
     """Adapter for generating outfit recommendations using the recommendation system."""
@@ -162,7 +179,8 @@ class OutfitGenerationAdapter:
                 catalog_df=self.catalog_df,
                 embedding_index=self.embedding_index,
                 image_base_dir=raw_dir,
-                output_dir=output_dir
+                output_dir=output_dir,
+                result_cache=_result_cache
             )
             
             self.initialized = True
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Nager.Date holiday API, for testing /api/trending offline
+Usage: python holiday_api_standin.py --port 8765 [--delay 2] [--fail]
+Then start the backend with HOLIDAY_API_BASE=http://localhost:8765/api/v3
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from holiday_calendar import BUNDLED_CALENDAR_DIR
+
+ROUTE = re.compile(r'^/api/v3/PublicHolidays/(\d{4})/([A-Za-z]{2})/?$')
+
+
+def make_handler(calendar_dir: str, delay: float, fail: bool):
+    class HolidayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if delay:
+                time.sleep(delay)
+            match = ROUTE.match(self.path)
+            if fail or not match:
+                self._send(500 if fail else 404, {'error': 'unavailable' if fail else 'not found'})
+                return
+            year, country = match.group(1), match.group(2).upper()
+            try:
+                with open(os.path.join(calendar_dir, f"{country}.json"), 'r') as f:
+                    years = json.load(f).get('years', {})
+            except (OSError, ValueError):
+                years = {}
+            holidays = [dict(holiday, countryCode=country) for holiday in years.get(year, [])]
+            self._send(200, holidays)
+
+        def _send(self, status: int, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            print(f"📅 {self.address_string()} {format % args}")
+
+    return HolidayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local holiday calendar in the Nager.Date format')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--calendar_dir', default=BUNDLED_CALENDAR_DIR, help='Directory with <country>.json calendars')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before answering')
+    parser.add_argument('--fail', action='store_true', help='Answer every request with HTTP 500')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.calendar_dir, args.delay, args.fail))
+    print(f"📅 Holiday API stand-in on http://localhost:{args.port}/api/v3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
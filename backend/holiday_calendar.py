@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Holiday Calendar
+================
+
+Public holidays for the trending styles without a network call on the
+request path. Lookups are served from a per-year in-memory cache, which is
+filled from the last fetched copy on disk or the bundled calendar
+(data/holidays/<country>.json). Entries older than the TTL are refreshed
+from the holiday API (Nager.Date format) on a background thread; a failed
+refresh keeps serving what is already there.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_CALENDAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'holidays')
+
+
+class HolidayProvider:
+    """Per-year holiday lists with TTL and non-blocking refresh."""
+
+    def __init__(self, api_base: str = 'https://date.nager.at/api/v3', country: str = 'IN',
+                 cache_dir: Optional[str] = None, ttl_seconds: float = 24 * 3600, timeout: float = 5.0,
+                 bundled_dir: str = BUNDLED_CALENDAR_DIR, http=None):
+        self.api_base = api_base.rstrip('/')
+        self.country = country
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.bundled_dir = bundled_dir
+        # Anything with a requests-style get() (e.g. an outbound.Provider)
+        self.http = http or requests
+        self._lock = threading.Lock()
+        self._years: Dict[int, Dict] = {}  # year -> {'holidays', 'fetched_at', 'source'}
+        self._refreshing = set()
+        self._listeners: List[Callable[[int], None]] = []
+
+    def holidays(self, year: int) -> List[Dict]:
+        """Holidays for a year from memory/disk; schedules a refresh when stale"""
+        with self._lock:
+            entry = self._years.get(year)
+        if entry is None:
+            entry = self._load_local(year)
+            with self._lock:
+                entry = self._years.setdefault(year, entry)
+        if time.time() - entry['fetched_at'] >= self.ttl_seconds:
+            self.refresh_async(year)
+        return entry['holidays']
+
+    def on_refresh(self, listener: Callable[[int], None]):
+        """Call listener(year) whenever a year's holidays were replaced"""
+        self._listeners.append(listener)
+
+    def refresh_async(self, year: int):
+        with self._lock:
+            if year in self._refreshing:
+                return
+            self._refreshing.add(year)
+        threading.Thread(target=self._refresh_in_background, args=(year,), daemon=True).start()
+
+    def refresh(self, year: int) -> bool:
+        """Fetch a year from the API now; True if the cache was updated"""
+        url = f"{self.api_base}/PublicHolidays/{year}/{self.country}"
+        try:
+            response = self.http.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            holidays = response.json()
+            if not isinstance(holidays, list):
+                raise ValueError('unexpected holiday payload')
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Holiday refresh for {year} failed: {e}")
+            with self._lock:
+                entry = self._years.get(year)
+                if entry is not None:
+                    # Keep serving the current list; retry after another TTL
+                    entry['fetched_at'] = time.time()
+            return False
+
+        # The API only knows public holidays; keep bundled festivals it does not list
+        names = {holiday.get('name') for holiday in holidays}
+        bundled = [holiday for holiday in self._read_bundled(year) if holiday.get('name') not in names]
+        merged = sorted(holidays + bundled, key=lambda holiday: holiday.get('date', ''))
+        with self._lock:
+            self._years[year] = {'holidays': merged, 'fetched_at': time.time(), 'source': 'api'}
+        self._write_cache(year, holidays)
+        for listener in self._listeners:
+            listener(year)
+        return True
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                str(year): {'source': entry['source'], 'holidays': len(entry['holidays']),
+                            'age_seconds': round(time.time() - entry['fetched_at'])}
+                for year, entry in self._years.items()
+            }
+
+    def _refresh_in_background(self, year: int):
+        try:
+            self.refresh(year)
+        finally:
+            with self._lock:
+                self._refreshing.discard(year)
+
+    def _load_local(self, year: int) -> Dict:
+        """Last fetched copy if there is one, else the bundled calendar (stale, so it gets refreshed)"""
+        cached = self._read_json(self._cache_path(year)) if self.cache_dir else None
+        if cached and isinstance(cached.get('holidays'), list):
+            names = {holiday.get('name') for holiday in cached['holidays']}
+            bundled = [holiday for holiday in self._read_bundled(year) if holiday.get('name') not in names]
+            return {
+                'holidays': sorted(cached['holidays'] + bundled, key=lambda holiday: holiday.get('date', '')),
+                'fetched_at': cached.get('fetched_at', 0),
+                'source': 'cache'
+            }
+        return {'holidays': self._read_bundled(year), 'fetched_at': 0, 'source': 'bundled'}
+
+    def _read_bundled(self, year: int) -> List[Dict]:
+        data = self._read_json(os.path.join(self.bundled_dir, f"{self.country}.json")) or {}
+        return list(data.get('years', {}).get(str(year), []))
+
+    def _cache_path(self, year: int) -> str:
+        return os.path.join(self.cache_dir, f"{self.country}-{year}.json")
+
+    def _write_cache(self, year: int, holidays: List[Dict]):
+        if not self.cache_dir:
+            return
+        path = self._cache_path(year)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'fetched_at': time.time(), 'holidays': holidays}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save holiday cache: {e}")
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Image Variants
+==============
+
+Resized, re-encoded copies of wardrobe and upload images for grids and cards.
+
+A variant is produced on its first request and stored in a size-bounded
+directory (least recently used files are evicted first). Its key is a hash
+of the source file's path, size and mtime plus the width, format and
+quality, so it doubles as a strong ETag, and a replaced source image gets a
+new variant instead of a stale one. Requested widths snap up to a small
+set of allowed widths so clients cannot fill the cache with one-pixel
+differences, and images are never upscaled.
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Renders of the same key are serialised on one of a fixed set of locks
+LOCK_STRIPES = 64
+
+VARIANT_MIMETYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg', 'png': 'image/png'}
+FORMAT_ALIASES = {'jpeg': 'jpg'}
+
+
+class ImageVariantCache:
+    """On-demand image resizing with a size-bounded disk cache."""
+
+    def __init__(self, source_dirs: Sequence[str], cache_dir: str, max_bytes: int = 512 * 1024 * 1024,
+                 widths: Sequence[int] = (160, 320, 480, 640, 960, 1280), quality: int = 80):
+        self.source_dirs = list(source_dirs)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.widths = sorted(set(widths))
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._total_bytes: Optional[int] = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'source_bytes': 0, 'variant_bytes': 0}
+
+    @staticmethod
+    def normalize_format(fmt: str) -> Optional[str]:
+        fmt = FORMAT_ALIASES.get(fmt.lower(), fmt.lower())
+        return fmt if fmt in VARIANT_MIMETYPES else None
+
+    @staticmethod
+    def mimetype(fmt: str) -> str:
+        return VARIANT_MIMETYPES[fmt]
+
+    def snap_width(self, width: int) -> int:
+        """Smallest allowed width that is at least ``width`` (the largest one past the end)"""
+        for allowed in self.widths:
+            if allowed >= width:
+                return allowed
+        return self.widths[-1]
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """Source path for a bare filename in the first source dir that has it"""
+        if not filename or filename.startswith('.') or os.path.basename(filename) != filename:
+            return None
+        for source_dir in self.source_dirs:
+            path = os.path.join(source_dir, filename)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def get_or_create(self, filename: str, width: int, fmt: str) -> Optional[Tuple[str, str]]:
+        """(variant path, key) for a source image, resizing it on the first request; None if unknown"""
+        source_path = self.resolve(filename)
+        if source_path is None:
+            return None
+        width = self.snap_width(width)
+        st = os.stat(source_path)
+        key = hashlib.sha1(
+            f"{os.path.abspath(source_path)}\n{st.st_size}\n{st.st_mtime_ns}\n{width}\n{fmt}\n{self.quality}".encode()
+        ).hexdigest()
+        path = self._path(key, fmt)
+        if self._touch(path):
+            self._count('hits')
+            return path, key
+
+        with self._lock_for(key):
+            if self._touch(path):
+                self._count('hits')
+                return path, key
+            self._count('misses')
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=f'.{fmt}', dir=self.cache_dir, prefix='.render_')
+            os.close(fd)
+            try:
+                self._render(source_path, tmp_path, width, fmt)
+                size = os.path.getsize(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            with self._lock:
+                self._stats['source_bytes'] += st.st_size
+                self._stats['variant_bytes'] += size
+                if self._total_bytes is not None:
+                    self._total_bytes += size
+        # The caller is about to send this file, so eviction must not pick it
+        self._evict_if_needed(keep=path)
+        return path, key
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['bytes'] = self._current_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def _render(self, source_path: str, output_path: str, width: int, fmt: str):
+        from PIL import Image, ImageOps
+        with Image.open(source_path) as image:
+            # JPEG decoders can skip straight to a reduced size (both sides stay >= width,
+            # so an EXIF rotation below cannot leave the image narrower than requested)
+            image.draft('RGB', (width, width))
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            if fmt == 'jpg' or not has_alpha:
+                if has_alpha:
+                    # JPEG has no alpha channel: flatten onto white like the card background
+                    rgba = image.convert('RGBA')
+                    background = Image.new('RGB', rgba.size, 'white')
+                    background.paste(rgba, mask=rgba.split()[3])
+                    image = background
+                else:
+                    image = image.convert('RGB')
+            else:
+                image = image.convert('RGBA')
+
+            if fmt == 'png':
+                image.save(output_path, 'PNG', optimize=True)
+            elif fmt == 'webp':
+                image.save(output_path, 'WEBP', quality=self.quality, method=4)
+            else:
+                image.save(output_path, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+
+    def _touch(self, path: str) -> bool:
+        # Hits refresh the mtime, which eviction uses as the last-used time
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _current_bytes(self) -> int:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            return self._total_bytes
+
+    def _evict_if_needed(self, keep: Optional[str] = None):
+        if self._current_bytes() <= self.max_bytes:
+            return
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self._stats['evictions'] += 1
+            self._total_bytes = total
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._key_locks[int(key[:8], 16) % LOCK_STRIPES]
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
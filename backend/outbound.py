@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Outbound HTTP
+=============
+
+Shared client for calls to third-party APIs (DeepAI, Gemini, the holiday
+API). Each provider gets:
+
+- a pooled keep-alive ``requests.Session``
+- a concurrency limit (callers wait up to ``acquire_timeout`` for a slot)
+- default (connect, read) timeouts
+- a circuit breaker: after ``failure_threshold`` consecutive failures
+  (connection errors, timeouts, 429/5xx) calls fail fast with
+  ``CircuitOpenError`` for ``reset_timeout`` seconds, then one trial call
+  decides whether to close it again
+- a latency histogram and call counters for the stats endpoint
+
+Both error types subclass ``requests.RequestException``, so existing
+``except requests.RequestException`` handlers cover them.
+"""
+
+import time
+import bisect
+import logging
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class CircuitOpenError(requests.RequestException):
+    """The provider's circuit is open; the call was not attempted."""
+
+
+class ProviderBusyError(requests.RequestException):
+    """No concurrency slot became free within the acquire timeout."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a half-open trial call."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def cancel_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._total_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self._total_ms += ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total_ms = self._total_ms
+        count = sum(counts)
+        labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ['inf']
+        return {
+            'count': count,
+            'mean_ms': round(total_ms / count, 1) if count else None,
+            'p50_ms': self._percentile(counts, count, 0.50),
+            'p95_ms': self._percentile(counts, count, 0.95),
+            'buckets': dict(zip(labels, counts))
+        }
+
+    def _percentile(self, counts, count: int, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the percentile (None past the last bound)"""
+        if not count:
+            return None
+        target = fraction * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else None
+        return None
+
+
+class Provider:
+    """Pooled, limited and circuit-broken access to one upstream host."""
+
+    def __init__(self, name: str, max_concurrency: int = 4,
+                 timeout: Union[float, Tuple[float, float]] = (5.0, 30.0), acquire_timeout: float = 10.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyHistogram()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._counts = {'calls': 0, 'failures': 0, 'rejected_open': 0, 'rejected_busy': 0, 'in_flight': 0}
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if not self.breaker.allow():
+            self._count('rejected_open')
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            # Not the upstream's fault: hand a half-open trial back untouched
+            self.breaker.cancel_trial()
+            self._count('rejected_busy')
+            raise ProviderBusyError(f"{self.name} has {self.max_concurrency} calls in flight")
+
+        kwargs.setdefault('timeout', self.timeout)
+        self._count('calls')
+        self._count('in_flight')
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._failed()
+            raise
+        except BaseException:
+            # A local error (bad arguments, interrupt) says nothing about the
+            # upstream, but a half-open trial must not stay claimed forever
+            self.breaker.cancel_trial()
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+            self._count('in_flight', -1)
+            self._slots.release()
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self._failed()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counts)
+        stats['circuit'] = self.breaker.state
+        stats['latency'] = self.latency.snapshot()
+        return stats
+
+    def _failed(self):
+        self._count('failures')
+        was_closed = self.breaker.state == 'closed'
+        self.breaker.record_failure()
+        if was_closed and self.breaker.state == 'open':
+            logger.warning(f"🔌 {self.name} circuit opened after repeated failures")
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self._counts[key] += delta
+
+
+class OutboundClient:
+    """Registry of providers, configured once at startup."""
+
+    def __init__(self):
+        self._providers: Dict[str, Provider] = {}
+
+    def register(self, name: str, **config) -> Provider:
+        provider = Provider(name, **config)
+        self._providers[name] = provider
+        return provider
+
+    def provider(self, name: str) -> Provider:
+        return self._providers[name]
+
+    def stats(self) -> Dict:
+        return {name: provider.stats() for name, provider in self._providers.items()}
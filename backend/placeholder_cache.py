@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Placeholder Cache
+=================
+
+Fashion placeholder images for the stylist fallback, rendered once per
+prompt text.
+
+A placeholder only shows the first ``text_limit`` characters of the image
+prompt, so its key is a hash of that (whitespace-normalised) text plus a
+layout version. The PNG bytes are kept in an in-memory LRU and in a
+size-bounded directory (least recently used files are evicted first), and
+are served from a stable URL, ``<url_prefix>/<key>.png``, that browsers
+can cache forever. The text behind each key is kept too (in memory and in
+a ``<key>.txt`` sidecar next to the PNG, with its own count limit), so a
+URL whose image was evicted is rendered again instead of going missing.
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the placeholder design changes so old images are not reused
+PLACEHOLDER_LAYOUT_VERSION = 1
+
+# Renders of the same key are serialised on one of a fixed set of locks
+LOCK_STRIPES = 64
+
+KEY_PATTERN = re.compile(r'[0-9a-f]{40}')
+
+
+def placeholder_text(prompt: str, text_limit: int = 100) -> str:
+    """The text a placeholder actually shows: normalised and truncated"""
+    text = ' '.join(prompt.split())
+    return text[:text_limit] + '...' if len(text) > text_limit else text
+
+
+class PlaceholderCache:
+    """Render-once placeholder images with a memory LRU over a bounded disk directory."""
+
+    def __init__(self, render: Callable[[str], bytes], cache_dir: Optional[str] = None,
+                 url_prefix: str = '/api/placeholders', memory_entries: int = 64,
+                 max_bytes: int = 64 * 1024 * 1024, text_limit: int = 100,
+                 text_entries: int = 100000):
+        self.render = render
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.text_limit = text_limit
+        self.text_entries = text_entries
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._memory: OrderedDict = OrderedDict()
+        self._texts: OrderedDict = OrderedDict()
+        self._total_bytes: Optional[int] = None
+        self._text_count: Optional[int] = None
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'renders': 0, 'evictions': 0}
+
+    def key_for(self, prompt: str) -> str:
+        text = placeholder_text(prompt, self.text_limit)
+        return hashlib.sha1(f"v{PLACEHOLDER_LAYOUT_VERSION}\n{text}".encode()).hexdigest()
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}.png"
+
+    def get_or_render(self, prompt: str) -> str:
+        """Stable URL of the placeholder for a prompt, rendering it on the first call"""
+        key = self.key_for(prompt)
+        if self._lookup(key) is not None:
+            return self.url_for(key)
+
+        with self._lock_for(key):
+            if self._lookup(key) is None:
+                self._render_and_store(key, placeholder_text(prompt, self.text_limit))
+        return self.url_for(key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """PNG bytes for a key (memory, then disk, then rendered again from its text), or None"""
+        if not KEY_PATTERN.fullmatch(key):
+            return None
+        image_bytes = self._lookup(key)
+        if image_bytes is not None:
+            return image_bytes
+
+        text = self._read_text(key)
+        if text is None:
+            return None
+        with self._lock_for(key):
+            image_bytes = self._lookup(key)
+            if image_bytes is None:
+                image_bytes = self._render_and_store(key, text)
+        return image_bytes
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            image_bytes = self._memory.get(key)
+            if image_bytes is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return image_bytes
+
+        image_bytes = self._read_disk(key)
+        if image_bytes is not None:
+            with self._lock:
+                self._stats['disk_hits'] += 1
+                self._remember(key, image_bytes)
+        return image_bytes
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        stats['disk_bytes'] = self._current_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def _render_and_store(self, key: str, text: str) -> bytes:
+        image_bytes = self.render(text)
+        with self._lock:
+            self._stats['renders'] += 1
+            self._remember(key, image_bytes)
+            self._texts[key] = text
+            self._texts.move_to_end(key)
+            while len(self._texts) > self.text_entries:
+                self._texts.popitem(last=False)
+        self._write_text(key, text)
+        self._write_disk(key, image_bytes)
+        return image_bytes
+
+    def _remember(self, key: str, image_bytes: bytes):
+        self._memory[key] = image_bytes
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                image_bytes = f.read()
+            # Hits refresh the mtime, which eviction uses as the last-used time
+            os.utime(path)
+        except OSError:
+            return None
+        return image_bytes
+
+    def _read_text(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._texts.get(key)
+        if text is not None or not self.cache_dir:
+            return text
+        try:
+            with open(self._text_path(key), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_text(self, key: str, text: str):
+        if not self.cache_dir:
+            return
+        path = self._text_path(key)
+        existed = os.path.exists(path)
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.{threading.get_ident()}.txt.tmp")
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save placeholder text: {e}")
+            return
+        if not existed:
+            self._prune_texts_if_needed()
+
+    def _write_disk(self, key: str, image_bytes: bytes):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save placeholder image: {e}")
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(image_bytes)
+        self._evict_if_needed()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return entries
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.png'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _current_bytes(self) -> int:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            return self._total_bytes
+
+    def _evict_if_needed(self):
+        if self._current_bytes() <= self.max_bytes:
+            return
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self._stats['evictions'] += 1
+            self._total_bytes = total
+
+    def _text_files(self) -> List[Tuple[float, str]]:
+        with os.scandir(self.cache_dir) as it:
+            return [(entry.stat().st_mtime, entry.path) for entry in it
+                    if entry.is_file() and entry.name.endswith('.txt')]
+
+    def _prune_texts_if_needed(self):
+        # Sidecars are tiny, so they outlive their images; only their count is capped
+        with self._lock:
+            if self._text_count is None:
+                self._text_count = len(self._text_files())
+            else:
+                self._text_count += 1
+            if self._text_count <= self.text_entries:
+                return
+            files = sorted(self._text_files())
+            for _, path in files[:len(files) - self.text_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._text_count = min(len(files), self.text_entries)
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._key_locks[int(key[:8], 16) % LOCK_STRIPES]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _text_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.txt")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Offline job that precomputes the top outfits for every wardrobe item.
+
+Usage:
+  python precompute_outfits.py --full                 # rebuild the whole table
+  python precompute_outfits.py --added 12 --removed 7 # incremental refresh
+  python precompute_outfits.py --benchmark            # full rebuild vs incremental refresh
+"""
+import argparse
+import json
+import time
+
+from app import (
+    app, WardrobeItem, build_wardrobe_recommender, get_outfit_precomputer, OUTFIT_TABLE_PATH
+)
+
+
+def run_full(num_outfits, occasions):
+    with app.app_context():
+        recommender = build_wardrobe_recommender(WardrobeItem.query.all())
+    report = get_outfit_precomputer(num_outfits, occasions).rebuild(recommender)
+    print(f"✅ Full rebuild: {json.dumps(report)}")
+    return report
+
+
+def run_incremental(added_ids, removed_ids):
+    with app.app_context():
+        recommender = build_wardrobe_recommender(WardrobeItem.query.all())
+    report = get_outfit_precomputer().refresh(recommender, added_ids=added_ids, removed_ids=removed_ids)
+    print(f"✅ Incremental refresh: {json.dumps(report)}")
+    return report
+
+
+def run_benchmark(num_outfits, occasions):
+    """Time a full rebuild against removing and re-adding the newest item incrementally"""
+    with app.app_context():
+        db_items = WardrobeItem.query.order_by(WardrobeItem.created_at).all()
+    if len(db_items) < 2:
+        print("❌ Need at least two wardrobe items to benchmark")
+        return
+
+    # Embeddings are shared so only the outfit work is timed
+    start = time.perf_counter()
+    full = build_wardrobe_recommender(db_items)
+    build_seconds = time.perf_counter() - start
+    without_newest = build_wardrobe_recommender(db_items[:-1], embedding_index=full.embedding_index)
+    newest_id = str(db_items[-1].id)
+
+    precomputer = get_outfit_precomputer(num_outfits, occasions)
+    full_report = precomputer.rebuild(full)
+    removed_report = precomputer.refresh(without_newest, removed_ids=[newest_id])
+    added_report = precomputer.refresh(full, added_ids=[newest_id])
+
+    print("⏱️  Outfit table benchmark")
+    print(f"   Table: {OUTFIT_TABLE_PATH}")
+    print(f"   Wardrobe items: {len(db_items)}, occasions: {list(precomputer.occasions)}")
+    print(f"   Recommender build (embeddings + item store): {build_seconds:.3f}s")
+    for label, report in (('Full rebuild', full_report),
+                          (f'Incremental (remove {newest_id})', removed_report),
+                          (f'Incremental (add {newest_id})', added_report)):
+        print(f"   {label}: {report['seconds']:.3f}s, {report['seeds_recomputed']} seed/occasion pairs recomputed")
+    if added_report['seconds'] > 0:
+        print(f"   Speedup (add vs full): {full_report['seconds'] / added_report['seconds']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute top outfits for every wardrobe item')
+    parser.add_argument('--full', action='store_true', help='Rebuild the whole table')
+    parser.add_argument('--added', nargs='*', default=[], help='Item ids added since the last run')
+    parser.add_argument('--removed', nargs='*', default=[], help='Item ids removed since the last run')
+    parser.add_argument('--benchmark', action='store_true', help='Report full rebuild vs incremental refresh time')
+    parser.add_argument('--num_outfits', type=int, default=3, help='Outfits stored per seed item')
+    parser.add_argument('--occasions', nargs='*', default=['casual'], help='Occasions to precompute')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.num_outfits, args.occasions)
+    elif args.added or args.removed:
+        run_incremental(args.added, args.removed)
+    else:
+        run_full(args.num_outfits, args.occasions)
+
+
+if __name__ == '__main__':
+    main()
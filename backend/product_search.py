@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Product Search
+==============
+
+In-memory inverted index over the product catalog for /api/product-search.
+
+The catalog is tokenized once at load time. Every posting stores its
+precomputed BM25 impact (field-weighted term frequency, length
+normalisation and idf), and posting lists are kept in descending impact
+order, so a query only sums the head of each list. Query tokens that are
+not in the vocabulary fall back to prefix matches (search-as-you-type) and
+to terms one edit away (typos) through a deletion-neighbourhood table.
+Season/occasion themes and categories are kept as boolean facet masks
+and prices as an array; both filter the posting lists before the heads are
+summed, so filtered queries still return a full page.
+"""
+
+import re
+import math
+import json
+import heapq
+import logging
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Matches in the name count for more than matches in tags, category, brand or colours
+FIELD_WEIGHTS = {'name': 3.0, 'tags': 2.0, 'category': 1.5, 'brand': 1.0, 'colors': 1.0}
+
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHT = 0.6
+MIN_TYPO_LENGTH = 4
+
+
+def normalize_token(token: str) -> str:
+    """Fold simple plurals so 'boots'/'boot' and 'dresses'/'dress' share a posting list"""
+    if len(token) > 4 and token.endswith(('sses', 'xes', 'ches', 'shes')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize_token(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def _deletions(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class ProductSearchIndex:
+    """BM25-ranked product search with prefix/typo matching and facet filters."""
+
+    def __init__(self, products: Iterable[Dict], k1: float = 1.2, b: float = 0.75,
+                 max_postings: int = 2000, max_expansions: int = 8):
+        self.k1 = k1
+        self.b = b
+        self.max_postings = max_postings
+        self.max_expansions = max_expansions
+
+        self.products: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        for product in products:
+            position = self._positions.get(product['id'])
+            if position is None:
+                self._positions[product['id']] = len(self.products)
+                self.products.append(dict(product, themes=list(product.get('themes', []))))
+            else:
+                # Same product listed under several themes
+                themes = self.products[position]['themes']
+                themes.extend(theme for theme in product.get('themes', []) if theme not in themes)
+
+        self._build()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'ProductSearchIndex':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        products = data['products'] if isinstance(data, dict) else data
+        return cls(products, **kwargs)
+
+    def _build(self):
+        term_frequencies: List[Dict[str, float]] = []
+        lengths: List[float] = []
+        document_frequency: Dict[str, int] = defaultdict(int)
+
+        for product in self.products:
+            frequencies: Dict[str, float] = defaultdict(float)
+            for field, weight in FIELD_WEIGHTS.items():
+                value = product.get(field) or ''
+                text = ' '.join(value) if isinstance(value, list) else str(value)
+                for token in tokenize(text):
+                    frequencies[token] += weight
+            term_frequencies.append(frequencies)
+            lengths.append(sum(frequencies.values()))
+            for term in frequencies:
+                document_frequency[term] += 1
+
+        total = len(self.products)
+        average_length = (sum(lengths) / total) if total else 1.0
+        postings: Dict[str, Tuple[List[int], List[float]]] = defaultdict(lambda: ([], []))
+        for doc, frequencies in enumerate(term_frequencies):
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc] / average_length)
+            for term, tf in frequencies.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                docs, impacts = postings[term]
+                docs.append(doc)
+                impacts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        # Posting lists as arrays in descending impact order
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (docs, impacts) in postings.items():
+            docs = np.asarray(docs, dtype=np.int32)
+            impacts = np.asarray(impacts, dtype=np.float32)
+            order = np.lexsort((docs, -impacts))
+            self._postings[term] = (docs[order], impacts[order])
+        self._document_frequency = dict(document_frequency)
+        self._vocabulary = sorted(self._postings)
+
+        self._typo_table: Dict[str, List[str]] = defaultdict(list)
+        for term in self._vocabulary:
+            if len(term) >= MIN_TYPO_LENGTH:
+                for variant in _deletions(term) | {term}:
+                    self._typo_table[variant].append(term)
+
+        self._facets: Dict[str, Dict[str, np.ndarray]] = {'theme': {}, 'category': {}}
+        facet_docs: Dict[str, Dict[str, List[int]]] = {'theme': defaultdict(list), 'category': defaultdict(list)}
+        for doc, product in enumerate(self.products):
+            for theme in product['themes']:
+                facet_docs['theme'][theme.lower()].append(doc)
+            facet_docs['category'][str(product.get('category', '')).lower()].append(doc)
+        for facet, values in facet_docs.items():
+            for value, docs in values.items():
+                mask = np.zeros(total, dtype=bool)
+                mask[docs] = True
+                self._facets[facet][value] = mask
+        self._prices = np.asarray([float(product.get('price') or 0) for product in self.products], dtype=np.float64)
+
+        logger.info(f"🔎 Indexed {total} products ({len(self._vocabulary)} terms)")
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def has_theme(self, theme: str) -> bool:
+        return bool(theme) and theme.lower() in self._facets['theme']
+
+    def facet_counts(self) -> Dict[str, Dict[str, int]]:
+        return {facet: {value: int(mask.sum()) for value, mask in values.items()} for facet, values in self._facets.items()}
+
+    def search(self, query: str, themes: Optional[List[str]] = None, category: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               limit: int = 10) -> List[Dict]:
+        """Top products for the query, best first, within the given facets"""
+        if limit <= 0:
+            return []
+        mask = self._facet_mask(themes, category)
+        tokens = tokenize(query)
+        doc_parts, score_parts = [], []
+        for position, token in enumerate(tokens):
+            term_docs, term_scores = [], []
+            for term, weight in self._expand(token, is_last=position == len(tokens) - 1):
+                docs, impacts = self._filter(*self._postings[term], mask, min_price, max_price,
+                                             limit=self.max_postings)
+                term_docs.append(docs)
+                term_scores.append(impacts * weight)
+            if not term_docs:
+                continue
+            docs, scores = np.concatenate(term_docs), np.concatenate(term_scores)
+            if len(term_docs) > 1:
+                # A query token scores once per product, through its best expansion
+                order = np.lexsort((-scores, docs))
+                docs, scores = docs[order], scores[order]
+                first = np.ones(len(docs), dtype=bool)
+                first[1:] = docs[1:] != docs[:-1]
+                docs, scores = docs[first], scores[first]
+            doc_parts.append(docs)
+            score_parts.append(scores)
+
+        if not doc_parts:
+            return []
+        if len(doc_parts) == 1:
+            docs, totals = doc_parts[0], score_parts[0]
+        else:
+            # Docs are unique within each part, so plain fancy-index adds are safe
+            accumulator = np.zeros(len(self.products), dtype=np.float32)
+            for docs, scores in zip(doc_parts, score_parts):
+                accumulator[docs] += scores
+            docs = np.concatenate(doc_parts)
+            totals = accumulator[docs]
+
+        # A product repeats at most once per part, so this many entries hold `limit` distinct ones
+        keep = limit * len(doc_parts)
+        if len(docs) > keep:
+            top = np.argpartition(-totals, keep - 1)[:keep]
+            docs, totals = docs[top], totals[top]
+        results, seen = [], set()
+        for doc in docs[np.lexsort((docs, -totals))].tolist():
+            if doc not in seen:
+                seen.add(doc)
+                results.append(self.products[doc])
+                if len(results) == limit:
+                    break
+        return results
+
+    def browse(self, themes: Optional[List[str]] = None, category: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               limit: int = 10, exclude: Iterable[str] = ()) -> List[Dict]:
+        """Products within the facets in catalog order, without a query"""
+        mask = self._facet_mask(themes, category)
+        docs = np.flatnonzero(mask) if mask is not None else np.arange(len(self.products))
+        docs, _ = self._filter(docs, docs, None, min_price, max_price)
+        excluded = set(exclude)
+        results = (self.products[int(doc)] for doc in docs if self.products[int(doc)]['id'] not in excluded)
+        return list(islice(results, max(limit, 0)))
+
+    def _expand(self, token: str, is_last: bool) -> List[Tuple[str, float]]:
+        """Index terms a query token matches, with their weights"""
+        expansions = []
+        exact = token in self._postings
+        if exact:
+            expansions.append((token, 1.0))
+
+        # Prefix matches for the word being typed, or for a word with no exact match
+        if len(token) >= 2 and (is_last or not exact):
+            start = bisect_left(self._vocabulary, token)
+            candidates = []
+            for term in islice(self._vocabulary, start, start + 64):
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    candidates.append(term)
+            for term in self._most_frequent(candidates):
+                expansions.append((term, PREFIX_WEIGHT))
+
+        if not exact and len(token) >= MIN_TYPO_LENGTH:
+            candidates = set()
+            for variant in _deletions(token) | {token}:
+                candidates.update(self._typo_table.get(variant, ()))
+            seen = {term for term, _ in expansions}
+            for term in self._most_frequent(candidates - seen):
+                expansions.append((term, TYPO_WEIGHT))
+
+        return expansions
+
+    def _most_frequent(self, terms) -> List[str]:
+        return heapq.nlargest(self.max_expansions, terms, key=lambda term: (self._document_frequency[term], term))
+
+    def _facet_mask(self, themes: Optional[List[str]], category: Optional[str]) -> Optional[np.ndarray]:
+        mask = None
+        if themes:
+            mask = np.zeros(len(self.products), dtype=bool)
+            for theme in themes:
+                theme_mask = self._facets['theme'].get(theme.lower())
+                if theme_mask is not None:
+                    mask |= theme_mask
+        if category:
+            category_mask = self._facets['category'].get(category.lower())
+            if category_mask is None:
+                category_mask = np.zeros(len(self.products), dtype=bool)
+            mask = category_mask if mask is None else mask & category_mask
+        return mask
+
+    def _filter(self, docs: np.ndarray, values: np.ndarray, mask: Optional[np.ndarray],
+                min_price: Optional[float], max_price: Optional[float],
+                limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """First `limit` postings inside the facet mask and price range (order preserved)"""
+        keep = mask[docs] if mask is not None else None
+        if min_price is not None or max_price is not None:
+            prices = self._prices[docs]
+            in_range = np.ones(len(docs), dtype=bool)
+            if min_price is not None:
+                in_range &= prices >= min_price
+            if max_price is not None:
+                in_range &= prices <= max_price
+            keep = in_range if keep is None else keep & in_range
+        if keep is None:
+            return docs[:limit], values[:limit]
+        positions = np.flatnonzero(keep)[:limit]
+        return docs[positions], values[positions]
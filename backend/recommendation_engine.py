@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Warm Recommendation Engine
+==========================
+
+Process-wide owner of the expensive recommendation state: one CLIP
+classifier (loaded and warmed once), the wardrobe embedding index and a
+recommender with its columnar item store. Requests borrow the current
+recommender instead of building their own; when the wardrobe changes the
+engine picks up the added items' embeddings (stored by their classify
+jobs) and rebuilds the item store.
+
+Stylist prompts (CLIP text tower, LRU-cached per prompt) and query photos
+(image tower) are ranked against the stacked wardrobe and catalog image
+embeddings with a single matrix-vector product.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from generate_outfit_adapter import EmbeddingIndex, RobustDataManager, RobustOutfitRecommender
+
+logger = logging.getLogger(__name__)
+
+CATALOG_COLUMNS = ['id', 'category', 'subcategory', 'color', 'style_tags', 'image_url', 'description']
+
+
+class RecommendationEngine:
+    """Lazily loaded, version-keyed recommender shared by every request."""
+
+    def __init__(self, raw_dir: str, processed_dir: str, output_dir: str,
+                 image_dirs: Iterable[str] = (), recommender_kwargs: Optional[Callable[[], Dict]] = None,
+                 prompt_cache_size: int = 256):
+        self.raw_dir = raw_dir
+        self.processed_dir = processed_dir
+        self.output_dir = output_dir
+        # Extra directories (e.g. uploads) searched for wardrobe images by basename
+        self.image_dirs = list(image_dirs)
+        self.recommender_kwargs = recommender_kwargs or dict
+        self._lock = threading.RLock()
+        self._data_manager = None
+        self._embedding_index = None
+        self._recommender = None
+        self._version = None
+        self._stats = {'builds': 0, 'reuses': 0, 'embedded_items': 0, 'warmup_seconds': None, 'last_build_seconds': None}
+        self.prompt_cache_size = prompt_cache_size
+        self._prompt_embeddings: OrderedDict = OrderedDict()
+        self._prompt_lock = threading.Lock()
+        self._prompt_stats = {'hits': 0, 'misses': 0}
+        self._search_matrix = None  # (version, embeddings, ids, categories, sources)
+        self._catalog_categories = None
+        self._stored = None  # ((mtime_ns, size), {id: embedding}) of the shared embeddings file
+
+    @property
+    def data_manager(self) -> RobustDataManager:
+        """The data manager and its classifier, loaded on first use"""
+        with self._lock:
+            if self._data_manager is None:
+                self._data_manager = RobustDataManager(
+                    raw_dir=self.raw_dir,
+                    processed_dir=self.processed_dir,
+                    output_dir=self.output_dir
+                )
+            return self._data_manager
+
+    @property
+    def classifier(self):
+        return getattr(self.data_manager, 'classifier', None)
+
+    def warm_up(self):
+        """Load the model and run one dummy inference so the first request pays nothing"""
+        start = time.time()
+        classifier = self.classifier
+        if classifier is not None and hasattr(classifier, '_encode_image'):
+            from PIL import Image
+            classifier._encode_image(Image.new('RGB', (224, 224), color=(255, 255, 255)))
+        self._stats['warmup_seconds'] = round(time.time() - start, 3)
+        logger.info(f"🔥 Recommendation engine warmed up in {self._stats['warmup_seconds']}s")
+
+    def recommender_for(self, wardrobe_df: pd.DataFrame, version: str) -> RobustOutfitRecommender:
+        """Recommender over the given wardrobe, rebuilt only when the version changes"""
+        with self._lock:
+            if self._recommender is not None and self._version == version:
+                self._stats['reuses'] += 1
+                return self._recommender
+
+            start = time.time()
+            catalog_df = pd.DataFrame(columns=CATALOG_COLUMNS)
+            embedding_index = self._sync_embeddings(wardrobe_df, catalog_df)
+            self._recommender = RobustOutfitRecommender(
+                wardrobe_df=wardrobe_df,
+                catalog_df=catalog_df,
+                embedding_index=embedding_index,
+                image_base_dir=self.raw_dir,
+                output_dir=self.output_dir,
+                cache_version=version,
+                **self.recommender_kwargs()
+            )
+            self._version = version
+            self._stats['builds'] += 1
+            self._stats['last_build_seconds'] = round(time.time() - start, 3)
+            logger.info(f"🧠 Recommendation engine rebuilt for {len(wardrobe_df)} items in {self._stats['last_build_seconds']}s")
+            return self._recommender
+
+    def embedding_index_for(self, wardrobe_df: pd.DataFrame):
+        """Embedding index covering the wardrobe, reusing the engine's classifier"""
+        with self._lock:
+            return self._sync_embeddings(wardrobe_df, pd.DataFrame(columns=CATALOG_COLUMNS))
+
+    def invalidate(self):
+        """Drop the current recommender; the next request rebuilds it for the new wardrobe"""
+        with self._lock:
+            self._recommender = None
+            self._version = None
+            self._search_matrix = None
+
+    def status(self) -> Dict:
+        with self._lock:
+            status = dict(self._stats)
+            status['model_loaded'] = self._data_manager is not None
+            status['version'] = self._version
+            status['embedded_wardrobe_items'] = len(getattr(self._embedding_index, '_wardrobe_ids', None) or [])
+        with self._prompt_lock:
+            status['prompt_cache'] = dict(self._prompt_stats, size=len(self._prompt_embeddings))
+        return status
+
+    def encode_prompt(self, prompt: str) -> Optional[np.ndarray]:
+        """Normalised CLIP text embedding for a prompt, from the LRU when seen before"""
+        key = ' '.join(prompt.lower().split())
+        with self._prompt_lock:
+            embedding = self._prompt_embeddings.get(key)
+            if embedding is not None:
+                self._prompt_embeddings.move_to_end(key)
+                self._prompt_stats['hits'] += 1
+                return embedding
+            self._prompt_stats['misses'] += 1
+
+        classifier = self.classifier
+        if not key or classifier is None or not hasattr(classifier, '_encode_texts'):
+            return None
+        embedding = classifier._encode_texts([key])[0]
+        with self._prompt_lock:
+            self._prompt_embeddings[key] = embedding
+            self._prompt_embeddings.move_to_end(key)
+            while len(self._prompt_embeddings) > self.prompt_cache_size:
+                self._prompt_embeddings.popitem(last=False)
+        return embedding
+
+    def rank_by_prompt(self, prompt: str, wardrobe_df: pd.DataFrame, version: str,
+                       per_category: int = 3, include_catalog: bool = True) -> Dict[str, List[Dict]]:
+        """Best wardrobe (and catalog) items per category for a text prompt"""
+        query = self.encode_prompt(prompt)
+        if query is None:
+            return {}
+        embeddings, ids, categories, sources = self._search_matrix_for(wardrobe_df, version)
+        if embeddings is None:
+            return {}
+
+        scores = embeddings @ query.astype(embeddings.dtype)
+        ranked = {}
+        for category, rows in categories.items():
+            if not include_catalog:
+                rows = rows[sources[rows] == 'wardrobe']
+            if len(rows) == 0:
+                continue
+            ranked[category] = self._top_rows(scores, rows, per_category, ids, sources)
+        return ranked
+
+    def encode_image(self, image) -> Optional[np.ndarray]:
+        """Normalised CLIP image embedding for an in-memory PIL image"""
+        classifier = self.classifier
+        if classifier is None or not hasattr(classifier, '_encode_image'):
+            return None
+        return classifier._encode_image(image)
+
+    def nearest_to_image(self, image, wardrobe_df: pd.DataFrame, version: str, limit: int = 10,
+                         categories: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """Most similar wardrobe and catalog items to an image, optionally within categories"""
+        query = self.encode_image(image)
+        if query is None:
+            return {}
+        embeddings, ids, category_rows, sources = self._search_matrix_for(wardrobe_df, version)
+        if embeddings is None:
+            return {'wardrobe': [], 'catalog': []}
+
+        if categories is not None:
+            wanted = [category_rows[category] for category in set(categories) if category in category_rows]
+            rows = np.concatenate(wanted) if wanted else np.array([], dtype=np.int64)
+            scores = np.zeros(len(ids), dtype=embeddings.dtype)
+            scores[rows] = embeddings[rows] @ query.astype(embeddings.dtype)
+        else:
+            rows = np.arange(len(ids))
+            scores = embeddings @ query.astype(embeddings.dtype)
+        return {
+            source: self._top_rows(scores, rows[sources[rows] == source], limit, ids, sources)
+            for source in ('wardrobe', 'catalog')
+        }
+
+    def _search_matrix_for(self, wardrobe_df: pd.DataFrame, version: str):
+        with self._lock:
+            matrix = self._search_matrix
+            if matrix is None or matrix[0] != version:
+                matrix = self._build_search_matrix(wardrobe_df, version)
+                self._search_matrix = matrix
+        return matrix[1:]
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, rows: np.ndarray, limit: int, ids: List[str], sources: np.ndarray) -> List[Dict]:
+        if len(rows) == 0 or limit <= 0:
+            return []
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-scores[rows], kind='stable')]
+        return [
+            {'id': ids[row], 'score': round(float(scores[row]), 4), 'source': str(sources[row])}
+            for row in rows
+        ]
+
+    def _build_search_matrix(self, wardrobe_df: pd.DataFrame, version: str):
+        """Stack wardrobe and catalog embeddings into one matrix with per-category row lists"""
+        index = self._sync_embeddings(wardrobe_df, pd.DataFrame(columns=CATALOG_COLUMNS))
+        blocks, ids, categories, sources = [], [], [], []
+        if index is not None and index._wardrobe_emb is not None:
+            wardrobe_categories = dict(zip(wardrobe_df['id'].astype(str), wardrobe_df['category']))
+            blocks.append(index._wardrobe_emb)
+            for item_id in index._wardrobe_ids:
+                ids.append(str(item_id))
+                categories.append(wardrobe_categories.get(str(item_id), 'unknown'))
+                sources.append('wardrobe')
+        catalog_emb = getattr(index, '_catalog_emb', None)
+        if catalog_emb is not None and index._catalog_ids:
+            catalog_categories = self._load_catalog_categories()
+            blocks.append(catalog_emb)
+            for item_id in index._catalog_ids:
+                ids.append(str(item_id))
+                categories.append(catalog_categories.get(str(item_id), 'unknown'))
+                sources.append('catalog')
+        if not blocks:
+            return version, None, [], {}, np.array([])
+
+        embeddings = np.ascontiguousarray(np.vstack(blocks), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+        categories = np.array(categories)
+        rows = {category: np.flatnonzero(categories == category) for category in np.unique(categories)}
+        return version, embeddings, ids, rows, np.array(sources)
+
+    def _load_catalog_categories(self) -> Dict[str, str]:
+        if self._catalog_categories is None:
+            self._catalog_categories = {}
+            path = os.path.join(self.processed_dir, 'enhanced_catalog.parquet')
+            if os.path.exists(path):
+                try:
+                    catalog_df = pd.read_parquet(path, columns=['id', 'category'])
+                    self._catalog_categories = dict(zip(catalog_df['id'].astype(str), catalog_df['category']))
+                except Exception as e:
+                    logger.warning(f"Could not load catalog categories: {e}")
+        return self._catalog_categories
+
+    def _sync_embeddings(self, wardrobe_df: pd.DataFrame, catalog_df: pd.DataFrame):
+        """Load the index once, then add embeddings for new items and drop removed ones.
+
+        The index is keyed by database id and lives in memory only. A new
+        item's embedding comes from the shared wardrobe embeddings file,
+        where the classify job stored it under the item's recommendation id,
+        so CLIP only runs for items without a stored embedding (those are
+        merged back into the file under the writers' lock, never replacing
+        other entries).
+        """
+        if self._embedding_index is None:
+            index = EmbeddingIndex(embeddings_dir=os.path.join(self.processed_dir, 'embeddings'))
+            index.load_embeddings()
+            # Loaded rows are keyed by recommendation id; rows keyed by database id are added below
+            index._wardrobe_ids, index._wardrobe_emb = [], None
+            self._embedding_index = index
+        index = self._embedding_index
+        if wardrobe_df.empty:
+            return index
+
+        wanted = wardrobe_df['id'].astype(str).tolist()
+        known_ids = [str(i) for i in (index._wardrobe_ids or [])]
+        known = dict(zip(known_ids, index._wardrobe_emb)) if index._wardrobe_emb is not None else {}
+
+        from add_item_cli import keyed_item_id
+        missing = [i for i, item_id in enumerate(wanted) if item_id not in known]
+        stored = self._stored_embeddings() if missing else {}
+        recommendation_ids = wardrobe_df.get('recommendation_id', pd.Series([None] * len(wanted))).tolist()
+        filenames = wardrobe_df.get('filename', pd.Series([None] * len(wanted))).tolist()
+        classifier = self.classifier
+        embedded = {}
+        for i in missing:
+            item_id = wanted[i]
+            for store_id in (recommendation_ids[i], keyed_item_id(item_id), item_id):
+                if store_id and str(store_id) in stored:
+                    known[item_id] = stored[str(store_id)]
+                    break
+            else:
+                path = self._resolve_image(filenames[i]) if classifier is not None else None
+                embedding = classifier.get_image_embedding(path) if path else None
+                if embedding is not None:
+                    known[item_id] = embedded[keyed_item_id(item_id)] = embedding
+
+        ids = [item_id for item_id in wanted if item_id in known]
+        if ids != known_ids:
+            index._wardrobe_ids = ids
+            index._wardrobe_emb = np.array([known[item_id] for item_id in ids]) if ids else None
+        if embedded:
+            self._stats['embedded_items'] += len(embedded)
+            self._merge_stored_embeddings(embedded)
+        return index
+
+    def _stored_embeddings(self) -> Dict[str, np.ndarray]:
+        """id -> embedding from the shared wardrobe embeddings file, reread only when it changes"""
+        path = os.path.join(self.processed_dir, 'embeddings', 'wardrobe_embeddings.npz')
+        try:
+            st = os.stat(path)
+        except OSError:
+            return {}
+        signature = (st.st_mtime_ns, st.st_size)
+        if self._stored is None or self._stored[0] != signature:
+            from add_item_cli import read_embeddings
+            try:
+                ids, embeddings = read_embeddings(path)
+            except Exception as e:
+                logger.warning(f"Could not read wardrobe embeddings: {e}")
+                return {}
+            self._stored = (signature, dict(zip(ids, embeddings)))
+        return self._stored[1]
+
+    def _merge_stored_embeddings(self, embedded: Dict[str, np.ndarray]):
+        from add_item_cli import merge_embeddings
+        path = os.path.join(self.processed_dir, 'embeddings', 'wardrobe_embeddings.npz')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            merge_embeddings(path, list(embedded), list(embedded.values()), create=True)
+        except Exception as e:
+            logger.warning(f"Could not save wardrobe embeddings: {e}")
+
+    def _resolve_image(self, filename: Optional[str]) -> Optional[str]:
+        if not filename:
+            return None
+        if os.path.exists(filename):
+            return filename
+        for directory in [*self.image_dirs, self.raw_dir]:
+            path = os.path.join(directory, os.path.basename(filename))
+            if os.path.exists(path):
+                return path
+        return None
@@ -9,6 +9,7 @@ import sys
 import json
 import argparse
 import uuid
+import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -22,6 +23,194 @@ from src.data.robust_data_manager import RobustDataManager
 from src.classify.robust_classifier import RobustClassifier
 
 
+# Serializes read-modify-write of style.csv, the wardrobe parquet and the
+# embeddings file between threads of one process (the API server's workers)
+STORE_LOCK = threading.RLock()
+
+
+def keyed_item_id(key):
+    """Recommendation id for an item owned by a database row (stable across retries)"""
+    return f"wardrobe_{key}"
+
+
+def process_item(file_path, main_category, source='wardrobe', data_manager=None, classifier=None, item_key=None):
+    """Classify an image, register it in style.csv/embeddings and return its metadata.
+
+    Pass an already loaded data manager/classifier to skip loading CLIP again
+    (the API server's background jobs reuse its warm model this way). With an
+    item_key the item is registered under keyed_item_id(item_key), replacing
+    any earlier registration of the same key.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    metadata = process_items([(file_path, main_category)], source, data_manager, classifier,
+                             item_keys=[item_key])[0]
+    if 'error' in metadata:
+        raise RuntimeError(metadata['error'])
+    return metadata
+
+
+def process_items(files, source='wardrobe', data_manager=None, classifier=None, batch_size=16, item_keys=None):
+    """Batched process_item for many (file_path, main_category) pairs.
+
+    Classifies with classify_items and then writes with register_items.
+    Returns one metadata dict per input, in order; files that could not be
+    processed get {'file', 'error'}.
+    """
+    if data_manager is None:
+        data_manager = _default_data_manager()
+    metadata = classify_items(files, source, data_manager, classifier, batch_size, item_keys)
+    return register_items(metadata, data_manager)
+
+
+def classify_items(files, source='wardrobe', data_manager=None, classifier=None, batch_size=16, item_keys=None):
+    """Classify and embed (file_path, main_category) pairs without writing anything.
+
+    Images go through CLIP in batches. Each result carries the id the item
+    will be registered under (keyed_item_id(key) when item_keys gives a key,
+    a fresh unique id otherwise) and its embedding; pass the results to
+    register_items to persist them.
+    """
+    if data_manager is None:
+        data_manager = _default_data_manager()
+    if classifier is None:
+        classifier = getattr(data_manager, 'classifier', None) or RobustClassifier()
+    item_keys = item_keys or [None] * len(files)
+    
+    results = [None] * len(files)
+    readable = []
+    for i, (file_path, main_category) in enumerate(files):
+        if os.path.exists(file_path):
+            readable.append(i)
+        else:
+            results[i] = {"file": file_path, "error": f"File not found: {file_path}"}
+    
+    classified = classifier.classify_images_batched([files[i][0] for i in readable], batch_size=batch_size)
+    for i, (classification, embedding) in zip(readable, classified):
+        file_path, main_category = files[i]
+        # Override category with user selection
+        classification['category'] = main_category
+        key = item_keys[i]
+        results[i] = {
+            "id": keyed_item_id(key) if key is not None else f"user_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
+            "file": file_path,
+            "filename": file_path,
+            "category": main_category,
+            "subcategory": classification.get('subcategory', 'unknown'),
+            "source": source,
+            "created_at": datetime.now().isoformat(),
+            "embedding_generated": embedding is not None,
+            "embedding": embedding,
+            "classification": classification
+        }
+    return results
+
+
+def register_items(metadata, data_manager=None):
+    """Persist classify_items results: image copy, style.csv/parquet rows and embeddings.
+
+    Everything is written by item id, so registering an id again (a retried
+    job) replaces its image, rows and embedding instead of adding new ones.
+    Writes happen under STORE_LOCK and each file is replaced atomically.
+    Returns the metadata with 'filename' pointing at the copied image and
+    the embedding removed; error entries pass through unchanged.
+    """
+    import shutil
+    import pandas as pd
+    
+    if data_manager is None:
+        data_manager = _default_data_manager()
+    images_dir = os.path.join(PROJECT_ROOT, "data", "raw", "images")
+    processed_dir = os.path.join(PROJECT_ROOT, "data", "processed")
+    os.makedirs(images_dir, exist_ok=True)
+    
+    results, new_rows, new_ids, new_embeddings = [], [], [], []
+    with STORE_LOCK:
+        for entry in metadata:
+            if entry is None or 'error' in entry:
+                results.append(entry)
+                continue
+            entry = dict(entry)
+            embedding = entry.pop('embedding', None)
+            try:
+                # Named by item id, so a retry overwrites its own copy
+                dest_path = os.path.join(images_dir, f"{entry['id']}{os.path.splitext(entry['file'])[1]}")
+                shutil.copy2(entry['file'], dest_path)
+            except OSError as e:
+                results.append({"file": entry['file'], "error": str(e)})
+                continue
+            entry['filename'] = dest_path
+            classification = dict(entry['classification'], filename=dest_path)
+            entry['classification'] = classification
+            
+            new_row = data_manager._create_style_row(classification, len(new_rows))
+            new_row['id'] = entry['id']
+            new_row['source'] = entry['source']
+            new_row['filename'] = dest_path
+            new_rows.append(new_row)
+            if embedding is not None:
+                new_ids.append(entry['id'])
+                new_embeddings.append(embedding)
+            results.append(entry)
+        
+        if new_rows:
+            ids = [row['id'] for row in new_rows]
+            
+            # Add to style.csv
+            style_df_path = os.path.join(processed_dir, "style.csv")
+            if os.path.exists(style_df_path):
+                style_df = pd.read_csv(style_df_path)
+            else:
+                # Create new style.csv with proper schema
+                style_df = pd.DataFrame(columns=data_manager.create_style_csv_schema())
+            style_df = pd.concat([_without_ids(style_df, ids), pd.DataFrame(new_rows)], ignore_index=True)
+            _replace_file(style_df_path, lambda path: style_df.to_csv(path, index=False))
+            
+            # Update enhanced datasets (only if parquet support is available)
+            try:
+                wardrobe_path = os.path.join(processed_dir, "enhanced_wardrobe.parquet")
+                if os.path.exists(wardrobe_path):
+                    wardrobe_df = pd.read_parquet(wardrobe_path)
+                    wardrobe_rows = [dict(row, source='wardrobe') for row in new_rows]
+                    wardrobe_df = pd.concat([_without_ids(wardrobe_df, ids), pd.DataFrame(wardrobe_rows)], ignore_index=True)
+                    _replace_file(wardrobe_path, lambda path: wardrobe_df.to_parquet(path, index=False))
+            except Exception as e:
+                print(f"Warning: Could not update parquet files: {e}", file=sys.stderr)
+        
+        # Update embeddings
+        if new_embeddings:
+            update_embeddings(new_ids, new_embeddings, PROJECT_ROOT)
+    
+    return results
+
+
+def _default_data_manager():
+    return RobustDataManager(
+        raw_dir=os.path.join(PROJECT_ROOT, "data", "raw"),
+        processed_dir=os.path.join(PROJECT_ROOT, "data", "processed"),
+        output_dir=os.path.join(PROJECT_ROOT, "data", "output")
+    )
+
+
+def _without_ids(df, ids):
+    """Rows whose id is not in ids (earlier registrations of the same items)"""
+    if 'id' not in df.columns or df.empty:
+        return df
+    return df[~df['id'].astype(str).isin(set(ids))]
+
+
+def _replace_file(path, write):
+    """Write via write(tmp_path) and atomically move the result over path"""
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Process image and add to recommendation system')
     parser.add_argument('--file', required=True, help='Path to image file')
@@ -40,91 +229,10 @@ def main():
         sys.exit(1)
     
     try:
-        # Initialize components
-        data_manager = RobustDataManager(
-            raw_dir=os.path.join(PROJECT_ROOT, "data", "raw"),
-            processed_dir=os.path.join(PROJECT_ROOT, "data", "processed"),
-            output_dir=os.path.join(PROJECT_ROOT, "data", "output")
-        )
-        
-        classifier = RobustClassifier()
-        
-        # Generate unique filename
-        file_ext = os.path.splitext(args.file)[1]
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        
-        # Copy image to data/raw/images/
-        images_dir = os.path.join(PROJECT_ROOT, "data", "raw", "images")
-        os.makedirs(images_dir, exist_ok=True)
-        dest_path = os.path.join(images_dir, unique_filename)
-        
-        import shutil
-        shutil.copy2(args.file, dest_path)
-        
-        # Classify the image
-        classification = classifier.classify_image(dest_path)
-        classification['filename'] = dest_path
-        
-        # Override category with user selection
-        classification['category'] = args.main_category
-        
-        # Generate embedding
-        embedding = classifier.get_image_embedding(dest_path)
-        
-        # Create unique ID
-        item_id = f"user_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
-        
-        # Create style row
-        style_df_path = os.path.join(PROJECT_ROOT, "data", "processed", "style.csv")
-        
-        if os.path.exists(style_df_path):
-            import pandas as pd
-            style_df = pd.read_csv(style_df_path)
-        else:
-            # Create new style.csv with proper schema
-            style_df = pd.DataFrame(columns=data_manager.create_style_csv_schema())
-        
-        # Create new row
-        new_row = data_manager._create_style_row(classification, len(style_df))
-        new_row['id'] = item_id
-        new_row['source'] = args.source
-        new_row['filename'] = dest_path
-        
-        # Add to style.csv
-        style_df = pd.concat([style_df, pd.DataFrame([new_row])], ignore_index=True)
-        style_df.to_csv(style_df_path, index=False)
-        
-        # Update enhanced datasets (only if parquet support is available)
-        try:
-            wardrobe_path = os.path.join(PROJECT_ROOT, "data", "processed", "enhanced_wardrobe.parquet")
-            if os.path.exists(wardrobe_path):
-                wardrobe_df = pd.read_parquet(wardrobe_path)
-                new_row['source'] = 'wardrobe'
-                wardrobe_df = pd.concat([wardrobe_df, pd.DataFrame([new_row])], ignore_index=True)
-                wardrobe_df.to_parquet(wardrobe_path, index=False)
-        except Exception as e:
-            print(f"Warning: Could not update parquet files: {e}", file=sys.stderr)
-        
-        # Update embeddings
-        if embedding is not None:
-            update_embeddings(item_id, embedding, PROJECT_ROOT)
+        metadata = process_item(args.file, args.main_category, args.source)
         
         # Return success response
-        result = {
-            "status": "ok",
-            "metadata": {
-                "id": item_id,
-                "filename": dest_path,
-                "category": args.main_category,
-                "subcategory": classification.get('subcategory', 'unknown'),
-                "source": args.source,
-                "created_at": datetime.now().isoformat(),
-                "embedding_generated": embedding is not None,
-                "classification": classification
-            }
-        }
-        
-        print(json.dumps(result))
+        print(json.dumps({"status": "ok", "metadata": metadata}))
         sys.exit(0)
         
     except Exception as e:
@@ -136,34 +244,56 @@ def main():
         sys.exit(1)
 
 
-def update_embeddings(item_id, embedding, project_root):
-    """Update embeddings with new item"""
+def update_embeddings(item_ids, embeddings, project_root):
+    """Add or replace embeddings by item id (a single id/embedding is accepted too)"""
     try:
-        import numpy as np
-        
         # Load existing embeddings
         embeddings_dir = os.path.join(project_root, "data", "processed", "embeddings")
         os.makedirs(embeddings_dir, exist_ok=True)
         
         wardrobe_emb_path = os.path.join(embeddings_dir, "wardrobe_embeddings.npz")
         
-        if os.path.exists(wardrobe_emb_path):
-            wardrobe_data = np.load(wardrobe_emb_path)
-            wardrobe_embeddings = wardrobe_data['embeddings']
-            wardrobe_ids = wardrobe_data['ids'].tolist()
-            
-            # Add new embedding
-            wardrobe_embeddings = np.vstack([wardrobe_embeddings, embedding.reshape(1, -1)])
-            wardrobe_ids.append(item_id)
-            
-            # Save updated embeddings
-            np.savez(wardrobe_emb_path, 
-                    embeddings=wardrobe_embeddings, 
-                    ids=wardrobe_ids)
+        if isinstance(item_ids, str):
+            item_ids, embeddings = [item_ids], [embeddings]
+        merge_embeddings(wardrobe_emb_path, item_ids, embeddings)
         
     except Exception as e:
         print(f"Warning: Could not update embeddings: {e}", file=sys.stderr)
 
 
+def merge_embeddings(path, item_ids, embeddings, create=False):
+    """Replace earlier embeddings of item_ids in an embeddings file and add the new ones.
+
+    Other ids are kept. Runs under STORE_LOCK; without create a missing file
+    is left alone.
+    """
+    import numpy as np
+    
+    new_embeddings = np.vstack([np.asarray(e).reshape(1, -1) for e in embeddings])
+    with STORE_LOCK:
+        if os.path.exists(path):
+            wardrobe_ids, wardrobe_embeddings = read_embeddings(path)
+        elif create:
+            wardrobe_ids, wardrobe_embeddings = [], new_embeddings[:0]
+        else:
+            return
+        
+        replaced = set(item_ids)
+        keep = [i for i, wid in enumerate(wardrobe_ids) if wid not in replaced]
+        wardrobe_embeddings = np.vstack([wardrobe_embeddings[keep], new_embeddings])
+        wardrobe_ids = [wardrobe_ids[i] for i in keep] + list(item_ids)
+        
+        # Save updated embeddings
+        _replace_file(path, lambda tmp_path: np.savez(tmp_path, embeddings=wardrobe_embeddings, ids=wardrobe_ids))
+
+
+def read_embeddings(path):
+    """(ids, embeddings) from a wardrobe embeddings file, read under STORE_LOCK"""
+    import numpy as np
+    with STORE_LOCK:
+        with np.load(path) as data:
+            return [str(i) for i in data['ids'].tolist()], data['embeddings']
+
+
 if __name__ == "__main__":
     main()
@@ -203,6 +203,16 @@ class RobustClassifier:
             feats = feats / norm
         return feats
     
+    def _encode_images(self, images: List[Image.Image]) -> np.ndarray:
+        """Encode a batch of images to CLIP embeddings in one forward pass"""
+        inputs = self.processor(images=images, return_tensors="pt")
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.no_grad():
+            feats = self.model.get_image_features(**inputs).detach().cpu().numpy().astype(np.float32)
+        norms = np.linalg.norm(feats, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return feats / norms
+    
     def _encode_texts(self, prompts: List[str]) -> np.ndarray:
         """Encode text prompts to CLIP embeddings"""
         inputs = self.processor(text=prompts, return_tensors="pt", padding=True, truncation=True)
@@ -565,169 +575,215 @@ class RobustClassifier:
         """Comprehensive classification of a single image with heuristics"""
         try:
             img = Image.open(image_path).convert("RGB")
-            image_vec = self._encode_image(img)
-            
-            # Analyze image properties for heuristics
-            image_props = self._analyze_image_properties(image_path)
-            
-            # Main classifications using precomputed embeddings
-            category, cat_conf = self._match_with_confidence(image_vec, 'category')
-            subcategory, sub_conf = self._match_with_confidence(image_vec, f'subcategory_{category}')
-            
-            # Apply heuristics if confidence is low or for known problematic cases
-            if cat_conf < 0.20 or sub_conf < 0.15:
-                category, subcategory, cat_conf, sub_conf = self._apply_heuristics(
-                    image_path, category, subcategory, cat_conf, sub_conf, image_props
-                )
-            
-            # Normalize classifications
-            category, subcategory = self._normalize_classification(category, subcategory)
-            
-            # Special rule: Kurtis are always tops, not dresses
-            if subcategory == 'kurti' or 'kurti' in subcategory.lower():
-                category = 'top'
-                subcategory = 'kurti'
-            
-            # Get other attributes
-            pattern, pat_conf = self._match_with_confidence(image_vec, 'pattern')
-            style_tags = []
-            style_confs = []
-            
-            # Get top 3 style tags
-            for _ in range(3):
-                style, style_conf = self._match_with_confidence(image_vec, 'style')
-                if style not in style_tags and style_conf > 0.2:
-                    style_tags.append(style)
-                    style_confs.append(style_conf)
-            
-            occasion, occ_conf = self._match_with_confidence(image_vec, 'occasion')
-            color, col_conf = self._match_with_confidence(image_vec, 'color')
-            fabric, fab_conf = self._match_with_confidence(image_vec, 'fabric')
-            season, sea_conf = self._match_with_confidence(image_vec, 'season')
-            tradition, trad_conf = self._match_with_confidence(image_vec, 'tradition')
-            gender, gen_conf = self._match_with_confidence(image_vec, 'gender')
-            
-            # Additional details based on category
-            additional_details = {}
-            if category in ["top", "dress", "lehenga_set"]:
-                neckline, neck_conf = self._match_with_confidence(image_vec, 'neckline')
-                sleeve, sleeve_conf = self._match_with_confidence(image_vec, 'sleeve')
-                additional_details.update({
-                    'neckline': neckline,
-                    'neckline_conf': neck_conf,
-                    'sleeve_length': sleeve,
-                    'sleeve_length_conf': sleeve_conf
-                })
-            
-            if category in ["bottom", "dress"]:
-                fit, fit_conf = self._match_with_confidence(image_vec, 'fit')
-                additional_details.update({
-                    'fit': fit,
-                    'fit_conf': fit_conf
-                })
-            
-            if category == "shoes":
-                heel, heel_conf = self._match_with_confidence(image_vec, 'heel')
-                additional_details.update({
-                    'heel_type': heel,
-                    'heel_conf': heel_conf
-                })
-            
-            if category == "bag":
-                bag_size, size_conf = self._match_with_confidence(image_vec, 'bag_size')
-                additional_details.update({
-                    'bag_size': bag_size,
-                    'bag_size_conf': size_conf
-                })
-            
-            # Calculate color properties
-            dominant_color_hex = self._get_dominant_color_hex(img)
-            dominant_color_h, dominant_color_s, dominant_color_v = self._rgb_to_hsv(dominant_color_hex)
-            
-            return {
-                "category": category,
-                "category_conf": cat_conf,
-                "subcategory": subcategory,
-                "subcategory_conf": sub_conf,
-                "pattern": pattern,
-                "pattern_confidence": pat_conf,
-                "style_tags": style_tags,
-                "style_confidence": style_confs,
-                "occasion": occasion,
-                "occasion_conf": occ_conf,
-                "primary_color": color,
-                "color_conf": col_conf,
-                "fabric": fabric,
-                "fabric_conf": fab_conf,
-                "season": season,
-                "season_conf": sea_conf,
-                "tradition": tradition,
-                "tradition_conf": trad_conf,
-                "gender": gender,
-                "gender_conf": gen_conf,
-                "dominant_color_hex": dominant_color_hex,
-                "dominant_color_name": color,
-                "dominant_color_h": dominant_color_h,
-                "dominant_color_s": dominant_color_s,
-                "dominant_color_v": dominant_color_v,
-                "secondary_colors": [],
-                "colorfulness_score": image_props.get('saturation', 0) / 255.0,
-                "brightness_score": image_props.get('brightness', 0) / 255.0,
-                "width_px": image_props.get('width', 0),
-                "height_px": image_props.get('height', 0),
-                "aspect_ratio": image_props.get('aspect_ratio', 1.0),
-                "additional_details": additional_details,
-                "confidence_scores": {
-                    "category": cat_conf,
-                    "subcategory": sub_conf,
-                    "pattern": pat_conf,
-                    "style": max(style_confs) if style_confs else 0.0,
-                    "occasion": occ_conf,
-                    "color": col_conf,
-                    "fabric": fab_conf,
-                    "season": sea_conf,
-                    "tradition": trad_conf,
-                    "gender": gen_conf
-                }
-            }
-            
+            return self._classify_encoded(image_path, img, self._encode_image(img))
         except Exception as e:
             print(f"Error classifying image {image_path}: {e}")
-            return {
-                "category": "unknown",
-                "category_conf": 0.0,
-                "subcategory": "unknown",
-                "subcategory_conf": 0.0,
-                "pattern": "solid",
-                "pattern_confidence": 0.0,
-                "style_tags": [],
-                "style_confidence": [],
-                "occasion": "casual",
-                "occasion_conf": 0.0,
-                "primary_color": "unknown",
-                "color_conf": 0.0,
-                "fabric": "cotton",
-                "fabric_conf": 0.0,
-                "season": "all_season",
-                "season_conf": 0.0,
-                "tradition": "western",
-                "tradition_conf": 0.0,
-                "gender": "women",
-                "gender_conf": 0.0,
-                "dominant_color_hex": "#000000",
-                "dominant_color_name": "black",
-                "dominant_color_h": 0,
-                "dominant_color_s": 0,
-                "dominant_color_v": 0,
-                "secondary_colors": [],
-                "colorfulness_score": 0.0,
-                "brightness_score": 0.0,
-                "width_px": 0,
-                "height_px": 0,
-                "aspect_ratio": 1.0,
-                "additional_details": {},
-                "confidence_scores": {}
+            return self._unknown_classification()
+    
+    def classify_images_batched(self, image_paths: List[str], batch_size: int = 16) -> List[Tuple[Dict, Optional[np.ndarray]]]:
+        """Classify many images with batched CLIP forward passes.
+        
+        Returns (classification, normalized embedding) per path, in order; the
+        embedding is None for images that could not be read.
+        """
+        results: List[Tuple[Dict, Optional[np.ndarray]]] = []
+        for start in range(0, len(image_paths), batch_size):
+            chunk = image_paths[start:start + batch_size]
+            images = {}
+            for path in chunk:
+                try:
+                    images[path] = Image.open(path).convert("RGB")
+                except Exception as e:
+                    print(f"Error reading image {path}: {e}")
+            
+            vectors = {}
+            if images:
+                paths = list(images)
+                try:
+                    vectors = dict(zip(paths, self._encode_images([images[p] for p in paths])))
+                except Exception as e:
+                    print(f"Batched encoding failed, encoding one by one: {e}")
+                    for path in paths:
+                        try:
+                            vectors[path] = self._encode_image(images[path])
+                        except Exception as item_error:
+                            print(f"Error encoding image {path}: {item_error}")
+            
+            for path in chunk:
+                if path not in vectors:
+                    results.append((self._unknown_classification(), None))
+                    continue
+                try:
+                    results.append((self._classify_encoded(path, images[path], vectors[path]), vectors[path]))
+                except Exception as e:
+                    print(f"Error classifying image {path}: {e}")
+                    results.append((self._unknown_classification(), vectors[path]))
+        return results
+    
+    def _classify_encoded(self, image_path: str, img: Image.Image, image_vec: np.ndarray) -> Dict:
+        """Attribute matching and heuristics for an already encoded image"""
+        # Analyze image properties for heuristics
+        image_props = self._analyze_image_properties(image_path)
+        
+        # Main classifications using precomputed embeddings
+        category, cat_conf = self._match_with_confidence(image_vec, 'category')
+        subcategory, sub_conf = self._match_with_confidence(image_vec, f'subcategory_{category}')
+        
+        # Apply heuristics if confidence is low or for known problematic cases
+        if cat_conf < 0.20 or sub_conf < 0.15:
+            category, subcategory, cat_conf, sub_conf = self._apply_heuristics(
+                image_path, category, subcategory, cat_conf, sub_conf, image_props
+            )
+        
+        # Normalize classifications
+        category, subcategory = self._normalize_classification(category, subcategory)
+        
+        # Special rule: Kurtis are always tops, not dresses
+        if subcategory == 'kurti' or 'kurti' in subcategory.lower():
+            category = 'top'
+            subcategory = 'kurti'
+        
+        # Get other attributes
+        pattern, pat_conf = self._match_with_confidence(image_vec, 'pattern')
+        style_tags = []
+        style_confs = []
+        
+        # Get top 3 style tags
+        for _ in range(3):
+            style, style_conf = self._match_with_confidence(image_vec, 'style')
+            if style not in style_tags and style_conf > 0.2:
+                style_tags.append(style)
+                style_confs.append(style_conf)
+        
+        occasion, occ_conf = self._match_with_confidence(image_vec, 'occasion')
+        color, col_conf = self._match_with_confidence(image_vec, 'color')
+        fabric, fab_conf = self._match_with_confidence(image_vec, 'fabric')
+        season, sea_conf = self._match_with_confidence(image_vec, 'season')
+        tradition, trad_conf = self._match_with_confidence(image_vec, 'tradition')
+        gender, gen_conf = self._match_with_confidence(image_vec, 'gender')
+        
+        # Additional details based on category
+        additional_details = {}
+        if category in ["top", "dress", "lehenga_set"]:
+            neckline, neck_conf = self._match_with_confidence(image_vec, 'neckline')
+            sleeve, sleeve_conf = self._match_with_confidence(image_vec, 'sleeve')
+            additional_details.update({
+                'neckline': neckline,
+                'neckline_conf': neck_conf,
+                'sleeve_length': sleeve,
+                'sleeve_length_conf': sleeve_conf
+            })
+        
+        if category in ["bottom", "dress"]:
+            fit, fit_conf = self._match_with_confidence(image_vec, 'fit')
+            additional_details.update({
+                'fit': fit,
+                'fit_conf': fit_conf
+            })
+        
+        if category == "shoes":
+            heel, heel_conf = self._match_with_confidence(image_vec, 'heel')
+            additional_details.update({
+                'heel_type': heel,
+                'heel_conf': heel_conf
+            })
+        
+        if category == "bag":
+            bag_size, size_conf = self._match_with_confidence(image_vec, 'bag_size')
+            additional_details.update({
+                'bag_size': bag_size,
+                'bag_size_conf': size_conf
+            })
+        
+        # Calculate color properties
+        dominant_color_hex = self._get_dominant_color_hex(img)
+        dominant_color_h, dominant_color_s, dominant_color_v = self._rgb_to_hsv(dominant_color_hex)
+        
+        return {
+            "category": category,
+            "category_conf": cat_conf,
+            "subcategory": subcategory,
+            "subcategory_conf": sub_conf,
+            "pattern": pattern,
+            "pattern_confidence": pat_conf,
+            "style_tags": style_tags,
+            "style_confidence": style_confs,
+            "occasion": occasion,
+            "occasion_conf": occ_conf,
+            "primary_color": color,
+            "color_conf": col_conf,
+            "fabric": fabric,
+            "fabric_conf": fab_conf,
+            "season": season,
+            "season_conf": sea_conf,
+            "tradition": tradition,
+            "tradition_conf": trad_conf,
+            "gender": gender,
+            "gender_conf": gen_conf,
+            "dominant_color_hex": dominant_color_hex,
+            "dominant_color_name": color,
+            "dominant_color_h": dominant_color_h,
+            "dominant_color_s": dominant_color_s,
+            "dominant_color_v": dominant_color_v,
+            "secondary_colors": [],
+            "colorfulness_score": image_props.get('saturation', 0) / 255.0,
+            "brightness_score": image_props.get('brightness', 0) / 255.0,
+            "width_px": image_props.get('width', 0),
+            "height_px": image_props.get('height', 0),
+            "aspect_ratio": image_props.get('aspect_ratio', 1.0),
+            "additional_details": additional_details,
+            "confidence_scores": {
+                "category": cat_conf,
+                "subcategory": sub_conf,
+                "pattern": pat_conf,
+                "style": max(style_confs) if style_confs else 0.0,
+                "occasion": occ_conf,
+                "color": col_conf,
+                "fabric": fab_conf,
+                "season": sea_conf,
+                "tradition": trad_conf,
+                "gender": gen_conf
             }
+        }
+    
+    @staticmethod
+    def _unknown_classification() -> Dict:
+        """Classification used when an image cannot be read or encoded"""
+        return {
+            "category": "unknown",
+            "category_conf": 0.0,
+            "subcategory": "unknown",
+            "subcategory_conf": 0.0,
+            "pattern": "solid",
+            "pattern_confidence": 0.0,
+            "style_tags": [],
+            "style_confidence": [],
+            "occasion": "casual",
+            "occasion_conf": 0.0,
+            "primary_color": "unknown",
+            "color_conf": 0.0,
+            "fabric": "cotton",
+            "fabric_conf": 0.0,
+            "season": "all_season",
+            "season_conf": 0.0,
+            "tradition": "western",
+            "tradition_conf": 0.0,
+            "gender": "women",
+            "gender_conf": 0.0,
+            "dominant_color_hex": "#000000",
+            "dominant_color_name": "black",
+            "dominant_color_h": 0,
+            "dominant_color_s": 0,
+            "dominant_color_v": 0,
+            "secondary_colors": [],
+            "colorfulness_score": 0.0,
+            "brightness_score": 0.0,
+            "width_px": 0,
+            "height_px": 0,
+            "aspect_ratio": 1.0,
+            "additional_details": {},
+            "confidence_scores": {}
+        }
     
     def _get_dominant_color_hex(self, image: Image.Image) -> str:
         """Extract dominant color as hex string"""
@@ -803,12 +859,15 @@ class RobustClassifier:
     def classify_batch(self, image_paths: List[str], show_progress: bool = True) -> List[Dict]:
         """Classify a batch of images"""
         results = []
-        iterator = tqdm(image_paths, desc="Classifying images") if show_progress else image_paths
+        batch_size = 16
+        starts = range(0, len(image_paths), batch_size)
+        iterator = tqdm(starts, desc="Classifying images") if show_progress else starts
         
-        for image_path in iterator:
-            result = self.classify_image(image_path)
-            result['filename'] = image_path
-            results.append(result)
+        for start in iterator:
+            chunk = image_paths[start:start + batch_size]
+            for image_path, (result, _) in zip(chunk, self.classify_images_batched(chunk, batch_size=batch_size)):
+                result['filename'] = image_path
+                results.append(result)
         
         return results
     
@@ -75,8 +75,8 @@ class EmbeddingIndex:
             print(f"Warning: Could not calculate cosine similarity: {e}")
             return 0.0
     
-    def build_or_load(self, wardrobe_df: pd.DataFrame, catalog_df: pd.DataFrame, force_rebuild: bool = False, image_base_dir: str = None, show_progress: bool = False):
-        """Build or load embeddings for the given datasets"""
+    def build_or_load(self, wardrobe_df: pd.DataFrame, catalog_df: pd.DataFrame, force_rebuild: bool = False, image_base_dir: str = None, show_progress: bool = False, classifier=None):
+        """Build or load embeddings for the given datasets (pass a loaded classifier to reuse its model)"""
         try:
             # Create embeddings directory if it doesn't exist
             os.makedirs(self.embeddings_dir, exist_ok=True)
@@ -92,11 +92,12 @@ class EmbeddingIndex:
             
             print("🔨 Building new embeddings...")
             
-            # Import here to avoid circular imports
-            from src.classify.robust_classifier import RobustClassifier
-            
-            # Initialize classifier
-            classifier = RobustClassifier()
+            if classifier is None:
+                # Import here to avoid circular imports
+                from src.classify.robust_classifier import RobustClassifier
+                
+                # Initialize classifier
+                classifier = RobustClassifier()
             
             # Generate embeddings for wardrobe
             if not wardrobe_df.empty:
@@ -624,7 +625,8 @@ class RobustDataManager:
             wardrobe_df=wardrobe_df,
             catalog_df=catalog_df,
             image_base_dir=self.raw_dir,
-            show_progress=True
+            show_progress=True,
+            classifier=self.classifier
         )
         
         # Save embeddings in the specified format
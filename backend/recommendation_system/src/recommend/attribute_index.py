@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import numpy as np
+from typing import Dict, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.recommend.item_store import ItemStore
+
+
+# Attribute values an item may carry to be a candidate for each occasion.
+# Attributes not listed for an occasion are unconstrained.
+OCCASION_PROFILES: Dict[str, Dict[str, Set[str]]] = {
+    'casual': {'formality': {'casual', 'semi_formal'}},
+    'work': {'formality': {'semi_formal', 'formal'}},
+    'formal': {'formality': {'formal', 'semi_formal'}},
+    'semi_formal': {'formality': {'semi_formal', 'casual', 'formal'}},
+    'party': {'formality': {'party', 'semi_formal', 'formal'}},
+    'wedding': {'formality': {'formal', 'party', 'semi_formal'}, 'tradition': {'ethnic', 'fusion'}},
+    'festival': {'tradition': {'ethnic', 'fusion'}},
+    'festive': {'tradition': {'ethnic', 'fusion'}},
+    'beach': {'formality': {'casual'}, 'season': {'summer', 'spring'}},
+    'sports': {'formality': {'casual'}},
+}
+
+# Request spellings -> classifier season labels
+SEASON_ALIASES = {
+    'autumn': 'fall',
+    'rainy': 'monsoon',
+}
+
+# Values that satisfy any request for that attribute
+WILDCARD_VALUES = {
+    'season': {'all_season'},
+    'gender_target': {'unisex'},
+}
+
+INDEXED_ATTRIBUTES = ('formality', 'season', 'tradition', 'gender_target')
+
+
+class AttributeIndex:
+    """Inverted bitmap index over an ItemStore's filterable attributes.
+
+    For every (attribute, value) pair the index holds a boolean row bitmap, so
+    the candidate mask for an occasion is a handful of vectorized OR/AND
+    operations. Rows with no value for an attribute (e.g. items uploaded
+    through the app, which only carry a category) are treated as wildcards
+    and always pass that attribute's filter.
+    """
+
+    def __init__(self, store: 'ItemStore'):
+        self.size = store.size
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        self.unknown: Dict[str, np.ndarray] = {}
+        for attribute in INDEXED_ATTRIBUTES:
+            codes = store.codes[attribute]
+            self.bitmaps[attribute] = {
+                str(value).lower(): codes == code for code, value in enumerate(store.vocab[attribute])
+            }
+            self.unknown[attribute] = codes == -1
+        self._masks: Dict[Tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def constraints_for(self, occasion: Optional[str], season: Optional[str] = None, gender: Optional[str] = None) -> Dict[str, Set[str]]:
+        """Allowed values per attribute for a request"""
+        constraints = {
+            attribute: set(values)
+            for attribute, values in OCCASION_PROFILES.get((occasion or '').lower(), {}).items()
+        }
+        if season:
+            season = season.lower()
+            constraints['season'] = {SEASON_ALIASES.get(season, season)}
+        if gender:
+            constraints['gender_target'] = {gender.lower()}
+        for attribute, values in constraints.items():
+            values |= WILDCARD_VALUES.get(attribute, set())
+        return constraints
+
+    def mask_for(self, occasion: Optional[str], season: Optional[str] = None, gender: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask of items compatible with the request (memoized)"""
+        key = ((occasion or '').lower(), (season or '').lower(), (gender or '').lower())
+        with self._lock:
+            mask = self._masks.get(key)
+        if mask is not None:
+            return mask
+
+        mask = np.ones(self.size, dtype=bool)
+        for attribute, values in self.constraints_for(occasion, season, gender).items():
+            allowed = self.unknown[attribute].copy()
+            for value in values:
+                bitmap = self.bitmaps[attribute].get(value)
+                if bitmap is not None:
+                    allowed |= bitmap
+            mask &= allowed
+        mask.setflags(write=False)
+
+        with self._lock:
+            self._masks[key] = mask
+        return mask
+
+    def count(self, occasion: Optional[str], season: Optional[str] = None, gender: Optional[str] = None) -> int:
+        return int(self.mask_for(occasion, season, gender).sum())
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Attributes that are integer-encoded for fast filtering
+ENCODED_ATTRIBUTES = ('category', 'formality', 'season', 'tradition', 'gender_target')
+
+_MISSING = object()
+
+
+class ItemView:
+    """Read-only, dict-like view of a single row of an ItemStore.
+
+    Views are created only for items that are actually handed back to the
+    recommender (candidates, seeds, outfit members), so the per-item cost is
+    a single small object instead of a full record dict.
+    """
+    __slots__ = ('_store', 'row')
+
+    def __init__(self, store: 'ItemStore', row: int):
+        self._store = store
+        self.row = row
+
+    def get(self, key: str, default=None):
+        value = self._store._value(self.row, key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str):
+        value = self._store._value(self.row, key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._store._value(self.row, key) is not _MISSING
+
+    def keys(self) -> List[str]:
+        return list(self._store._source_columns[self._store.source_codes[self.row]])
+
+    def to_dict(self) -> Dict:
+        """Materialize the row as a plain dict (same shape as DataFrame.to_dict('records'))"""
+        return {key: self._store._columns[key][self.row] for key in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"ItemView(id={self.get('id')!r}, category={self.get('category')!r})"
+
+
+class ItemStore:
+    """Immutable struct-of-arrays store for wardrobe and catalog items.
+
+    Built once per wardrobe version from the wardrobe and catalog frames. Holds
+    every column as an object array, integer codes for the filterable
+    attributes, an id -> row map, per-category row lists and an L2-normalized
+    embedding matrix aligned with the rows.
+    """
+
+    SOURCES = ('wardrobe', 'catalog')
+
+    def __init__(self, wardrobe_df: pd.DataFrame, catalog_df: pd.DataFrame, version: Optional[str] = None):
+        frames = [
+            wardrobe_df if wardrobe_df is not None else pd.DataFrame(),
+            catalog_df if catalog_df is not None else pd.DataFrame()
+        ]
+        self.size = sum(len(frame) for frame in frames)
+
+        # Columns present per source, so views only expose the keys their
+        # original record had
+        self._source_columns: List[Tuple[str, ...]] = [tuple(frame.columns) for frame in frames]
+        self._source_column_sets = [frozenset(columns) for columns in self._source_columns]
+        self.source_codes = np.concatenate([
+            np.full(len(frame), code, dtype=np.int8) for code, frame in enumerate(frames)
+        ]) if self.size else np.zeros(0, dtype=np.int8)
+
+        # Object column arrays (Python natives, like to_dict('records'))
+        self._columns: Dict[str, np.ndarray] = {}
+        all_columns = []
+        for frame in frames:
+            for column in frame.columns:
+                if column not in all_columns:
+                    all_columns.append(column)
+        for column in all_columns:
+            values = np.empty(self.size, dtype=object)
+            offset = 0
+            for frame in frames:
+                if column in frame.columns:
+                    values[offset:offset + len(frame)] = _to_object_array(frame[column].tolist())
+                offset += len(frame)
+            values.setflags(write=False)
+            self._columns[column] = values
+
+        self.ids = self._columns.get('id', np.empty(self.size, dtype=object))
+
+        # id -> first row (wardrobe rows win over catalog rows, matching the
+        # original lookup order) and id -> integer code for vectorized exclusion
+        self.id_to_row: Dict = {}
+        self._id_codes: Dict = {}
+        id_codes = np.empty(self.size, dtype=np.int64)
+        for row, item_id in enumerate(self.ids):
+            self.id_to_row.setdefault(item_id, row)
+            id_codes[row] = self._id_codes.setdefault(item_id, len(self._id_codes))
+        id_codes.setflags(write=False)
+        self.id_codes = id_codes
+
+        # Integer-encoded attributes
+        self.codes: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, List] = {}
+        for attribute in ENCODED_ATTRIBUTES:
+            self.codes[attribute], self.vocab[attribute] = self._encode(attribute)
+
+        # Per-category row lists, in original frame order
+        self.category_rows: Dict[str, np.ndarray] = {}
+        category_codes = self.codes['category']
+        for code, category in enumerate(self.vocab['category']):
+            rows = np.flatnonzero(category_codes == code)
+            rows.setflags(write=False)
+            self.category_rows[category] = rows
+
+        self.embeddings: Optional[np.ndarray] = None
+        self.has_embedding = np.zeros(self.size, dtype=bool)
+        self.version = version or self._compute_version()
+        self._attribute_index = None
+        self._attribute_index_lock = threading.Lock()
+
+    @classmethod
+    def from_frames(cls, wardrobe_df: pd.DataFrame, catalog_df: pd.DataFrame, version: Optional[str] = None) -> 'ItemStore':
+        return cls(wardrobe_df, catalog_df, version=version)
+
+    @property
+    def attribute_index(self):
+        """Bitmap index over formality/season/tradition/gender_target (built on first use)"""
+        if self._attribute_index is None:
+            from src.recommend.attribute_index import AttributeIndex
+            with self._attribute_index_lock:
+                if self._attribute_index is None:
+                    self._attribute_index = AttributeIndex(self)
+        return self._attribute_index
+
+    def _encode(self, attribute: str) -> Tuple[np.ndarray, List]:
+        """Encode an attribute column as int32 codes; missing values get code -1"""
+        values = self._columns.get(attribute)
+        codes = np.full(self.size, -1, dtype=np.int32)
+        vocab: List = []
+        if values is None:
+            codes.setflags(write=False)
+            return codes, vocab
+        lookup: Dict = {}
+        for row, value in enumerate(values):
+            if _is_missing(value):
+                continue
+            try:
+                code = lookup.setdefault(value, len(lookup))
+            except TypeError:
+                continue
+            codes[row] = code
+        vocab = list(lookup.keys())
+        codes.setflags(write=False)
+        return codes, vocab
+
+    def _compute_version(self) -> str:
+        digest = hashlib.sha1()
+        digest.update(str(self.size).encode())
+        # Every column takes part, so reclassified rows change the version too
+        for column in sorted(self._columns):
+            digest.update(column.encode())
+            digest.update(repr(self._columns[column].tolist()).encode())
+        return digest.hexdigest()[:16]
+
+    def _value(self, row: int, key: str):
+        if key not in self._source_column_sets[self.source_codes[row]]:
+            return _MISSING
+        return self._columns[key][row]
+
+    def attach_embeddings(self, embedding_index) -> 'ItemStore':
+        """Align embeddings from an EmbeddingIndex with the store rows.
+
+        Embeddings are matched by the string form of the item id (wardrobe
+        embeddings first, then catalog), falling back to ``recommendation_id``
+        for rows loaded from the app database. Rows are L2-normalized once so
+        cosine similarity becomes a plain dot product.
+        """
+        if embedding_index is None:
+            return self
+
+        lookup: Dict[str, np.ndarray] = {}
+        for emb_attr, ids_attr in (('_wardrobe_emb', '_wardrobe_ids'), ('_catalog_emb', '_catalog_ids')):
+            matrix = getattr(embedding_index, emb_attr, None)
+            ids = getattr(embedding_index, ids_attr, None)
+            if matrix is None or ids is None:
+                continue
+            for idx, item_id in enumerate(ids):
+                lookup.setdefault(str(item_id), matrix[idx])
+
+        if not lookup or self.size == 0:
+            return self
+
+        dim = len(next(iter(lookup.values())))
+        embeddings = np.zeros((self.size, dim), dtype=np.float32)
+        has_embedding = np.zeros(self.size, dtype=bool)
+        fallback_ids = self._columns.get('recommendation_id')
+        for row in range(self.size):
+            vector = lookup.get(str(self.ids[row]))
+            if vector is None and fallback_ids is not None and not _is_missing(fallback_ids[row]):
+                vector = lookup.get(str(fallback_ids[row]))
+            if vector is None:
+                continue
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                continue
+            embeddings[row] = vector / norm
+            has_embedding[row] = True
+
+        embeddings.setflags(write=False)
+        has_embedding.setflags(write=False)
+        self.embeddings = embeddings
+        self.has_embedding = has_embedding
+        return self
+
+    def view(self, row: int) -> ItemView:
+        return ItemView(self, int(row))
+
+    def view_for_id(self, item_id) -> Optional[ItemView]:
+        row = self.id_to_row.get(item_id)
+        return None if row is None else ItemView(self, row)
+
+    def rows_for_category(self, category: str, exclude_ids: Optional[Iterable] = None, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows of a category (original frame order), minus excluded ids.
+
+        When a row mask is given (e.g. from the attribute index) only masked
+        rows are returned, unless no masked row survives the exclusions.
+        """
+        rows = self.category_rows.get(category)
+        if rows is None:
+            return np.zeros(0, dtype=np.int64)
+        if exclude_ids:
+            excluded = [self._id_codes[item_id] for item_id in exclude_ids if item_id in self._id_codes]
+            if excluded:
+                rows = rows[~np.isin(self.id_codes[rows], excluded)]
+        if mask is not None:
+            pruned = rows[mask[rows]]
+            if len(pruned):
+                rows = pruned
+        return rows
+
+    def candidates(self, category: str, exclude_ids: Optional[Set] = None, mask: Optional[np.ndarray] = None) -> List[ItemView]:
+        return [ItemView(self, row) for row in self.rows_for_category(category, exclude_ids, mask).tolist()]
+
+    def embedding_matrix(self, rows: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (embeddings, has_embedding) for the given rows"""
+        rows = np.asarray(list(rows), dtype=np.int64)
+        if self.embeddings is None:
+            return np.zeros((len(rows), 0), dtype=np.float32), np.zeros(len(rows), dtype=bool)
+        return self.embeddings[rows], self.has_embedding[rows]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def _to_object_array(values: List) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+def _is_missing(value) -> bool:
+    if value is None:
+        return True
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
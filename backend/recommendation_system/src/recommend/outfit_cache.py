@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class OutfitResultCache:
+    """Bounded LRU cache for outfit recommendations, with an optional disk tier.
+
+    Keys are built from (wardrobe/catalog version, sorted seed ids, occasion,
+    num_outfits). Because the version is part of every key, entries for an old
+    wardrobe can never be served for a new one; ``invalidate`` additionally
+    drops them eagerly when the wardrobe changes.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None, disk_ttl_seconds: int = 24 * 3600):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(version, seed_item_ids: Iterable, occasion: str, num_outfits: int) -> Tuple:
+        """Build a cache key; seed order does not matter"""
+        seeds = tuple(sorted(str(item_id) for item_id in seed_item_ids))
+        return (str(version), seeds, str(occasion), int(num_outfits))
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        """Return a copy of the cached outfits, or None on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return copy.deepcopy(self._entries[key])
+
+        outfits = self._read_disk(key)
+        with self._lock:
+            if outfits is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['disk_hits'] += 1
+            self._store(key, outfits)
+        return copy.deepcopy(outfits)
+
+    def put(self, key: Tuple, outfits: List[Dict]):
+        """Cache a copy of the outfits (callers are free to mutate theirs)"""
+        outfits = copy.deepcopy(outfits)
+        with self._lock:
+            self._store(key, outfits)
+        self._write_disk(key, outfits)
+
+    def invalidate(self):
+        """Drop every entry (memory and disk), e.g. after a wardrobe change"""
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.json'):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['disk_enabled'] = bool(self.disk_dir)
+        return stats
+
+    def _store(self, key: Tuple, outfits: List[Dict]):
+        self._entries[key] = outfits
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_path(self, key: Tuple) -> str:
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _read_disk(self, key: Tuple) -> Optional[List[Dict]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.disk_ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            # Guard against digest collisions
+            if entry.get('key') != json.loads(json.dumps(key)):
+                return None
+            return entry['outfits']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: Tuple, outfits: List[Dict]):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'key': key, 'outfits': outfits}, f, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not write outfit cache entry: {e}")
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+class OutfitLog:
+    """Append-only JSONL log of generated outfits with an id index.
+
+    One compact line per outfit goes to ``outfits-YYYYMMDD.jsonl`` in
+    ``log_dir`` (a file per day, so retention is deleting whole files). The
+    index maps outfit id -> (file, byte offset); it is built by a single scan
+    of the retained files on the first lookup and kept current by appends.
+    """
+
+    FILE_PREFIX = 'outfits-'
+
+    def __init__(self, log_dir: str, retention_days: int = 30):
+        self.log_dir = log_dir
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[str, int]]] = None
+
+    def append(self, outfits: List[Dict], **context) -> List[str]:
+        """Log outfits (plus request context such as seeds/occasion); returns their ids"""
+        now = datetime.now()
+        path = os.path.join(self.log_dir, f"{self.FILE_PREFIX}{now.strftime('%Y%m%d')}.jsonl")
+        ids = []
+        rotated = not os.path.exists(path)
+        with self._lock:
+            os.makedirs(self.log_dir, exist_ok=True)
+            index = self._index
+            with open(path, 'ab') as f:
+                for outfit in outfits:
+                    outfit_id = outfit.get('outfit_id') or uuid.uuid4().hex[:12]
+                    record = {
+                        'outfit_id': outfit_id,
+                        'logged_at': now.isoformat(timespec='seconds'),
+                        **context,
+                        'score': outfit.get('score'),
+                        'description': outfit.get('description'),
+                        'occasion': outfit.get('occasion'),
+                        'image_path': outfit.get('image_path'),
+                        'items': [
+                            {
+                                'id': item.get('id', ''),
+                                'category': item.get('category', ''),
+                                'subcategory': item.get('subcategory', ''),
+                                'color': item.get('primary_color', ''),
+                                'style': item.get('style_tags', []),
+                                'filename': item.get('filename', '')
+                            }
+                            for item in outfit.get('items', [])
+                        ]
+                    }
+                    offset = f.tell()
+                    f.write(json.dumps(record, separators=(',', ':'), default=str).encode() + b'\n')
+                    if index is not None:
+                        index[outfit_id] = (path, offset)
+                    ids.append(outfit_id)
+        if rotated:
+            # First write of a new day: drop day files past the retention window
+            self.apply_retention()
+        return ids
+
+    def get(self, outfit_id: str) -> Optional[Dict]:
+        with self._lock:
+            location = self._load_index().get(outfit_id)
+        if location is None:
+            return None
+        path, offset = location
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        """Most recent outfits, newest first"""
+        records = []
+        for path in reversed(self._log_files()):
+            with open(path, 'rb') as f:
+                lines = f.read().splitlines()
+            for line in reversed(lines):
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(records) >= limit:
+                    return records
+        return records
+
+    def apply_retention(self, now: Optional[float] = None) -> int:
+        """Delete day files older than the retention window; returns files removed"""
+        cutoff = datetime.fromtimestamp(now or time.time()) - timedelta(days=self.retention_days)
+        removed = 0
+        with self._lock:
+            for path in self._log_files():
+                day = os.path.basename(path)[len(self.FILE_PREFIX):-len('.jsonl')]
+                try:
+                    if datetime.strptime(day, '%Y%m%d') >= cutoff.replace(hour=0, minute=0, second=0, microsecond=0):
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except (ValueError, OSError):
+                    continue
+            if removed:
+                self._index = None
+        return removed
+
+    def _log_files(self) -> List[str]:
+        if not os.path.isdir(self.log_dir):
+            return []
+        return sorted(
+            os.path.join(self.log_dir, name) for name in os.listdir(self.log_dir)
+            if name.startswith(self.FILE_PREFIX) and name.endswith('.jsonl')
+        )
+
+    def _load_index(self) -> Dict[str, Tuple[str, int]]:
+        if self._index is None:
+            index = {}
+            for path in self._log_files():
+                offset = 0
+                with open(path, 'rb') as f:
+                    for line in f:
+                        try:
+                            index[json.loads(line)['outfit_id']] = (path, offset)
+                        except (ValueError, KeyError):
+                            pass
+                        offset += len(line)
+            self._index = index
+        return self._index
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.recommend.robust_recommender import RobustOutfitRecommender
+
+
+class OutfitTable:
+    """SQLite table of precomputed outfits, keyed by (seed item id, occasion).
+
+    ``seed_outfits`` holds the ranked outfits per seed (its primary key makes
+    serving a single indexed read). ``outfit_members`` is the reverse index:
+    which seeds' outfits contain an item, in which category slot and with what
+    compatibility to the seed, so a wardrobe change can find the seeds it
+    affects without scanning every outfit.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS seed_outfits (
+                    seed_id TEXT NOT NULL,
+                    occasion TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    outfit TEXT NOT NULL,
+                    PRIMARY KEY (seed_id, occasion, rank)
+                );
+                CREATE TABLE IF NOT EXISTS outfit_members (
+                    member_id TEXT NOT NULL,
+                    seed_id TEXT NOT NULL,
+                    occasion TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    category TEXT,
+                    seed_compatibility REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_outfit_members_member ON outfit_members (member_id);
+                CREATE INDEX IF NOT EXISTS idx_outfit_members_seed ON outfit_members (seed_id, occasion);
+                CREATE TABLE IF NOT EXISTS outfit_table_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def get(self, seed_id, occasion: str = 'casual') -> List[Dict]:
+        """Ranked outfits for a seed (empty if none were precomputed)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT outfit FROM seed_outfits WHERE seed_id = ? AND occasion = ? ORDER BY rank",
+                (str(seed_id), occasion)
+            ).fetchall()
+        return [json.loads(row['outfit']) for row in rows]
+
+    def replace_seed(self, seed_id, occasion: str, outfits: List[Dict], members: List[Dict]):
+        """Atomically replace a seed's outfits and their member index rows"""
+        seed_id = str(seed_id)
+        with self._lock, self._conn:
+            self._delete_seed(seed_id, occasion)
+            self._conn.executemany(
+                "INSERT INTO seed_outfits (seed_id, occasion, rank, score, outfit) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (seed_id, occasion, rank, float(outfit.get('score', 0.0)), json.dumps(outfit, default=str))
+                    for rank, outfit in enumerate(outfits)
+                ]
+            )
+            self._conn.executemany(
+                "INSERT INTO outfit_members (member_id, seed_id, occasion, rank, category, seed_compatibility) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (str(m['member_id']), seed_id, occasion, m['rank'], m.get('category'), m.get('seed_compatibility'))
+                    for m in members
+                ]
+            )
+
+    def delete_seed(self, seed_id, occasion: Optional[str] = None):
+        with self._lock, self._conn:
+            self._delete_seed(str(seed_id), occasion)
+
+    def _delete_seed(self, seed_id: str, occasion: Optional[str]):
+        if occasion is None:
+            self._conn.execute("DELETE FROM seed_outfits WHERE seed_id = ?", (seed_id,))
+            self._conn.execute("DELETE FROM outfit_members WHERE seed_id = ?", (seed_id,))
+        else:
+            self._conn.execute("DELETE FROM seed_outfits WHERE seed_id = ? AND occasion = ?", (seed_id, occasion))
+            self._conn.execute("DELETE FROM outfit_members WHERE seed_id = ? AND occasion = ?", (seed_id, occasion))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM seed_outfits")
+            self._conn.execute("DELETE FROM outfit_members")
+
+    def seeds_containing(self, member_id) -> List[tuple]:
+        """(seed_id, occasion) pairs whose outfits include the item"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT seed_id, occasion FROM outfit_members WHERE member_id = ?",
+                (str(member_id),)
+            ).fetchall()
+        return [(row['seed_id'], row['occasion']) for row in rows]
+
+    def members(self, seed_id, occasion: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT member_id, rank, category, seed_compatibility FROM outfit_members "
+                "WHERE seed_id = ? AND occasion = ?",
+                (str(seed_id), occasion)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def seed_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT seed_id FROM seed_outfits").fetchall()
+        return [row['seed_id'] for row in rows]
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM outfit_table_meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row['value'])
+
+    def set_meta(self, key: str, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outfit_table_meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value))
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OutfitPrecomputer:
+    """Offline job that fills an OutfitTable from a recommender.
+
+    ``rebuild`` ranks outfits for every wardrobe item. ``refresh`` only
+    recomputes the seeds a change can affect:
+
+    * removed items: their own rows, plus every seed whose outfits contain
+      them (found through the member index);
+    * added items: the new item as a seed, plus seeds that need the new
+      item's category and for which the item's compatibility row beats the
+      stored compatibility of the member currently filling that slot.
+
+    Completion is greedy over the whole partial outfit, so the second rule
+    is a pruning heuristic; run ``rebuild`` to get an exact table.
+    """
+
+    def __init__(self, table: OutfitTable, num_outfits: int = 3, occasions: Iterable[str] = ('casual',)):
+        self.table = table
+        self.num_outfits = num_outfits
+        self.occasions = tuple(occasions)
+
+    def rebuild(self, recommender: 'RobustOutfitRecommender') -> Dict:
+        """Recompute the whole table"""
+        start = time.perf_counter()
+        seed_ids = self._wardrobe_ids(recommender)
+        self.table.clear()
+        for seed_id in seed_ids:
+            for occasion in self.occasions:
+                self._compute_seed(recommender, seed_id, occasion)
+        self._mark_built(recommender)
+        return self._report('full', start, len(seed_ids) * len(self.occasions), len(seed_ids))
+
+    def refresh(self, recommender: 'RobustOutfitRecommender', added_ids: Iterable = (), removed_ids: Iterable = ()) -> Dict:
+        """Recompute only the seeds affected by added/removed items"""
+        start = time.perf_counter()
+        store = recommender.item_store
+        wardrobe_ids = set(self._wardrobe_ids(recommender))
+        affected = set()
+
+        for item_id in removed_ids:
+            item_id = str(item_id)
+            self.table.delete_seed(item_id)
+            affected.update(pair for pair in self.table.seeds_containing(item_id) if pair[0] != item_id)
+
+        for item_id in added_ids:
+            item_id = str(item_id)
+            if item_id not in wardrobe_ids:
+                continue
+            affected.update((item_id, occasion) for occasion in self.occasions)
+            affected.update(self._seeds_improved_by(recommender, store.id_to_row[item_id], wardrobe_ids))
+
+        recomputed = 0
+        for seed_id, occasion in sorted(affected):
+            if seed_id in wardrobe_ids:
+                self._compute_seed(recommender, seed_id, occasion)
+                recomputed += 1
+            else:
+                self.table.delete_seed(seed_id, occasion)
+        self._mark_built(recommender)
+        return self._report('incremental', start, recomputed, len(wardrobe_ids))
+
+    def _seeds_improved_by(self, recommender: 'RobustOutfitRecommender', new_row: int, wardrobe_ids: set) -> set:
+        """Seeds whose slot for the new item's category it could win"""
+        store = recommender.item_store
+        new_id = str(store.ids[new_row])
+        category = store.view(new_row).get('category')
+        seed_ids = [seed_id for seed_id in wardrobe_ids if seed_id != new_id]
+        if not seed_ids:
+            return set()
+
+        # One compatibility-matrix row: new item against every seed
+        seed_rows = np.array([store.id_to_row[seed_id] for seed_id in seed_ids], dtype=np.int64)
+        compatibility = dict(zip(seed_ids, recommender.pair_compatibility(new_row, seed_rows).tolist()))
+
+        affected = set()
+        for seed_id in seed_ids:
+            seed_view = store.view(store.id_to_row[seed_id])
+            if category not in recommender._required_categories([seed_view]):
+                continue
+            for occasion in self.occasions:
+                mask = store.attribute_index.mask_for(occasion)
+                if not mask[new_row] and mask[store.rows_for_category(category)].any():
+                    # Pruned out for this occasion while other candidates remain
+                    continue
+                slot = [m for m in self.table.members(seed_id, occasion) if m['category'] == category]
+                if not slot or compatibility[seed_id] > min(m['seed_compatibility'] for m in slot):
+                    affected.add((seed_id, occasion))
+        return affected
+
+    def _compute_seed(self, recommender: 'RobustOutfitRecommender', seed_id: str, occasion: str):
+        store = recommender.item_store
+        outfits = recommender.attach_collage_urls(recommender.rank_outfits([seed_id], occasion, self.num_outfits))
+        seed_row = store.id_to_row[seed_id]
+        members = []
+        for rank, outfit in enumerate(outfits):
+            outfit['seed_item_id'] = seed_id
+            member_ids = [str(item.get('id')) for item in outfit['items'] if str(item.get('id')) != seed_id]
+            member_rows = np.array([store.id_to_row[m] for m in member_ids], dtype=np.int64)
+            scores = recommender.pair_compatibility(seed_row, member_rows).tolist() if len(member_rows) else []
+            for member_id, row, score in zip(member_ids, member_rows.tolist(), scores):
+                members.append({
+                    'member_id': member_id,
+                    'rank': rank,
+                    'category': store.view(row).get('category'),
+                    'seed_compatibility': score
+                })
+        self.table.replace_seed(seed_id, occasion, outfits, members)
+
+    def _mark_built(self, recommender: 'RobustOutfitRecommender'):
+        self.table.set_meta('store_version', recommender.item_store.version)
+        self.table.set_meta('num_outfits', self.num_outfits)
+        self.table.set_meta('occasions', list(self.occasions))
+        self.table.set_meta('updated_at', time.time())
+
+    @staticmethod
+    def _wardrobe_ids(recommender: 'RobustOutfitRecommender') -> List[str]:
+        store = recommender.item_store
+        rows = np.flatnonzero(store.source_codes == 0)
+        return list(dict.fromkeys(str(store.ids[row]) for row in rows.tolist()))
+
+    @staticmethod
+    def _report(mode: str, start: float, recomputed: int, total_seeds: int) -> Dict:
+        return {
+            'mode': mode,
+            'seconds': round(time.perf_counter() - start, 4),
+            'seeds_recomputed': recomputed,
+            'wardrobe_items': total_seeds
+        }
@@ -8,10 +8,12 @@ from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional, Set
 from itertools import combinations, product
 import random
-from datetime import datetime
 
 from src.data.robust_data_manager import EmbeddingIndex
-from src.utils.enhanced_image_utils import create_high_res_collage
+from src.recommend.item_store import ItemStore, ItemView
+from src.recommend.outfit_cache import OutfitResultCache
+from src.recommend.outfit_log import OutfitLog
+from src.utils.lazy_collage import LazyCollageRenderer
 
 
 @dataclass
@@ -21,12 +23,24 @@ class RobustOutfitRecommender:
     embedding_index: EmbeddingIndex
     image_base_dir: str
     output_dir: str
+    item_store: Optional[ItemStore] = None
+    result_cache: Optional[OutfitResultCache] = None
+    cache_version: Optional[str] = None
+    collage_renderer: Optional[LazyCollageRenderer] = None
+    outfit_log: Optional[OutfitLog] = None
     
     def __post_init__(self):
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.outfit_dir = os.path.join(self.output_dir, self.timestamp)
-        os.makedirs(self.outfit_dir, exist_ok=True)
+        # Columnar store is built once per wardrobe version; callers that keep
+        # a warm store around can pass it in instead of rebuilding it here
+        if self.item_store is None:
+            self.item_store = ItemStore.from_frames(self.wardrobe_df, self.catalog_df)
+            self.item_store.attach_embeddings(self.embedding_index)
+        
+        # Output locations are shared across instances and only created on first write
+        if self.collage_renderer is None:
+            self.collage_renderer = LazyCollageRenderer(os.path.join(self.output_dir, 'collages'))
+        if self.outfit_log is None:
+            self.outfit_log = OutfitLog(os.path.join(self.output_dir, 'outfit_log'))
         
         # Define outfit composition rules
         self.FULL_OUTFIT_CATEGORIES = {
@@ -196,28 +210,17 @@ class RobustOutfitRecommender:
         return (pattern1 != pattern2) or (color1 != color2)
     
     def _get_item_embedding(self, item_id: str) -> Optional[np.ndarray]:
-        """Get embedding for a specific item"""
-        try:
-            # Check if it's a wardrobe item
-            if hasattr(self.embedding_index, '_wardrobe_emb') and self.embedding_index._wardrobe_emb is not None:
-                wardrobe_ids = self.embedding_index._wardrobe_ids
-                if wardrobe_ids is not None:
-                    for idx, wid in enumerate(wardrobe_ids):
-                        if str(wid) == str(item_id):
-                            return self.embedding_index._wardrobe_emb[idx]
-            
-            # Check if it's a catalog item
-            if hasattr(self.embedding_index, '_catalog_emb') and self.embedding_index._catalog_emb is not None:
-                catalog_ids = self.embedding_index._catalog_ids
-                if catalog_ids is not None:
-                    for idx, cid in enumerate(catalog_ids):
-                        if str(cid) == str(item_id):
-                            return self.embedding_index._catalog_emb[idx]
-            
-            return None
-        except Exception as e:
-            print(f"Warning: Could not get embedding for {item_id}: {e}")
+        """Get (L2-normalized) embedding for a specific item"""
+        row = self.item_store.id_to_row.get(item_id)
+        if row is None or not self.item_store.has_embedding[row]:
             return None
+        return self.item_store.embeddings[row]
+    
+    def _item_row(self, item) -> Optional[int]:
+        """Store row for an item view or record dict"""
+        if isinstance(item, ItemView):
+            return item.row
+        return self.item_store.id_to_row.get(item.get('id'))
     
     def _is_valid_outfit_combination(self, items: List[Dict]) -> bool:
         """Check if a combination of items forms a valid outfit"""
@@ -255,47 +258,18 @@ class RobustOutfitRecommender:
                 return False
         return True
     
-    def _get_candidate_items(self, category: str, exclude_ids: Set[str] = None) -> List[Dict]:
-        """Get candidate items for a specific category"""
-        if exclude_ids is None:
-            exclude_ids = set()
-        
-        candidates = []
-        
-        # Add from wardrobe
-        wardrobe_items = self.wardrobe_df[
-            (self.wardrobe_df['category'] == category) & 
-            (~self.wardrobe_df['id'].isin(exclude_ids))
-        ].to_dict('records')
-        candidates.extend(wardrobe_items)
-        
-        # Add from catalog
-        catalog_items = self.catalog_df[
-            (self.catalog_df['category'] == category) & 
-            (~self.catalog_df['id'].isin(exclude_ids))
-        ].to_dict('records')
-        candidates.extend(catalog_items)
-        
-        return candidates
+    def _get_candidate_items(self, category: str, exclude_ids: Set[str] = None, candidate_mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Get candidate items for a specific category, pruned by the occasion mask"""
+        # Wardrobe rows come before catalog rows, as before
+        return self.item_store.candidates(category, exclude_ids, candidate_mask)
     
     def _calculate_outfit_score(self, outfit_items: List[Dict], seed_items: List[Dict]) -> float:
         """Calculate overall outfit score"""
         if not outfit_items:
             return 0.0
         
-        # Cosine similarity score (average of all item similarities)
-        cos_sim_scores = []
-        for seed_item in seed_items:
-            for outfit_item in outfit_items:
-                if outfit_item['id'] != seed_item['id']:
-                    # Get embeddings for both items
-                    seed_emb = self._get_item_embedding(seed_item['id'])
-                    outfit_emb = self._get_item_embedding(outfit_item['id'])
-                    if seed_emb is not None and outfit_emb is not None:
-                        sim = self.embedding_index.cosine_similarity(seed_emb, outfit_emb)
-                        cos_sim_scores.append(sim)
-        
-        avg_cos_sim = np.mean(cos_sim_scores) if cos_sim_scores else 0.0
+        # Cosine similarity score (average of all seed/outfit item similarities)
+        avg_cos_sim = self._average_seed_similarity(outfit_items, seed_items)
         
         # Rule-based score (average of all pairwise compatibilities)
         rule_scores = []
@@ -312,25 +286,68 @@ class RobustOutfitRecommender:
         
         return final_score
     
-    def _ensure_complete_outfit(self, seed_items: List[Dict], complementary_items: List[Dict]) -> List[Dict]:
-        """Ensure the outfit is complete and valid"""
-        outfit_items = seed_items.copy()
+    def pair_compatibility(self, seed_row: int, rows: np.ndarray) -> np.ndarray:
+        """Compatibility row of one item against many: 60% cosine, 40% rules (both directions)"""
+        store = self.item_store
+        rows = np.asarray(rows, dtype=np.int64)
+        cos = np.zeros(len(rows), dtype=np.float32)
+        if store.embeddings is not None and store.has_embedding[seed_row]:
+            cos = store.embeddings[rows] @ store.embeddings[seed_row]
+            cos[~store.has_embedding[rows]] = 0.0
+        seed = store.view(seed_row)
+        rules = np.array([
+            (self._get_compatibility_score(seed, store.view(row)) + self._get_compatibility_score(store.view(row), seed)) / 2
+            for row in rows.tolist()
+        ], dtype=np.float32)
+        return 0.60 * cos + 0.40 * rules
+    
+    def _average_seed_similarity(self, outfit_items: List[Dict], seed_items: List[Dict]) -> float:
+        """Mean cosine similarity over (seed, outfit item) pairs with different ids"""
+        store = self.item_store
+        if store.embeddings is None:
+            return 0.0
         
+        seed_rows = [self._item_row(item) for item in seed_items]
+        outfit_rows = [self._item_row(item) for item in outfit_items]
+        if any(row is None for row in seed_rows + outfit_rows):
+            # Records that are not in the store have no embedding
+            seed_rows = [row for row in seed_rows if row is not None]
+            outfit_rows = [row for row in outfit_rows if row is not None]
+            if not seed_rows or not outfit_rows:
+                return 0.0
+        
+        seed_emb, seed_has = store.embedding_matrix(seed_rows)
+        outfit_emb, outfit_has = store.embedding_matrix(outfit_rows)
+        
+        # One small matrix multiply instead of per-pair lookups
+        sims = seed_emb @ outfit_emb.T
+        seed_codes = store.id_codes[seed_rows]
+        outfit_codes = store.id_codes[outfit_rows]
+        mask = (seed_codes[:, None] != outfit_codes[None, :]) & seed_has[:, None] & outfit_has[None, :]
+        if not mask.any():
+            return 0.0
+        return float(sims[mask].mean())
+    
+    def _required_categories(self, seed_items: List[Dict]) -> List[str]:
+        """Categories an outfit built around these seeds needs"""
         # Determine outfit type based on seed items
         seed_categories = [item.get('category', '') for item in seed_items]
         
         if any(cat in ['dress', 'lehenga_set', 'saree'] for cat in seed_categories):
             # Full outfit item - only need shoes, accessories, bag
-            required_categories = ['shoes', 'accessories', 'bag']
-        else:
-            # Top + bottom combination - need all components
-            # Check what we already have
-            if 'top' in seed_categories:
-                required_categories = ['bottom', 'shoes', 'accessories', 'bag']
-            elif 'bottom' in seed_categories:
-                required_categories = ['top', 'shoes', 'accessories', 'bag']
-            else:
-                required_categories = ['top', 'bottom', 'shoes', 'accessories', 'bag']
+            return ['shoes', 'accessories', 'bag']
+        # Top + bottom combination - need all components
+        # Check what we already have
+        if 'top' in seed_categories:
+            return ['bottom', 'shoes', 'accessories', 'bag']
+        if 'bottom' in seed_categories:
+            return ['top', 'shoes', 'accessories', 'bag']
+        return ['top', 'bottom', 'shoes', 'accessories', 'bag']
+    
+    def _ensure_complete_outfit(self, seed_items: List[Dict], complementary_items: Optional[List[Dict]] = None, candidate_mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Ensure the outfit is complete and valid"""
+        outfit_items = seed_items.copy()
+        required_categories = self._required_categories(seed_items)
         
         # Add missing categories
         current_categories = [item.get('category', '') for item in outfit_items]
@@ -338,7 +355,7 @@ class RobustOutfitRecommender:
         for category in required_categories:
             if category not in current_categories:
                 # Find best candidate for this category
-                candidates = self._get_candidate_items(category, {item['id'] for item in outfit_items})
+                candidates = self._get_candidate_items(category, {item['id'] for item in outfit_items}, candidate_mask)
                 
                 if candidates:
                     # Score candidates based on compatibility with current outfit
@@ -359,25 +376,13 @@ class RobustOutfitRecommender:
                         outfit_items.append(best_candidate)
         return outfit_items
     
-    def _generate_distinct_outfits(self, seed_items: List[Dict], num_outfits: int = 3) -> List[Dict]:
+    def _generate_distinct_outfits(self, seed_items: List[Dict], num_outfits: int = 3, occasion: Optional[str] = None, candidate_mask: Optional[np.ndarray] = None) -> List[Dict]:
         """Generate distinct outfit recommendations"""
         if not seed_items:
             return []
         
-        # Get all possible candidate items
-        all_candidates = []
-        
-        # Add from wardrobe
-        wardrobe_items = self.wardrobe_df.to_dict('records')
-        all_candidates.extend(wardrobe_items)
-        
-        # Add from catalog
-        catalog_items = self.catalog_df.to_dict('records')
-        all_candidates.extend(catalog_items)
-        
-        # Remove seed items from candidates
-        seed_ids = {item['id'] for item in seed_items}
-        candidates = [item for item in all_candidates if item['id'] not in seed_ids]
+        # Candidates are pulled per category from the item store inside
+        # _ensure_complete_outfit, so no full-table record conversion here
         
         # Generate outfit combinations
         outfits = []
@@ -388,14 +393,16 @@ class RobustOutfitRecommender:
             attempts += 1
             
             # Create a complete outfit
-            outfit_items = self._ensure_complete_outfit(seed_items, candidates)
+            outfit_items = self._ensure_complete_outfit(seed_items, candidate_mask=candidate_mask)
             
+            # Completion is deterministic for a given seed set, so an invalid
+            # or repeated result would come back identically on every retry
             if not outfit_items or len(outfit_items) < 2:
-                continue
+                break
             
             # Check if outfit is valid
             if not self._is_valid_outfit_combination(outfit_items):
-                continue
+                break
             
             # Calculate outfit score
             score = self._calculate_outfit_score(outfit_items, seed_items)
@@ -411,15 +418,17 @@ class RobustOutfitRecommender:
                     is_distinct = False
                     break
             
-            if is_distinct:
-                outfit = {
-                    'items': outfit_items,
-                    'score': score,
-                    'description': self._generate_outfit_description(outfit_items),
-                    'occasion': seed_items[0].get('occasion', 'casual'),
-                    'image_path': None  # Will be set when generating collage
-                }
-                outfits.append(outfit)
+            if not is_distinct:
+                break
+            
+            outfit = {
+                'items': outfit_items,
+                'score': score,
+                'description': self._generate_outfit_description(outfit_items),
+                'occasion': occasion or seed_items[0].get('occasion', 'casual'),
+                'image_path': None  # Set to the collage URL by attach_collage_urls
+            }
+            outfits.append(outfit)
         
         # Sort by score
         outfits.sort(key=lambda x: x['score'], reverse=True)
@@ -440,94 +449,76 @@ class RobustOutfitRecommender:
         
         return " + ".join(descriptions)
     
-    def _generate_outfit_collage(self, outfit: Dict, outfit_idx: int) -> str:
-        """Generate high-resolution collage for outfit"""
-        items = outfit['items']
-        image_paths = []
-        captions = []
-        
-        for item in items:
-            # Get image path
-            filename = item.get('filename', '')
-            if not filename:
-                continue
-            
-            # Check if file exists
-            if os.path.exists(filename):
-                image_paths.append(filename)
-            else:
-                # Try to find in image base directory
-                basename = os.path.basename(filename)
-                potential_path = os.path.join(self.image_base_dir, basename)
-                if os.path.exists(potential_path):
-                    image_paths.append(potential_path)
-                    continue
-                
-                # Try to find in organized dataset
-                for root, dirs, files in os.walk(self.image_base_dir):
-                    if basename in files:
-                        image_paths.append(os.path.join(root, basename))
-                        break
-            
-            # Create caption
-            category = item.get('category', 'Unknown')
-            subcategory = item.get('subcategory', 'Unknown')
-            color = item.get('primary_color', 'Unknown')
-            item_id = item.get('id', 'Unknown')
-            caption = f"{item_id} | {category} | {subcategory} | {color}"
-            captions.append(caption)
-        
-        if not image_paths:
+    def _generate_outfit_collage(self, outfit: Dict, outfit_idx: int) -> Optional[str]:
+        """Register the outfit's collage and return its URL; rendering happens on first request"""
+        items = [item for item in outfit['items'] if item.get('filename')]
+        if not items:
             return None
         
-        # Generate collage
-        output_path = os.path.join(self.outfit_dir, f"outfit_{outfit_idx + 1}.jpg")
-        
         try:
-            # Prepare item data for collage
-            item_images = []
-            for i, (item, path) in enumerate(zip(items, image_paths)):
-                item_images.append({
-                    'image_path': path,
-                    'id': item.get('id', f'item_{i}'),
-                    'category': item.get('category', 'unknown'),
-                    'subcategory': item.get('subcategory', 'unknown'),
-                    'color': item.get('dominant_color_name', 'unknown')
-                })
-            
-            result_path = create_high_res_collage(
-                item_images=item_images,
-                output_path=output_path,
+            key = self.collage_renderer.register(
+                items=items,
+                image_base_dir=self.image_base_dir,
                 width=1200,
                 height=800,
                 items_per_row=3
             )
-            return result_path
+            return self.collage_renderer.url_for(key)
         except Exception as e:
-            print(f"Error generating collage for outfit {outfit_idx + 1}: {e}")
+            print(f"Error registering collage for outfit {outfit_idx + 1}: {e}")
             return None
     
-    def recommend_outfits(self, seed_item_ids: List[int], occasion: str = "casual", num_outfits: int = 3) -> List[Dict]:
+    def attach_collage_urls(self, outfits: List[Dict]) -> List[Dict]:
+        """Set each outfit's image_path to its deterministic collage URL"""
+        for i, outfit in enumerate(outfits):
+            outfit['image_path'] = self._generate_outfit_collage(outfit, i)
+        return outfits
+    
+    def recommend_outfits(self, seed_item_ids: List[int], occasion: str = "casual", num_outfits: int = 3, season: Optional[str] = None) -> List[Dict]:
         """Generate guaranteed outfit recommendations"""
         print(f"🎯 Generating guaranteed outfit recommendations...")
         print(f"   Seed items: {seed_item_ids}")
-        print(f"   Occasion: {occasion}")
+        print(f"   Occasion: {occasion}" + (f", season: {season}" if season else ""))
         print(f"   Number of outfits: {num_outfits}")
         
-        # Find seed items
+        # Serve repeated requests for the same wardrobe version from the cache
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.make_key(
+                self._cache_version(), seed_item_ids, f"{occasion}|{season}" if season else occasion, num_outfits
+            )
+            cached_outfits = self.result_cache.get(cache_key)
+            if cached_outfits is not None:
+                print(f"⚡ Served {len(cached_outfits)} outfits from recommendation cache")
+                return cached_outfits
+        
+        outfits = self.rank_outfits(seed_item_ids, occasion, num_outfits, season)
+        if not outfits:
+            return []
+        
+        # Collage URLs only; images are rendered when a client requests them
+        self.attach_collage_urls(outfits)
+        
+        # Save metadata
+        self._save_outfit_metadata(outfits, seed_item_ids, occasion)
+        
+        if cache_key is not None:
+            self.result_cache.put(cache_key, outfits)
+        
+        return outfits
+    
+    def rank_outfits(self, seed_item_ids: List, occasion: str = "casual", num_outfits: int = 3, season: Optional[str] = None) -> List[Dict]:
+        """Score and pick outfits for the seeds, without collages or metadata files.
+        
+        This is the pure recommendation step shared by ``recommend_outfits``
+        and the offline outfit precompute job.
+        """
+        # Find seed items (wardrobe first, then catalog) via the id -> row map
         seed_items = []
         for item_id in seed_item_ids:
-            # Check in wardrobe
-            wardrobe_item = self.wardrobe_df[self.wardrobe_df['id'] == item_id]
-            if not wardrobe_item.empty:
-                seed_items.append(wardrobe_item.iloc[0].to_dict())
-                continue
-            
-            # Check in catalog
-            catalog_item = self.catalog_df[self.catalog_df['id'] == item_id]
-            if not catalog_item.empty:
-                seed_items.append(catalog_item.iloc[0].to_dict())
-                continue
+            seed_view = self.item_store.view_for_id(item_id)
+            if seed_view is not None:
+                seed_items.append(seed_view)
         
         if not seed_items:
             print("❌ No seed items found!")
@@ -535,8 +526,12 @@ class RobustOutfitRecommender:
         
         print(f"✅ Found {len(seed_items)} seed items")
         
+        # Prune candidate pools to the requested occasion/season before scoring
+        candidate_mask = self.item_store.attribute_index.mask_for(occasion, season)
+        print(f"   Occasion filter keeps {int(candidate_mask.sum())}/{len(self.item_store)} items")
+        
         # Generate distinct outfits
-        outfits = self._generate_distinct_outfits(seed_items, num_outfits)
+        outfits = self._generate_distinct_outfits(seed_items, num_outfits, occasion, candidate_mask)
         
         if not outfits:
             print("❌ No valid outfits generated!")
@@ -544,52 +539,28 @@ class RobustOutfitRecommender:
         
         print(f"✅ Generated {len(outfits)} guaranteed outfit recommendations")
         
-        # Generate collages for each outfit
-        for i, outfit in enumerate(outfits):
-            collage_path = self._generate_outfit_collage(outfit, i)
-            outfit['image_path'] = collage_path
-        
-        # Save metadata
-        self._save_outfit_metadata(outfits)
+        # Materialize records only for the items that are returned
+        for outfit in outfits:
+            outfit['items'] = [item.to_dict() if isinstance(item, ItemView) else item for item in outfit['items']]
         
         return outfits
     
-    def _save_outfit_metadata(self, outfits: List[Dict]):
-        """Save outfit metadata to JSON"""
-        metadata = {
-            'timestamp': self.timestamp,
-            'outfits': []
-        }
-        
-        for i, outfit in enumerate(outfits):
-            outfit_metadata = {
-                'outfit_id': i + 1,
-                'score': outfit['score'],
-                'description': outfit['description'],
-                'occasion': outfit['occasion'],
-                'image_path': outfit['image_path'],
-                'items': []
-            }
-            
-            for item in outfit['items']:
-                item_metadata = {
-                    'id': item.get('id', ''),
-                    'category': item.get('category', ''),
-                    'subcategory': item.get('subcategory', ''),
-                    'color': item.get('primary_color', ''),
-                    'style': item.get('style_tags', []),
-                    'filename': item.get('filename', '')
-                }
-                outfit_metadata['items'].append(item_metadata)
-            
-            metadata['outfits'].append(outfit_metadata)
-        
-        # Save metadata
-        metadata_path = os.path.join(self.outfit_dir, 'metadata.json')
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"💾 Saved outfit metadata to {metadata_path}")
+    def _cache_version(self) -> str:
+        """Version used in cache keys: caller-supplied wardrobe version plus store content version"""
+        if self.cache_version is not None:
+            return f"{self.cache_version}:{self.item_store.version}"
+        return self.item_store.version
+    
+    def _save_outfit_metadata(self, outfits: List[Dict], seed_item_ids: Optional[List] = None, occasion: Optional[str] = None):
+        """Append outfit metadata to the outfit log"""
+        try:
+            outfit_ids = self.outfit_log.append(outfits, seed_item_ids=seed_item_ids, requested_occasion=occasion)
+        except OSError as e:
+            print(f"Warning: Could not log outfits: {e}")
+            return
+        for outfit, outfit_id in zip(outfits, outfit_ids):
+            outfit['outfit_id'] = outfit_id
+        print(f"💾 Logged {len(outfit_ids)} outfits to {self.outfit_log.log_dir}")
     
     def get_recommendation_summary(self, outfits: List[Dict]) -> str:
         """Get a summary of recommendations"""
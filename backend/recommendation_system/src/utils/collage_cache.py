@@ -0,0 +1,184 @@
+"""
+Content-addressed cache for rendered outfit collages
+"""
+
+import os
+import json
+import hashlib
+import time
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Renders of the same key are serialised on one of a fixed set of locks
+LOCK_STRIPES = 64
+
+
+class CollageCache:
+    """Size-bounded on-disk cache of collage images.
+
+    Entries are named by a hash of the sorted item ids, the content hash of
+    each item image and the layout parameters, so an outfit is rendered once
+    and then reused across requests, recommender instances and restarts;
+    replacing an item image changes the key. When the cache grows past
+    ``max_bytes`` the least recently used files are evicted (hits refresh a
+    file's mtime).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        self._total_bytes: Optional[int] = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def canonical_items(item_images: List[Dict]) -> List[Dict]:
+        """Items in the canonical (sorted by id) order used for keys"""
+        return sorted(item_images, key=lambda item: str(item.get('id', '')))
+
+    def content_key(self, item_images: List[Dict], layout: Dict) -> str:
+        payload = json.dumps({
+            'items': [
+                [str(item.get('id', '')), self._file_digest(item.get('image_path', ''))]
+                for item in self.canonical_items(item_images)
+            ],
+            'layout': layout
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def get(self, key: str, ext: str = 'jpg') -> Optional[str]:
+        path = self._path(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, src_path: str, ext: str = 'jpg') -> str:
+        """Move a rendered file into the cache under its key"""
+        path = self._path(key, ext)
+        size = os.path.getsize(src_path)
+        os.replace(src_path, path)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size
+        # The caller is about to use this file, so eviction must not pick it
+        self._evict_if_needed(keep=path)
+        return path
+
+    def get_or_render(self, item_images: List[Dict], render: Callable[[List[Dict], str], Optional[str]],
+                      layout: Dict, ext: str = 'jpg') -> Optional[str]:
+        """Cached collage for the items, calling ``render(items, output_path)`` on a miss"""
+        key = self.content_key(item_images, layout)
+        path = self.get(key, ext)
+        if path:
+            self._count('hits')
+            return path
+
+        with self._lock_for(key):
+            path = self.get(key, ext)
+            if path:
+                self._count('hits')
+                return path
+            self._count('misses')
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=f'.{ext}', dir=self.cache_dir, prefix='.render_')
+            os.close(fd)
+            try:
+                # Rendered in outfit order so the seed item stays first
+                if not render(list(item_images), tmp_path):
+                    return None
+                return self.put(key, tmp_path, ext)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def prune_older_than(self, max_age_seconds: float) -> int:
+        """Remove collages not used within max_age_seconds; returns files removed"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        with self._lock:
+            for mtime, size, path in self._entries():
+                if mtime >= cutoff:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                if self._total_bytes is not None:
+                    self._total_bytes -= size
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['bytes'] = self._current_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def _file_digest(self, path: str) -> str:
+        """sha1 of an image file, memoized on (size, mtime)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 'missing'
+        cached = self._digests.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        self._digests[path] = (st.st_size, st.st_mtime_ns, value)
+        return value
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _current_bytes(self) -> int:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            return self._total_bytes
+
+    def _evict_if_needed(self, keep: Optional[str] = None):
+        if self._current_bytes() <= self.max_bytes:
+            return
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self._stats['evictions'] += 1
+            self._total_bytes = total
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._key_locks[int(key[:8], 16) % LOCK_STRIPES]
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
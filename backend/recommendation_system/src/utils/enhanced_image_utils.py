@@ -3,10 +3,87 @@ Enhanced image utilities for creating high-resolution collages
 """
 
 import os
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
-from typing import List, Dict, Tuple
-import random
+from typing import List, Dict, Optional, Tuple
+
+
+# Tried in order; the first font that loads is used for every collage
+FONT_CANDIDATES = (
+    "/System/Library/Fonts/Arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "DejaVuSans.ttf",
+)
+
+# Output extension -> PIL format
+OUTPUT_FORMATS = {
+    'jpg': 'JPEG',
+    'jpeg': 'JPEG',
+    'webp': 'WEBP',
+    'png': 'PNG',
+}
+
+PLACEHOLDER_COLOR = (240, 240, 240)
+MAX_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+
+
+@lru_cache(maxsize=8)
+def _load_font(size: int):
+    """Label font, loaded once per process and size"""
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except (OSError, IOError):
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def _decode_pool() -> ThreadPoolExecutor:
+    """Small process-wide pool for image decoding (PIL releases the GIL while decoding)"""
+    return ThreadPoolExecutor(max_workers=MAX_DECODE_WORKERS, thread_name_prefix='collage-decode')
+
+
+def _fit_size(image_size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Largest size with the image's aspect ratio that fits inside box"""
+    width, height = image_size
+    scale = min(box[0] / width, box[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _load_cell_image(item: Dict, box: Tuple[int, int]) -> Tuple[Image.Image, str]:
+    """Decode an item image and resize it once, straight to its cell box"""
+    img_path = item.get('image_path', '')
+    try:
+        if os.path.exists(img_path):
+            with Image.open(img_path) as img:
+                # Let the JPEG decoder downscale by a power of two up front
+                img.draft('RGB', box)
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+                # reducing_gap lets PIL box-reduce large sources before the LANCZOS pass
+                img = img.resize(_fit_size(img.size, box), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            label = f"{item.get('id', '')}\n{item.get('category', '')}\n{item.get('subcategory', '')}"
+            return img, label
+        # Create placeholder if image not found
+        return Image.new('RGB', box, color=PLACEHOLDER_COLOR), f"{item.get('id', '')}\nMissing"
+    except Exception as e:
+        print(f"Warning: Could not load image {img_path}: {e}")
+        return Image.new('RGB', box, color=PLACEHOLDER_COLOR), f"{item.get('id', '')}\nError"
+
+
+def _save_image(image: Image.Image, output_path: str, output_format: Optional[str], quality: int):
+    ext = (output_format or os.path.splitext(output_path)[1].lstrip('.') or 'jpg').lower()
+    pil_format = OUTPUT_FORMATS.get(ext, 'JPEG')
+    options = {}
+    if pil_format == 'JPEG':
+        options = {'quality': quality, 'optimize': True}
+    elif pil_format == 'WEBP':
+        options = {'quality': quality, 'method': 4}
+    image.save(output_path, format=pil_format, **options)
 
 
 def create_high_res_collage(
@@ -14,125 +91,100 @@ def create_high_res_collage(
     output_path: str,
     width: int = 1200,
     height: int = 800,
-    items_per_row: int = 3
+    items_per_row: int = 3,
+    output_format: Optional[str] = None,
+    quality: int = 90
 ) -> str:
     """
     Create a high-resolution collage of outfit items
-    
+
     Args:
         item_images: List of dicts with 'image_path', 'id', 'category', 'subcategory', 'color'
         output_path: Path to save the collage
         width: Width of the collage
         height: Height of the collage
         items_per_row: Number of items per row
-    
+        output_format: 'jpg', 'webp' or 'png' (defaults to the output_path extension)
+        quality: JPEG/WebP quality
+
     Returns:
         Path to the saved collage
     """
     try:
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Load and resize images
-        images = []
-        labels = []
-        
-        for item in item_images:
-            try:
-                img_path = item.get('image_path', '')
-                if os.path.exists(img_path):
-                    img = Image.open(img_path)
-                    # Resize maintaining aspect ratio
-                    img.thumbnail((200, 200), Image.Resampling.LANCZOS)
-                    images.append(img)
-                    
-                    # Create label
-                    label = f"{item.get('id', '')}\n{item.get('category', '')}\n{item.get('subcategory', '')}"
-                    labels.append(label)
-                else:
-                    # Create placeholder if image not found
-                    placeholder = Image.new('RGB', (200, 200), color=(240, 240, 240))
-                    images.append(placeholder)
-                    labels.append(f"{item.get('id', '')}\nMissing")
-            except Exception as e:
-                print(f"Warning: Could not load image {item.get('image_path', '')}: {e}")
-                # Create placeholder
-                placeholder = Image.new('RGB', (200, 200), color=(240, 240, 240))
-                images.append(placeholder)
-                labels.append(f"{item.get('id', '')}\nError")
-        
-        if not images:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+        if not item_images:
             # Create empty collage if no images
             collage = Image.new('RGB', (width, height), color=(255, 255, 255))
-            collage.save(output_path)
+            _save_image(collage, output_path, output_format, quality)
             return output_path
-        
+
         # Calculate grid layout
-        num_items = len(images)
+        num_items = len(item_images)
         rows = (num_items + items_per_row - 1) // items_per_row
         cols = min(items_per_row, num_items)
-        
+
         # Calculate item size
         item_width = width // cols
         item_height = height // rows
-        
+        box = (max(1, item_width - 20), max(1, item_height - 40))
+
+        # Decode and resize in parallel when there is more than one core
+        if MAX_DECODE_WORKERS > 1 and num_items > 1:
+            cells = list(_decode_pool().map(lambda item: _load_cell_image(item, box), item_images))
+        else:
+            cells = [_load_cell_image(item, box) for item in item_images]
+
         # Create collage
         collage = Image.new('RGB', (width, height), color=(255, 255, 255))
-        
+        draw = ImageDraw.Draw(collage)
+        font = _load_font(12)
+
         # Place images
-        for i, (img, label) in enumerate(zip(images, labels)):
+        for i, (img, label) in enumerate(cells):
             row = i // cols
             col = i % cols
-            
+
             x = col * item_width
             y = row * item_height
-            
-            # Resize image to fit cell
-            img_resized = img.resize((item_width - 20, item_height - 40), Image.Resampling.LANCZOS)
-            
-            # Paste image
-            paste_x = x + 10
-            paste_y = y + 10
-            collage.paste(img_resized, (paste_x, paste_y))
-            
+
+            # Paste image centred in its cell
+            paste_x = x + 10 + (box[0] - img.width) // 2
+            paste_y = y + 10 + (box[1] - img.height) // 2
+            collage.paste(img, (paste_x, paste_y))
+
             # Add label
             try:
-                draw = ImageDraw.Draw(collage)
-                # Try to use a default font, fallback to basic if not available
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
-                except:
-                    font = ImageFont.load_default()
-                
                 # Draw label background
                 text_bbox = draw.textbbox((0, 0), label, font=font)
                 text_width = text_bbox[2] - text_bbox[0]
                 text_height = text_bbox[3] - text_bbox[1]
-                
+
                 label_x = x + (item_width - text_width) // 2
                 label_y = y + item_height - 30
-                
+
                 # Draw background rectangle
                 draw.rectangle([
                     label_x - 5, label_y - 2,
                     label_x + text_width + 5, label_y + text_height + 2
-                ], fill=(255, 255, 255, 200))
-                
+                ], fill=(255, 255, 255))
+
                 # Draw text
                 draw.text((label_x, label_y), label, fill=(0, 0, 0), font=font)
             except Exception as e:
                 print(f"Warning: Could not add label: {e}")
-        
+
         # Save collage
-        collage.save(output_path, quality=95)
+        _save_image(collage, output_path, output_format, quality)
         return output_path
-        
+
     except Exception as e:
         print(f"Error creating collage: {e}")
         # Create a simple fallback collage
         try:
-            fallback = Image.new('RGB', (width, height), color=(240, 240, 240))
-            fallback.save(output_path)
+            fallback = Image.new('RGB', (width, height), color=PLACEHOLDER_COLOR)
+            _save_image(fallback, output_path, output_format, quality)
             return output_path
-        except:
-            return ""
\ No newline at end of file
+        except Exception:
+            return ""
@@ -0,0 +1,157 @@
+"""
+Basename -> path index for item images under a directory tree
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Optional
+
+
+class ImagePathIndex:
+    """Maps image basenames to their path under ``root_dir``.
+
+    The tree is walked once with ``os.scandir`` and the result (plus each
+    directory's mtime) is persisted to ``index_path``. ``refresh`` only
+    rescans directories whose mtime changed, which is what adding or
+    removing a file does, so new images are picked up without a full crawl.
+    Lookups are a dict access.
+    """
+
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+    def __init__(self, root_dir: str, index_path: Optional[str] = None, min_refresh_interval: float = 2.0):
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_path = index_path
+        self.min_refresh_interval = min_refresh_interval
+        self._paths: Dict[str, str] = {}
+        self._dir_mtimes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        if not self._load():
+            self.rebuild()
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """Path for a filename or basename, refreshing once on a miss"""
+        if not filename:
+            return None
+        basename = os.path.basename(filename)
+        path = self._lookup(basename)
+        if path is not None and not os.path.exists(path):
+            path = None
+        if path is None and time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+            self.refresh()
+            path = self._lookup(basename)
+        return path
+
+    def add(self, path: str):
+        """Record a file that was just written under the root"""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._paths.setdefault(os.path.basename(path), path)
+            directory = os.path.dirname(path)
+            try:
+                self._dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                pass
+        self._save()
+
+    def rebuild(self):
+        """Full scan of the tree"""
+        paths: Dict[str, str] = {}
+        dir_mtimes: Dict[str, int] = {}
+        self._scan(self.root_dir, paths, dir_mtimes, recursive=True)
+        with self._lock:
+            self._paths = paths
+            self._dir_mtimes = dir_mtimes
+            self._last_refresh = time.monotonic()
+        self._save()
+
+    def refresh(self) -> int:
+        """Rescan directories whose mtime changed; returns how many were rescanned"""
+        with self._lock:
+            known = dict(self._dir_mtimes)
+        changed = []
+        for directory, mtime in known.items():
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                changed.append(directory)
+
+        if changed:
+            with self._lock:
+                for directory in changed:
+                    # Drop the directory's old entries, then rescan it (new
+                    # subdirectories are picked up recursively)
+                    prefix = directory + os.sep
+                    self._paths = {
+                        name: path for name, path in self._paths.items()
+                        if os.path.dirname(path) != directory
+                    }
+                    self._dir_mtimes.pop(directory, None)
+                    if not os.path.isdir(directory):
+                        self._paths = {name: path for name, path in self._paths.items() if not path.startswith(prefix)}
+                        self._dir_mtimes = {d: m for d, m in self._dir_mtimes.items() if not d.startswith(prefix)}
+                        continue
+                    self._scan(directory, self._paths, self._dir_mtimes, recursive=False)
+            self._save()
+        self._last_refresh = time.monotonic()
+        return len(changed)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def _lookup(self, basename: str) -> Optional[str]:
+        with self._lock:
+            return self._paths.get(basename)
+
+    def _scan(self, directory: str, paths: Dict[str, str], dir_mtimes: Dict[str, int], recursive: bool):
+        """Index one directory; subdirectories not seen before are always scanned"""
+        try:
+            dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in sorted(entries, key=lambda e: e.name):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive or entry.path not in dir_mtimes:
+                        self._scan(entry.path, paths, dir_mtimes, recursive)
+                elif entry.name.lower().endswith(self.IMAGE_EXTENSIONS):
+                    # First match wins, like the top-down os.walk it replaces
+                    paths.setdefault(entry.name, entry.path)
+            except OSError:
+                continue
+
+    def _load(self) -> bool:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            if data.get('root_dir') != self.root_dir:
+                return False
+            self._paths = data['paths']
+            self._dir_mtimes = data['dir_mtimes']
+        except (OSError, ValueError, KeyError):
+            return False
+        # Pick up whatever changed while we were not running
+        self.refresh()
+        return True
+
+    def _save(self):
+        if not self.index_path:
+            return
+        with self._lock:
+            data = {'root_dir': self.root_dir, 'paths': dict(self._paths), 'dir_mtimes': dict(self._dir_mtimes)}
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not save image path index: {e}")
@@ -0,0 +1,190 @@
+"""
+Lazy outfit collage rendering
+
+Recommendations only register a small collage spec and hand out a
+deterministic URL; the collage itself is rendered the first time that URL
+is requested and then served from the content-addressed collage cache.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from src.utils.collage_cache import CollageCache
+from src.utils.enhanced_image_utils import create_high_res_collage
+from src.utils.image_path_index import ImagePathIndex
+
+
+class LazyCollageRenderer:
+    """Registers collage specs and renders them on first request.
+
+    A collage key is a hash of the ordered item ids/filenames and the layout,
+    so the same outfit always maps to the same URL. Specs are JSON files in
+    ``collage_dir``, which lets a different process (the API server) render
+    collages registered by another (an offline job or CLI). Rendered images
+    live in a content-addressed CollageCache.
+    """
+
+    FORMATS = ('jpg', 'webp')
+
+    def __init__(self, collage_dir: str, url_prefix: str = '/api/outfit-collage', cache: Optional[CollageCache] = None,
+                 output_format: str = 'jpg', quality: int = 90):
+        self.collage_dir = collage_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.output_format = output_format if output_format in self.FORMATS else 'jpg'
+        self.quality = quality
+        self.cache = cache or CollageCache(os.path.join(collage_dir, 'cache'))
+        self._specs: Dict[str, Dict] = {}
+        self._specs_lock = threading.Lock()
+        self._path_indexes: Dict[str, ImagePathIndex] = {}
+
+    @staticmethod
+    def make_key(items: List[Dict], image_base_dir: str, width: int, height: int, items_per_row: int) -> str:
+        payload = json.dumps({
+            'items': [[str(item.get('id', '')), str(item.get('filename', '') or '')] for item in items],
+            'image_base_dir': image_base_dir,
+            'layout': [width, height, items_per_row]
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def register(self, items: List[Dict], image_base_dir: str, width: int = 1200, height: int = 800, items_per_row: int = 3) -> str:
+        """Persist the spec for an outfit collage (no image work) and return its key"""
+        key = self.make_key(items, image_base_dir, width, height, items_per_row)
+        spec_path = self._spec_path(key)
+        if os.path.exists(spec_path):
+            # Keep specs that are still being handed out inside the retention window
+            os.utime(spec_path)
+        else:
+            spec = {
+                'key': key,
+                'image_base_dir': image_base_dir,
+                'width': width,
+                'height': height,
+                'items_per_row': items_per_row,
+                'items': [
+                    {
+                        'id': item.get('id', f'item_{i}'),
+                        'filename': item.get('filename', '') or '',
+                        'category': item.get('category', 'unknown'),
+                        'subcategory': item.get('subcategory', 'unknown'),
+                        'color': item.get('dominant_color_name', 'unknown')
+                    }
+                    for i, item in enumerate(items)
+                ]
+            }
+            self._write_json(spec_path, spec)
+        return key
+
+    def url_for(self, key: str, output_format: Optional[str] = None) -> str:
+        return f"{self.url_prefix}/{key}.{output_format or self.output_format}"
+
+    def is_registered(self, key: str) -> bool:
+        return os.path.exists(self._spec_path(key))
+
+    def render(self, key: str, output_format: Optional[str] = None) -> Optional[str]:
+        """Path of the rendered collage, rendering it on first use (None if unknown or no images)"""
+        output_format = output_format or self.output_format
+        spec = self._load_spec(key)
+        if spec is None or output_format not in self.FORMATS:
+            return None
+
+        item_images = []
+        for item in spec['items']:
+            path = self._resolve_image(item.get('filename', ''), spec['image_base_dir'])
+            if path:
+                item_images.append(dict(item, image_path=path))
+        if not item_images:
+            return None
+
+        layout = {'width': spec['width'], 'height': spec['height'], 'items_per_row': spec['items_per_row']}
+
+        def render(items: List[Dict], output_path: str) -> Optional[str]:
+            return create_high_res_collage(
+                item_images=items, output_path=output_path,
+                output_format=output_format, quality=self.quality, **layout
+            )
+
+        return self.cache.get_or_render(item_images, render, dict(layout, quality=self.quality), ext=output_format)
+
+    def apply_retention(self, max_age_days: float) -> int:
+        """Age out collage specs and rendered collages unused for max_age_days"""
+        max_age_seconds = max_age_days * 24 * 3600
+        cutoff = time.time() - max_age_seconds
+        removed = self.cache.prune_older_than(max_age_seconds)
+        if not os.path.isdir(self.collage_dir):
+            return removed
+        with os.scandir(self.collage_dir) as it:
+            for entry in it:
+                if not (entry.is_file() and entry.name.endswith('.json')):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    continue
+        with self._specs_lock:
+            self._specs.clear()
+        return removed
+
+    def _load_spec(self, key: str) -> Optional[Dict]:
+        if not _is_key(key):
+            return None
+        with self._specs_lock:
+            spec = self._specs.get(key)
+        if spec is not None:
+            return spec
+        try:
+            with open(self._spec_path(key), 'r') as f:
+                spec = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._specs_lock:
+            self._specs[key] = spec
+        return spec
+
+    def _resolve_image(self, filename: str, image_base_dir: str) -> Optional[str]:
+        if not filename:
+            return None
+        if os.path.exists(filename):
+            return filename
+        # Try to find in image base directory
+        basename = os.path.basename(filename)
+        potential_path = os.path.join(image_base_dir, basename)
+        if os.path.exists(potential_path):
+            return potential_path
+        # Try to find in organized dataset (indexed once instead of walked per item)
+        if not os.path.isdir(image_base_dir):
+            return None
+        return self._path_index(image_base_dir).resolve(basename)
+
+    def _path_index(self, image_base_dir: str) -> ImagePathIndex:
+        root = os.path.abspath(image_base_dir)
+        with self._specs_lock:
+            index = self._path_indexes.get(root)
+        if index is None:
+            digest = hashlib.sha1(root.encode()).hexdigest()[:12]
+            index = ImagePathIndex(root, index_path=os.path.join(self.collage_dir, 'image_index', f"{digest}.json"))
+            with self._specs_lock:
+                index = self._path_indexes.setdefault(root, index)
+        return index
+
+    def _spec_path(self, key: str) -> str:
+        return os.path.join(self.collage_dir, f"{key}.json")
+
+    def _write_json(self, path: str, data: Dict):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not save collage spec: {e}")
+
+
+def _is_key(key: str) -> bool:
+    return len(key) == 40 and all(c in '0123456789abcdef' for c in key)
@@ -2,7 +2,7 @@
 """
 Simple script to run the Flask backend server
 """
-from app import app, create_tables
+from app import app, create_tables, is_serving_process
 
 if __name__ == '__main__':
     print("Starting Wardrobe API Server...")
@@ -14,5 +14,6 @@ if __name__ == '__main__':
     print("  GET  /api/health - Health check")
     print("\nPress Ctrl+C to stop the server")
     
-    create_tables()
+    if is_serving_process(debug=True):
+        create_tables()
     app.run(debug=True, host='0.0.0.0', port=5000)
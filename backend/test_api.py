@@ -49,7 +49,8 @@ def test_upload_item():
         print(f"Status: {response.status_code}")
         print(f"Response: {response.json()}")
         
-        if response.status_code == 201:
+        # 202: the item is saved and classification continues as a background job
+        if response.status_code == 202:
             return response.json()
         return None
         
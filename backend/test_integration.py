@@ -52,6 +52,23 @@ def test_wardrobe_endpoints():
         print(f"❌ Error testing wardrobe endpoints: {e}")
         return 0
 
+def wait_for_classification(upload, timeout=120):
+    """Poll the upload's classification job; returns the classified item (or the upload on timeout)"""
+    status_url = upload.get('status_url')
+    if not status_url:
+        return upload
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = requests.get(f"http://localhost:5000{status_url}").json()
+        if job.get('status') == 'succeeded':
+            return (job.get('result') or {}).get('item') or upload
+        if job.get('status') == 'failed':
+            print(f"   Classification failed: {job.get('error')}")
+            return upload
+        time.sleep(1)
+    print("   Classification still running")
+    return upload
+
 def test_upload_integration():
     """Test upload with recommendation system integration"""
     try:
@@ -66,10 +83,12 @@ def test_upload_integration():
             response = requests.post("http://localhost:5000/api/wardrobe/upload", 
                                    files=files, data=data)
         
-        if response.status_code == 201:
+        # 202: the item is saved; tags arrive when its classification job finishes
+        if response.status_code == 202:
             result = response.json()
-            print(f"✅ Upload successful: ID {result.get('id')}")
+            print(f"✅ Upload successful: ID {result.get('id')}, job {result.get('job_id')}")
             print(f"   Category: {result.get('category')}")
+            result = wait_for_classification(result)
             print(f"   Subcategory: {result.get('subcategory', 'N/A')}")
             print(f"   Recommendation ID: {result.get('recommendation_id', 'N/A')}")
             return result.get('id')
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the outbound HTTP circuit breaker (no network needed)
+
+Run with: python -m pytest test_outbound.py
+"""
+
+import pytest
+import requests
+
+import outbound
+from outbound import CircuitBreaker, CircuitOpenError, Provider
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(outbound.time, 'monotonic', fake)
+    return fake
+
+
+def fake_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 29
+    assert breaker.state == 'open'
+    clock.now += 1
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_for_a_full_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_cancelled_trial_can_be_retried(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.cancel_trial()
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+
+
+def test_provider_counts_5xx_and_429_as_failures(clock, monkeypatch):
+    provider = Provider('test', failure_threshold=2, reset_timeout=30)
+    monkeypatch.setattr(provider.session, 'request', lambda *args, **kwargs: fake_response(503))
+    provider.get('http://upstream.invalid/')
+    monkeypatch.setattr(provider.session, 'request', lambda *args, **kwargs: fake_response(429))
+    provider.get('http://upstream.invalid/')
+    assert provider.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        provider.get('http://upstream.invalid/')
+    stats = provider.stats()
+    assert (stats['calls'], stats['failures'], stats['rejected_open'], stats['in_flight']) == (2, 2, 1, 0)
+
+
+def test_provider_trial_success_closes_the_circuit(clock, monkeypatch):
+    provider = Provider('test', failure_threshold=1, reset_timeout=30)
+
+    def refuse(*args, **kwargs):
+        raise requests.ConnectionError('refused')
+
+    monkeypatch.setattr(provider.session, 'request', refuse)
+    with pytest.raises(requests.ConnectionError):
+        provider.get('http://upstream.invalid/')
+    assert provider.breaker.state == 'open'
+    clock.now += 30
+    monkeypatch.setattr(provider.session, 'request', lambda *args, **kwargs: fake_response(200))
+    assert provider.get('http://upstream.invalid/').status_code == 200
+    assert provider.breaker.state == 'closed'
+
+
+def test_provider_releases_the_trial_on_local_errors(clock, monkeypatch):
+    provider = Provider('test', failure_threshold=1, reset_timeout=30)
+    provider.breaker.record_failure()
+    clock.now += 30
+
+    def broken(*args, **kwargs):
+        raise TypeError('bad argument')
+
+    monkeypatch.setattr(provider.session, 'request', broken)
+    with pytest.raises(TypeError):
+        provider.get('http://upstream.invalid/')
+    # Not an upstream failure: still half-open, and the next call gets the trial
+    assert provider.breaker.state == 'half_open'
+    monkeypatch.setattr(provider.session, 'request', lambda *args, **kwargs: fake_response(200))
+    assert provider.get('http://upstream.invalid/').status_code == 200
+    assert provider.breaker.state == 'closed'
+    assert provider.stats()['in_flight'] == 0
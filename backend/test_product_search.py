@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the product search index (no server needed)
+
+Run with: python -m pytest test_product_search.py
+"""
+
+import pytest
+
+from product_search import ProductSearchIndex, normalize_token, tokenize
+
+CATALOG = [
+    {'id': 'p1', 'name': 'Red Silk Saree', 'category': 'ethnic', 'brand': 'Biba', 'price': 3500,
+     'tags': ['festive', 'silk'], 'colors': ['red'], 'themes': ['diwali']},
+    {'id': 'p2', 'name': 'Embroidered Lehenga', 'category': 'ethnic', 'brand': 'Libas', 'price': 8000,
+     'tags': ['festive', 'wedding'], 'colors': ['maroon'], 'themes': ['navratri']},
+    {'id': 'p3', 'name': 'Denim Jacket', 'category': 'outerwear', 'brand': 'Levis', 'price': 2500,
+     'tags': ['casual', 'layering'], 'colors': ['blue'], 'themes': ['autumn']},
+    {'id': 'p4', 'name': 'Chelsea Boots', 'category': 'shoes', 'brand': 'Clarks', 'price': 5000,
+     'tags': ['leather', 'layering'], 'colors': ['brown'], 'themes': ['autumn']},
+    {'id': 'p5', 'name': 'Cotton Kurta', 'category': 'ethnic', 'brand': 'Fabindia', 'price': 1200,
+     'tags': ['festive', 'cotton'], 'colors': ['yellow'], 'themes': ['diwali']},
+    # Same product listed under a second theme
+    {'id': 'p1', 'name': 'Red Silk Saree', 'category': 'ethnic', 'brand': 'Biba', 'price': 3500,
+     'tags': ['festive', 'silk'], 'colors': ['red'], 'themes': ['navratri']},
+]
+
+
+@pytest.fixture(scope='module')
+def index():
+    return ProductSearchIndex(CATALOG)
+
+
+def ids(products):
+    return [product['id'] for product in products]
+
+
+def test_tokenize_folds_plurals():
+    assert normalize_token('boots') == 'boot'
+    assert normalize_token('dresses') == 'dress'
+    assert normalize_token('dress') == 'dress'
+    assert tokenize('Chelsea Boots!') == ['chelsea', 'boot']
+
+
+def test_duplicate_products_merge_their_themes(index):
+    assert len(index) == 5
+    assert index.products[0]['themes'] == ['diwali', 'navratri']
+    assert index.has_theme('Navratri')
+    assert not index.has_theme('summer')
+
+
+def test_exact_match_ranks_name_hits_first(index):
+    assert ids(index.search('saree')) == ['p1']
+    assert ids(index.search('festive', limit=2)) == ids(index.search('festive'))[:2]
+    assert index.search('festive', limit=0) == []
+
+
+def test_prefix_expansion_for_the_last_word(index):
+    assert ids(index.search('lehe')) == ['p2']
+    assert ids(index.search('denim jac')) == ['p3']
+
+
+def test_typo_expansion(index):
+    # One edit away: a deletion, an insertion and a substitution
+    assert ids(index.search('jaket')) == ['p3']
+    assert ids(index.search('kurtaa')) == ['p5']
+    assert ids(index.search('lehenga')) == ids(index.search('lehenba'))
+
+
+def test_exact_term_is_not_also_typo_expanded(index):
+    assert index._expand('silk', is_last=False) == [('silk', 1.0)]
+    assert ('silk', 1.0) in index._expand('silk', is_last=True)
+
+
+def test_unknown_words_match_nothing(index):
+    assert index.search('xyzzy') == []
+
+
+def test_facet_masks_filter_by_theme_and_category(index):
+    assert set(ids(index.search('festive', themes=['diwali']))) == {'p1', 'p5'}
+    assert ids(index.search('festive', themes=['navratri'], category='Ethnic')) == ids(
+        index.search('festive', themes=['navratri']))
+    assert index.search('layering', category='ethnic') == []
+    assert index.search('festive', category='no-such-category') == []
+    assert index.facet_counts()['theme'] == {'diwali': 2, 'navratri': 2, 'autumn': 2}
+
+
+def test_price_filters(index):
+    assert set(ids(index.search('festive', min_price=3000))) == {'p1', 'p2'}
+    assert set(ids(index.search('festive', max_price=3500))) == {'p1', 'p5'}
+    assert ids(index.search('festive', min_price=3000, max_price=5000)) == ['p1']
+    assert index.search('festive', min_price=9000) == []
+
+
+def test_filters_still_fill_the_page(index):
+    # Filtering happens before the posting heads are cut, so cheap matches are not lost
+    small = ProductSearchIndex(CATALOG, max_postings=1)
+    assert ids(small.search('festive', max_price=1500)) == ['p5']
+
+
+def test_browse_keeps_catalog_order_and_excludes(index):
+    assert ids(index.browse(themes=['autumn'])) == ['p3', 'p4']
+    assert ids(index.browse(themes=['autumn'], exclude=['p3'])) == ['p4']
+    assert ids(index.browse(themes=['diwali'], min_price=2000)) == ['p1']
+    assert index.browse(themes=['autumn'], limit=-1) == []
@@ -2,6 +2,7 @@ import React from "react";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { Check } from "lucide-react";
+import { imageVariantUrl } from "@/services/wardrobeApi";
 
 interface OutfitItem {
   id: string;
@@ -71,7 +72,7 @@ const OutfitCard: React.FC<OutfitCardProps> = ({
             <div key={item.id} className="relative group">
               <div className="aspect-square bg-gradient-to-br from-pink-50 to-pink-100 rounded-xl overflow-hidden shadow-lg hover:shadow-xl transition-all duration-300 border border-pink-200">
                 <img
-                  src={item.image}
+                  src={imageVariantUrl(item.image, 480)}
                   alt={item.name}
                   className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-110"
                   onError={(e) => {
@@ -3,7 +3,7 @@ import { Filter, Grid, Trash2, RefreshCw } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import GamificationDashboard from "@/components/GamificationDashboard";
-import { getWardrobeItems, deleteWardrobeItem } from "@/services/wardrobeApi";
+import { deleteWardrobeItem, imageVariantUrl } from "@/services/wardrobeApi";
 import { loadAllWardrobeItems, clearLocalStorageDuplicates } from "@/utils/wardrobeUtils";
 
 interface ClothingItem {
@@ -218,8 +218,9 @@ const ClosetGrid = () => {
               >
                 <div className="aspect-square relative overflow-hidden">
                   <img
-                    src={item.image}
+                    src={imageVariantUrl(item.image, 320)}
                     alt={item.name || `${item.category} item`}
+                    loading="lazy"
                     className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-110"
                   />
                   <div className="absolute top-3 left-3">
@@ -8,7 +8,7 @@ import OutfitCard from "@/components/OutfitCard";
 import { myntraCatalog, type MyntraItem } from "@/data/myntraCatalog";
 import { toast } from "@/hooks/use-toast";
 import { loadAllWardrobeItems } from "@/utils/wardrobeUtils";
-import { generateOutfitRecommendations, type OutfitGenerationResponse, type OutfitRecommendation } from "@/services/wardrobeApi";
+import { generateOutfitRecommendations, imageVariantUrl, type OutfitGenerationResponse, type OutfitRecommendation } from "@/services/wardrobeApi";
 import { detectCombination, createHardcodedOutfit, type HardcodedOutfit } from "@/utils/combinationUtils";
 
 interface ClothingItem {
@@ -310,8 +310,9 @@ const OutfitRecommendations = () => {
                 >
                   <div className="aspect-square bg-gray-50">
                     <img
-                      src={item.image}
+                      src={imageVariantUrl(item.image, 320)}
                       alt={item.name || `${item.category} item`}
+                      loading="lazy"
                       className="w-full h-full object-cover"
                     />
                     <button
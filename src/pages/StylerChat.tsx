@@ -5,7 +5,7 @@ import { Input } from "@/components/ui/input";
 import { Badge } from "@/components/ui/badge";
 import { myntraCatalog } from "@/data/myntraCatalog";
 import { toast } from "@/hooks/use-toast";
-import { generateStylist, StylistResponse } from "@/services/wardrobeApi";
+import { generateStylist, StylistResponse, watchImageJob } from "@/services/wardrobeApi";
 import { generateLookboardSuggestion, LookboardData } from "@/services/geminiApi";
 import Lookboard from "@/components/Lookboard";
 import { useNavigate } from "react-router-dom";
@@ -175,6 +175,19 @@ const StylerChat = () => {
           iconicImage: res.image_url || undefined,
         };
         setMessages(prev => [...prev, stylistResponse]);
+        if (res.image_job_id) {
+          // The reference image is generated in the background; attach it when ready
+          watchImageJob(res.image_job_id, (job) => {
+            if (job.status === 'succeeded' && job.result?.image_url) {
+              const imageUrl = job.result.image_url.startsWith('/')
+                ? `http://localhost:5000${job.result.image_url}`
+                : job.result.image_url;
+              setMessages(prev => prev.map(message =>
+                message.id === stylistResponse.id ? { ...message, iconicImage: imageUrl } : message
+              ));
+            }
+          });
+        }
         if (res.warning) {
           toast({ title: "Partial result", description: res.warning });
         }
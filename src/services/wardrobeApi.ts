@@ -2,7 +2,8 @@
  * API service for wardrobe operations
  */
 
-const API_BASE_URL = 'http://localhost:5000/api';
+const BACKEND_URL = 'http://localhost:5000';
+const API_BASE_URL = `${BACKEND_URL}/api`;
 
 export interface WardrobeItem {
   id: number;
@@ -16,6 +17,19 @@ export interface UploadResponse {
   image_url: string;
   category: string;
   created_at: string;
+  // Classification runs in the background; follow it with watchUploadJob
+  job_id?: string;
+  status_url?: string;
+  events_url?: string;
+}
+
+export interface UploadJob {
+  id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'retrying' | 'succeeded' | 'failed';
+  attempts: number;
+  result: { item: WardrobeItem } | null;
+  error: string | null;
 }
 
 export interface ApiError {
@@ -26,6 +40,19 @@ export interface StylistResponse {
   description: string;
   image_url: string | null;
   warning?: string;
+  // Fallback responses return the text first; the image follows via watchImageJob
+  image_job_id?: string;
+  image_status_url?: string;
+  image_events_url?: string;
+}
+
+export interface ImageJob {
+  id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'retrying' | 'succeeded' | 'failed';
+  attempts: number;
+  result: { image_url: string; source: 'deepai' | 'placeholder' } | null;
+  error: string | null;
 }
 
 export interface OutfitItem {
@@ -90,6 +117,93 @@ export async function uploadWardrobeItem(
   return response.json();
 }
 
+export interface BulkUploadResult {
+  index: number;
+  filename: string;
+  status: 'created' | 'failed';
+  classified?: boolean;
+  item?: WardrobeItem;
+  error?: string;
+  // Set when the item was saved untagged; follow it with watchUploadJob
+  job_id?: string;
+  status_url?: string;
+  events_url?: string;
+}
+
+export interface BulkUploadResponse {
+  results: BulkUploadResult[];
+  created: number;
+  failed: number;
+  seconds: number;
+}
+
+/**
+ * Upload many wardrobe items in one request (classified as a single batch)
+ */
+export async function bulkUploadWardrobeItems(
+  files: { imageFile: File; category: string }[]
+): Promise<BulkUploadResponse> {
+  const formData = new FormData();
+  files.forEach(({ imageFile, category }) => {
+    formData.append('images', imageFile);
+    formData.append('categories', category);
+  });
+
+  const response = await fetch(`${API_BASE_URL}/wardrobe/bulk-upload`, {
+    method: 'POST',
+    body: formData,
+    mode: 'cors',
+    credentials: 'omit',
+  });
+
+  const data = await response.json();
+  if (!response.ok && !data.results) {
+    throw new Error((data as ApiError).error || 'Failed to upload items');
+  }
+  return data;
+}
+
+/**
+ * Follow a background job over server-sent events until it finishes
+ */
+function watchJob<TJob extends { status: string }>(
+  jobId: string,
+  onUpdate: (job: TJob) => void
+): () => void {
+  const source = new EventSource(`${API_BASE_URL}/jobs/events?job_id=${encodeURIComponent(jobId)}`);
+  source.addEventListener('job', (event) => {
+    const job: TJob = JSON.parse((event as MessageEvent).data);
+    onUpdate(job);
+    if (job.status === 'succeeded' || job.status === 'failed') {
+      source.close();
+    }
+  });
+  source.addEventListener('error', () => source.close());
+  return () => source.close();
+}
+
+/**
+ * Follow an upload's background classification job over server-sent events.
+ * Returns a function that stops listening.
+ */
+export function watchUploadJob(
+  jobId: string,
+  onUpdate: (job: UploadJob) => void
+): () => void {
+  return watchJob<UploadJob>(jobId, onUpdate);
+}
+
+/**
+ * Follow a stylist fallback image job; onUpdate receives the image URL once it is ready.
+ * Returns a function that stops listening.
+ */
+export function watchImageJob(
+  jobId: string,
+  onUpdate: (job: ImageJob) => void
+): () => void {
+  return watchJob<ImageJob>(jobId, onUpdate);
+}
+
 /**
  * Get all wardrobe items from the backend
  */
@@ -107,6 +221,89 @@ export async function getWardrobeItems(): Promise<WardrobeItem[]> {
   return response.json();
 }
 
+/**
+ * Get one page of wardrobe items (newest first). Pass the returned
+ * nextCursor to fetch the following page; it is null on the last page.
+ * Pass the page's previous etag to revalidate it: an unchanged page comes
+ * back as notModified with no items.
+ */
+export async function getWardrobePage(
+  limit: number,
+  cursor?: string | null,
+  fields?: string[],
+  etag?: string | null
+): Promise<WardrobePage> {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  if (fields?.length) params.set('fields', fields.join(','));
+
+  const response = await fetch(`${API_BASE_URL}/wardrobe?${params}`, {
+    method: 'GET',
+    headers: etag ? { 'If-None-Match': etag } : undefined,
+    mode: 'cors',
+    credentials: 'omit',
+  });
+
+  const page = {
+    etag: response.headers.get('ETag'),
+    version: Number(response.headers.get('X-Wardrobe-Version') || 0),
+  };
+  if (response.status === 304) {
+    return { ...page, items: [], nextCursor: null, notModified: true };
+  }
+  if (!response.ok) {
+    throw new Error('Failed to fetch wardrobe items');
+  }
+
+  return {
+    ...page,
+    items: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+    notModified: false,
+  };
+}
+
+export interface WardrobePage {
+  items: WardrobeItem[];
+  nextCursor: string | null;
+  etag: string | null;
+  version: number; // X-Wardrobe-Version: the since for getWardrobeChanges
+  notModified: boolean;
+}
+
+export interface WardrobeChange {
+  version: number;
+  op: 'insert' | 'update' | 'delete';
+  item_id: number;
+  item: WardrobeItem | null;
+  changed_at: string;
+}
+
+export interface WardrobeChangesResponse {
+  version: number;
+  changes: WardrobeChange[];
+  has_more: boolean;
+  reset: boolean; // since is too old: refetch the full wardrobe
+}
+
+/**
+ * Get wardrobe changes after a version (the full list's X-Wardrobe-Version
+ * header gives the starting point)
+ */
+export async function getWardrobeChanges(since: number): Promise<WardrobeChangesResponse> {
+  const response = await fetch(`${API_BASE_URL}/wardrobe/changes?since=${since}`, {
+    method: 'GET',
+    mode: 'cors',
+    credentials: 'omit',
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to fetch wardrobe changes');
+  }
+
+  return response.json();
+}
+
 /**
  * Generate stylist recommendation and reference image
  */
@@ -165,6 +362,64 @@ export async function generateOutfitRecommendations(
   return response.json();
 }
 
+export interface SimilarWardrobeItem extends WardrobeItem {
+  similarity: number;
+}
+
+export interface ImageSearchResponse {
+  wardrobe: SimilarWardrobeItem[];
+  catalog: { id: string; similarity: number }[];
+  category: string | null;
+  took_ms: number;
+}
+
+/**
+ * Find wardrobe and catalog items similar to a photo (the photo is not saved)
+ */
+export async function searchByImage(
+  imageFile: File,
+  options: { category?: string; limit?: number } = {}
+): Promise<ImageSearchResponse> {
+  const formData = new FormData();
+  formData.append('image', imageFile);
+  if (options.category) {
+    formData.append('category', options.category);
+  }
+  if (options.limit) {
+    formData.append('limit', String(options.limit));
+  }
+
+  const response = await fetch(`${API_BASE_URL}/search/by-image`, {
+    method: 'POST',
+    body: formData,
+    mode: 'cors',
+    credentials: 'omit',
+  });
+
+  if (!response.ok) {
+    const errorData: ApiError = await response.json();
+    throw new Error(errorData.error || 'Failed to search by image');
+  }
+
+  return response.json();
+}
+
+/**
+ * URL of a resized variant of an uploaded or wardrobe image, for grids and cards.
+ * Other URLs (local blobs, catalog images) are returned unchanged.
+ */
+export function imageVariantUrl(
+  url: string,
+  width: number,
+  fmt: 'webp' | 'jpg' | 'png' = 'webp'
+): string {
+  const match = url.match(/^(?:http:\/\/localhost:5000)?\/(?:uploads|static\/wardrobe_images)\/([^/?#]+)$/);
+  if (!match) {
+    return url;
+  }
+  return `${BACKEND_URL}/img/${match[1]}?w=${width}&fmt=${fmt}`;
+}
+
 /**
  * Delete a wardrobe item from the backend
  */
@@ -1,4 +1,4 @@
-import { getWardrobeItems } from "@/services/wardrobeApi";
+import { getWardrobeChanges, getWardrobePage, WardrobeItem } from "@/services/wardrobeApi";
 
 export interface ClothingItem {
   id: string;
@@ -8,6 +8,113 @@ export interface ClothingItem {
   dateAdded: string;
 }
 
+const WARDROBE_PAGE_SIZE = 200;
+const WARDROBE_SNAPSHOT_KEY = "wardrobeSnapshot";
+
+interface CachedWardrobePage {
+  cursor: string | null;
+  etag: string | null;
+  items: WardrobeItem[];
+  nextCursor: string | null;
+}
+
+interface WardrobeSnapshot {
+  version: number; // X-Wardrobe-Version the items are current to
+  items: WardrobeItem[];
+}
+
+// Pages from the last full load, revalidated with If-None-Match on the next one
+let cachedPages: CachedWardrobePage[] = [];
+let snapshot: WardrobeSnapshot | null = null;
+let pendingLoad: Promise<WardrobeItem[]> | null = null;
+
+const readSnapshot = (): WardrobeSnapshot | null => {
+  try {
+    const saved = JSON.parse(localStorage.getItem(WARDROBE_SNAPSHOT_KEY) || "null");
+    return saved && typeof saved.version === "number" && Array.isArray(saved.items) ? saved : null;
+  } catch {
+    return null;
+  }
+};
+
+const saveSnapshot = (next: WardrobeSnapshot) => {
+  snapshot = next;
+  try {
+    localStorage.setItem(WARDROBE_SNAPSHOT_KEY, JSON.stringify(next));
+  } catch {
+    // Over quota: keep the in-memory copy and do a full load next session
+    localStorage.removeItem(WARDROBE_SNAPSHOT_KEY);
+  }
+};
+
+// Same order as the server: newest first, ties broken by id
+const newestFirst = (a: WardrobeItem, b: WardrobeItem) =>
+  (b.created_at || "").localeCompare(a.created_at || "") || b.id - a.id;
+
+const fetchWardrobePages = async (): Promise<WardrobeSnapshot> => {
+  const pages: CachedWardrobePage[] = [];
+  let cursor: string | null = null;
+  let version = 0;
+  do {
+    const cached = cachedPages[pages.length];
+    const previous = cached && cached.cursor === cursor ? cached : undefined;
+    const page = await getWardrobePage(WARDROBE_PAGE_SIZE, cursor, undefined, previous?.etag);
+    // The first page's version: changes made while paging are replayed on the next sync
+    if (pages.length === 0) version = page.version;
+    const entry: CachedWardrobePage = page.notModified && previous
+      ? previous
+      : { cursor, etag: page.etag, items: page.items, nextCursor: page.nextCursor };
+    pages.push(entry);
+    cursor = entry.nextCursor;
+  } while (cursor);
+  cachedPages = pages;
+  return { version, items: pages.flatMap(page => page.items) };
+};
+
+// Applies /api/wardrobe/changes to a snapshot; null when the server asks for a full refetch
+const applyWardrobeChanges = async (current: WardrobeSnapshot): Promise<WardrobeSnapshot | null> => {
+  const items = new Map(current.items.map(item => [item.id, item]));
+  let version = current.version;
+  let hasMore = true;
+  while (hasMore) {
+    const delta = await getWardrobeChanges(version);
+    if (delta.reset) return null;
+    delta.changes.forEach(change => {
+      if (change.op === "delete" || !change.item) {
+        items.delete(change.item_id);
+      } else {
+        items.set(change.item_id, change.item);
+      }
+    });
+    version = delta.version;
+    hasMore = delta.has_more;
+  }
+  if (version === current.version) return current;
+  return { version, items: Array.from(items.values()).sort(newestFirst) };
+};
+
+const syncWardrobeItems = async (): Promise<WardrobeItem[]> => {
+  const current = snapshot ?? readSnapshot();
+  const synced = (current && await applyWardrobeChanges(current)) || await fetchWardrobePages();
+  if (synced !== snapshot) saveSnapshot(synced);
+  return synced.items;
+};
+
+/**
+ * Loads every backend wardrobe item. The first load pages through the
+ * closet; later loads only apply the changes since the saved version
+ * (falling back to a full load when the server resets). Concurrent callers
+ * share one load.
+ */
+export const loadBackendWardrobeItems = (): Promise<WardrobeItem[]> => {
+  if (!pendingLoad) {
+    pendingLoad = syncWardrobeItems().finally(() => {
+      pendingLoad = null;
+    });
+  }
+  return pendingLoad;
+};
+
 /**
  * Loads wardrobe items from both localStorage and backend, merging them without duplicates
  */
@@ -20,9 +127,9 @@ export const loadAllWardrobeItems = async (): Promise<ClothingItem[]> => {
   }
 
   // Load from backend (primary storage)
-  let backendItems: any[] = [];
+  let backendItems: WardrobeItem[] = [];
   try {
-    backendItems = await getWardrobeItems();
+    backendItems = await loadBackendWardrobeItems();
   } catch (error) {
     console.log('Backend not available, using localStorage only');
     return localItems; // Return only localStorage items if backend is down
@@ -91,7 +198,7 @@ export const getWardrobeCategoryCounts = async (): Promise<{
 export const clearLocalStorageDuplicates = async (): Promise<void> => {
   try {
     // Get backend items
-    const backendItems = await getWardrobeItems();
+    const backendItems = await loadBackendWardrobeItems();
     
     // Get localStorage items
     const savedItems = localStorage.getItem("closetItems");